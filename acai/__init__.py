@@ -0,0 +1 @@
+"""Motores de análise do dashboard Açaí Fitness."""
@@ -0,0 +1,155 @@
+"""Kernel de agregação sobre códigos inteiros densos.
+
+As dimensões de baixa cardinalidade (Canal, Localizacao, Produto, ...) são
+convertidas em categorias uma única vez no carregamento. Os agrupamentos do
+dashboard combinam esses códigos em um único índice e reduzem todas as
+medidas com ``np.bincount``, evitando o custo do groupby por hash do pandas.
+"""
+import numpy as np
+import pandas as pd
+
+DIAS_ORDEM = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Dimensões de texto codificadas no carregamento dos dados
+DIMENSOES = ["Produto", "Categoria", "Localizacao", "Canal", "Dia_Semana", "Mes_Nome"]
+
+
+def encode_dimensions(df):
+    """Converte as dimensões de texto em categorias (códigos inteiros densos)."""
+    for col in DIMENSOES:
+        if col not in df.columns:
+            continue
+        if col == "Dia_Semana":
+            df[col] = pd.Categorical(df[col], categories=DIAS_ORDEM, ordered=True)
+        else:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def dimension_codes(series):
+    """Retorna (códigos, rótulos) de uma dimensão, com códigos em [0, len(rótulos))."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy().astype(np.int64), np.asarray(series.cat.categories)
+
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(dtype=np.int64), np.array([False, True])
+
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        days = series.to_numpy().astype("datetime64[D]").astype(np.int64)
+        if len(days) == 0:
+            return days, np.array([], dtype="datetime64[ns]")
+        first = days.min()
+        labels = np.arange(first, days.max() + 1).astype("datetime64[D]").astype("datetime64[ns]")
+        return days - first, labels
+
+    if pd.api.types.is_integer_dtype(series.dtype):
+        values = series.to_numpy(dtype=np.int64)
+        if len(values) == 0:
+            return values, np.array([], dtype=np.int64)
+        first = values.min()
+        return values - first, np.arange(first, values.max() + 1)
+
+    # Qualquer outra coluna cai no factorize (com hash) como alternativa
+    codes, labels = pd.factorize(series, sort=True)
+    return codes.astype(np.int64), np.asarray(labels)
+
+
+def group_index(df, by):
+    """Combina os códigos das dimensões ``by`` em um único índice plano.
+
+    Sem dimensões todas as linhas caem em um único grupo.
+    """
+    if not by:
+        return np.zeros(len(df), dtype=np.int64), np.ones(len(df), dtype=bool), (1,), []
+
+    parts = [dimension_codes(df[col]) for col in by]
+    shape = tuple(len(labels) for _, labels in parts)
+    codes = [c for c, _ in parts]
+
+    valid = np.ones(len(df), dtype=bool)
+    for c in codes:
+        valid &= c >= 0
+    if not valid.all():
+        codes = [c[valid] for c in codes]
+
+    if len(by) == 1:
+        combined = codes[0]
+    else:
+        combined = np.ravel_multi_index(codes, shape) if len(df) else np.array([], dtype=np.int64)
+
+    return combined, valid, shape, [labels for _, labels in parts]
+
+
+def _group_sums(combined, size, weights=None):
+    """``np.bincount`` por grupo; com um único grupo basta uma soma (o bincount de um só bin é lento)."""
+    if size == 1:
+        return np.array([len(combined) if weights is None else weights.sum()])
+    return np.bincount(combined, weights=weights, minlength=size)
+
+
+def aggregate(df, by, agg, as_category=False, values=None):
+    """Equivalente a ``df.groupby(by).agg(agg).reset_index()`` via ``np.bincount``.
+
+    ``agg`` mapeia coluna -> "sum", "mean" ou "count". Grupos sem linhas são
+    omitidos (como ``observed=True``) e a ordem segue a dos códigos. Com
+    ``as_category=True`` as dimensões categóricas continuam categóricas, o que
+    permite reagregar o resultado sem hash. ``values`` mapeia nomes de medidas
+    a arrays alinhados às linhas de ``df``, para agregar colunas calculadas
+    sem montar uma cópia do DataFrame com ``assign``. Com ``by`` vazio o
+    resultado é uma única linha com o total.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    values = values or {}
+    columns = by + list(agg)
+
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    combined, valid, shape, labels = group_index(df, by)
+    size = int(np.prod(shape))
+    counts = _group_sums(combined, size)
+    todas_validas = valid.all()
+    present = np.flatnonzero(counts)
+    positions = np.unravel_index(present, shape)
+
+    result = {}
+    for col, lab, pos in zip(by, labels, positions):
+        dtype = df[col].dtype
+        if as_category and isinstance(dtype, pd.CategoricalDtype):
+            result[col] = pd.Categorical.from_codes(pos, dtype=dtype)
+        else:
+            result[col] = lab[pos]
+
+    for col, how in agg.items():
+        if how == "count":
+            result[col] = counts[present]
+            continue
+
+        coluna = values[col] if col in values else df[col]
+        dtype = coluna.dtype
+        pesos = np.asarray(coluna, dtype=float)
+        if not todas_validas:
+            pesos = pesos[valid]
+
+        # Valores ausentes são ignorados, como no pandas
+        nan_mask = np.isnan(pesos)
+        if nan_mask.any():
+            pesos = np.where(nan_mask, 0.0, pesos)
+            n = _group_sums(combined, size, (~nan_mask).astype(float))[present]
+        else:
+            n = counts[present]
+
+        sums = _group_sums(combined, size, pesos)[present]
+
+        if how == "sum":
+            if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+                sums = np.rint(sums).astype(np.int64)
+            result[col] = sums
+        elif how == "mean":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result[col] = sums / n
+        else:
+            raise ValueError(f"Agregação não suportada: {how}")
+
+    # ``result`` já está na ordem de ``columns``; passar ``columns`` força um reindex lento
+    return pd.DataFrame(result)
@@ -0,0 +1,125 @@
+"""Detecção de anomalias nas séries diárias de vendas.
+
+Todas as séries (por padrão loja × produto × canal) são empilhadas em uma
+matriz densa séries × dias, com zero nos dias sem venda. Cada dia é comparado
+com o mesmo dia da semana nas semanas anteriores por estatísticas robustas
+(mediana e MAD), calculadas de uma vez com janelas deslizantes do NumPy.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from acai.aggregation import dimension_codes, group_index
+
+SERIES = ["Localizacao", "Produto", "Canal"]
+
+# Séries e limiar iniciais da seção Alertas (os que o pré-aquecimento calcula)
+SERIES_ALERTA = ["Localizacao"]
+LIMIAR_ALERTA = 3.5
+
+# Séries processadas por bloco, para limitar a memória das janelas
+BLOCO_SERIES = 512
+
+
+def daily_matrix(df, by=SERIES, measure="Valor_Total"):
+    """Matriz séries × dias da medida, apenas com as séries que têm vendas.
+
+    Retorna ``(matriz, series, dias)``, onde ``series`` é um DataFrame com as
+    colunas ``by`` de cada linha da matriz.
+    """
+    combined, valid, shape, labels = group_index(df, by)
+    day_codes, days = dimension_codes(df["Data"])
+    day_codes = day_codes[valid]
+
+    # Índice compacto das séries presentes (evita o produto cartesiano completo)
+    uniq, inverse = np.unique(combined, return_inverse=True)
+    n_days = len(days)
+    values = df[measure].to_numpy(dtype=float)[valid]
+    matriz = np.bincount(inverse * n_days + day_codes, weights=values,
+                         minlength=len(uniq) * n_days).reshape(len(uniq), n_days)
+
+    positions = np.unravel_index(uniq, shape)
+    series = pd.DataFrame({col: lab[pos] for col, lab, pos in zip(by, labels, positions)})
+    return matriz, series, days
+
+
+def seasonal_baseline(matriz, semanas=8):
+    """Mediana e MAD do mesmo dia da semana nas ``semanas`` anteriores.
+
+    Os primeiros ``7 * semanas`` dias não têm histórico suficiente e ficam NaN.
+    """
+    n_series, n_days = matriz.shape
+    janela = 7 * semanas
+    mediana = np.full(matriz.shape, np.nan)
+    mad = np.full(matriz.shape, np.nan)
+    if n_days <= janela:
+        return mediana, mad
+
+    for inicio in range(0, n_series, BLOCO_SERIES):
+        bloco = matriz[inicio:inicio + BLOCO_SERIES]
+        # Para o dia t: valores em t - 7*semanas, ..., t - 7
+        hist = sliding_window_view(bloco, janela + 1, axis=1)[:, :, :-1:7]
+        med = np.median(hist, axis=2)
+        mediana[inicio:inicio + BLOCO_SERIES, janela:] = med
+        mad[inicio:inicio + BLOCO_SERIES, janela:] = np.median(np.abs(hist - med[:, :, None]), axis=2)
+
+    return mediana, mad
+
+
+def detect_anomalies(df, by=SERIES, measure="Valor_Total", semanas=8, limiar=3.5, variacao_minima=0.3):
+    """Pontua todas as séries diárias e retorna os pontos anômalos.
+
+    Um dia é anômalo quando o escore robusto ``(valor - mediana) / (1.4826 * MAD)``
+    passa de ``limiar`` em módulo e a variação relativa à mediana é de pelo
+    menos ``variacao_minima``. O tempo de cálculo e o número de séries ficam em
+    ``resultado.attrs``.
+    """
+    inicio = time.perf_counter()
+    colunas = list(by) + ["Data", "Valor", "Esperado", "Variacao", "Score"]
+
+    if df.empty:
+        result = pd.DataFrame(columns=colunas)
+        result.attrs.update(series=0, tempo=0.0)
+        return result
+
+    matriz, series, days = daily_matrix(df, by, measure)
+    mediana, mad = seasonal_baseline(matriz, semanas)
+
+    # Escala mínima evita escores explosivos em séries quase constantes
+    escala = np.maximum(1.4826 * mad, np.maximum(0.1 * np.abs(mediana), 1.0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score = (matriz - mediana) / escala
+        variacao = (matriz - mediana) / mediana
+        flags = (mediana > 0) & (np.abs(score) >= limiar) & (np.abs(variacao) >= variacao_minima)
+
+    s_idx, d_idx = np.nonzero(flags)
+    result = series.iloc[s_idx].reset_index(drop=True)
+    result["Data"] = days[d_idx]
+    result["Valor"] = matriz[s_idx, d_idx]
+    result["Esperado"] = mediana[s_idx, d_idx]
+    result["Variacao"] = variacao[s_idx, d_idx] * 100
+    result["Score"] = score[s_idx, d_idx]
+    result = result[colunas]
+
+    result.attrs.update(series=len(series), tempo=time.perf_counter() - inicio)
+    return result
+
+
+def recent_alerts(alertas, inicio, fim, dias, filtros):
+    """Alertas dos últimos ``dias`` até ``fim`` (sem passar de ``inicio``), do escore mais forte ao mais fraco.
+
+    ``filtros`` mapeia colunas nos valores selecionados; só valem as colunas
+    que fazem parte das séries pontuadas.
+    """
+    fim = pd.to_datetime(fim)
+    inicio_alertas = max(fim - pd.Timedelta(days=dias - 1), pd.to_datetime(inicio))
+    mask = (alertas["Data"] >= inicio_alertas) & (alertas["Data"] <= fim)
+    for coluna, selecionados in filtros.items():
+        if coluna in alertas.columns:
+            mask &= alertas[coluna].isin(selecionados)
+    recentes = alertas[mask]
+    recentes = recentes.reindex(recentes["Score"].abs().sort_values(ascending=False).index)
+    recentes.attrs = dict(alertas.attrs)
+    return recentes
@@ -0,0 +1,278 @@
+"""API HTTP/JSON local com os KPIs e as quebras do dashboard.
+
+Usa o mesmo carregador, os mesmos agregados e as mesmas funções de KPI do
+dashboard, sem Streamlit. Os filtros espelham a barra lateral:
+
+    GET /kpis?periodo=Últimos 30 dias&lojas=Centro&lojas=Praia&comparacao=Ano anterior
+    GET /quebras/canal?inicio=2024-01-01&fim=2024-03-31&produtos=Açaí 1
+    GET /kpis?conjunto=Nordeste&periodo=Último ano
+    GET /filtros
+    GET /versao?conjunto=Nordeste
+
+``conjunto`` escolhe o conjunto de dados do registro (``acai.registry``);
+sem ele responde o primeiro. ``periodo`` aceita os períodos pré-definidos; ``inicio``/``fim`` (AAAA-MM-DD)
+substituem o período. Filtros com vários valores repetem o parâmetro. Cada
+resposta traz um ETag derivado da versão dos dados e dos parâmetros: um
+``If-None-Match`` igual responde 304 sem recalcular, e os corpos ficam no
+cache global de memória (``acai.cache``). As requisições são
+atendidas por um conjunto limitado de threads; acima da fila, a resposta é 503.
+
+Execução isolada (carrega os conjuntos do registro e observa os arquivos):
+
+    python -m acai.api --porta 8502
+"""
+import argparse
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from acai.cache import MemoryCache
+from acai.comparison import COMPARACOES
+from acai.filters import DIMENSOES_FILTRO, PERIODO_PADRAO, PERIODOS, default_filters, period_dates
+from acai.kpis import QUEBRAS, breakdown, cached_views, kpi_summary
+from acai.refresh import DatasetRefresher
+from acai.registry import builder, load_registry
+
+PORTA = 8502
+TRABALHADORES = 4
+
+# Parâmetro de filtro -> posição em ``default_filters``
+PARAMETROS_FILTRO = dict(zip(["produtos", "categorias", "lojas", "canais"], range(len(DIMENSOES_FILTRO))))
+
+
+class ApiError(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _json_default(valor):
+    if isinstance(valor, (np.integer, np.floating, np.bool_)):
+        return valor.item()
+    if isinstance(valor, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(valor).strftime("%Y-%m-%d")
+    return str(valor)
+
+
+def _records(frame):
+    """Linhas do DataFrame como dicionários, com NaN/inf convertidos em None."""
+    frame = frame.replace([np.inf, -np.inf], np.nan)
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+
+
+def parse_filters(df, params):
+    """Período, base de comparação e filtros a partir dos parâmetros da URL."""
+    periodo = params.get("periodo", [PERIODO_PADRAO])[0]
+    if periodo not in PERIODOS:
+        raise ApiError(400, f"Período inválido: {periodo}. Opções: {', '.join(PERIODOS)}")
+    inicio, fim = period_dates(periodo, df)
+    try:
+        if "inicio" in params:
+            inicio = pd.Timestamp(params["inicio"][0])
+        if "fim" in params:
+            fim = pd.Timestamp(params["fim"][0])
+    except ValueError as e:
+        raise ApiError(400, f"Data inválida: {e}")
+
+    comparacao = params.get("comparacao", [next(iter(COMPARACOES))])[0]
+    if comparacao not in COMPARACOES:
+        raise ApiError(400, f"Comparação inválida: {comparacao}. Opções: {', '.join(COMPARACOES)}")
+    baseline = None
+    if comparacao == "Base personalizada":
+        try:
+            baseline = (pd.Timestamp(params["base_inicio"][0]), pd.Timestamp(params["base_fim"][0]))
+        except (KeyError, ValueError):
+            raise ApiError(400, "Base personalizada exige base_inicio e base_fim (AAAA-MM-DD)")
+
+    filtros = list(default_filters(df))
+    for nome, posicao in PARAMETROS_FILTRO.items():
+        if nome in params:
+            filtros[posicao] = tuple(params[nome])
+    return inicio, fim, comparacao, baseline, tuple(filtros)
+
+
+class DashboardApi:
+    """Calcula as respostas da API sobre a versão atual dos dados, com cache por ETag.
+
+    ``refreshers`` mapeia o nome de cada conjunto ao seu ``DatasetRefresher``;
+    o parâmetro ``conjunto`` escolhe qual deles responde (o primeiro, sem o
+    parâmetro). ``cache`` é o ``MemoryCache`` compartilhado (por exemplo, o do
+    dashboard); sem ele, a API usa um próprio.
+    """
+
+    def __init__(self, refreshers, cache=None):
+        self.refreshers = dict(refreshers)
+        if not self.refreshers:
+            raise ValueError("A API precisa de pelo menos um conjunto de dados")
+        self.cache = cache if cache is not None else MemoryCache()
+        # As mesmas visões em cache do dashboard, quando o cache é compartilhado
+        self.view_results, self.view_totals = cached_views(self.cache)
+
+    def dataset(self, params):
+        """(nome, refresher) do conjunto pedido em ``params``."""
+        nome = params.get("conjunto", [next(iter(self.refreshers))])[0]
+        if nome not in self.refreshers:
+            raise ApiError(404, f"Conjunto desconhecido: {nome}. Opções: {', '.join(self.refreshers)}")
+        return nome, self.refreshers[nome]
+
+    def etag(self, conjunto, versao, caminho, params):
+        # Cada conjunto numera as suas versões, então o nome entra na chave
+        chave = json.dumps([conjunto, versao.numero, caminho, sorted(params.items())], ensure_ascii=False)
+        return '"' + hashlib.sha1(chave.encode("utf-8")).hexdigest() + '"'
+
+    def handle(self, caminho, params, if_none_match=None):
+        """Retorna ``(status, etag, corpo)``; ``corpo`` é None quando o status é 304."""
+        conjunto, refresher = self.dataset(params)
+        versao = refresher.current()
+        etag = self.etag(conjunto, versao, caminho, params)
+        if if_none_match is not None and etag in [t.strip() for t in if_none_match.split(",")]:
+            return 304, etag, None
+
+        corpo = self.cache.get_or_compute(("api", etag), lambda: json.dumps(
+            self.compute(conjunto, versao, caminho, params), ensure_ascii=False, default=_json_default
+        ).encode("utf-8"))
+        return 200, etag, corpo
+
+    def compute(self, conjunto, versao, caminho, params):
+        df = versao.dados["df"]
+        partes = [p for p in caminho.split("/") if p]
+
+        if partes == ["versao"]:
+            return {"conjunto": conjunto, "versao": versao.numero, "carregado_em": versao.carregado_em.isoformat(timespec="seconds"),
+                    "linhas": len(df), "tempo_carga": versao.tempo}
+
+        if partes == ["filtros"]:
+            opcoes = default_filters(df)
+            return {
+                "conjuntos": list(self.refreshers),
+                "periodos": PERIODOS,
+                "comparacoes": list(COMPARACOES),
+                **{nome: list(opcoes[posicao]) for nome, posicao in PARAMETROS_FILTRO.items()},
+            }
+
+        inicio, fim, comparacao, baseline, filtros = parse_filters(df, params)
+        filtro = {"inicio": inicio, "fim": fim, "comparacao": comparacao}
+
+        chave_versao = (conjunto, versao.numero)
+        if partes == ["kpis"]:
+            totais = self.view_totals(versao.dados, chave_versao, inicio, fim, baseline, *filtros)
+            return {"versao": versao.numero, "filtro": filtro,
+                    "kpis": kpi_summary(totais["totais_periodos"], comparacao)}
+
+        if len(partes) == 2 and partes[0] == "quebras" and partes[1] in QUEBRAS:
+            visao = self.view_results(versao.dados, chave_versao, inicio, fim, baseline, *filtros)
+            return {"versao": versao.numero, "filtro": filtro,
+                    "linhas": _records(breakdown(visao["filtered_df"], QUEBRAS[partes[1]]))}
+
+        raise ApiError(404, f"Rota não encontrada: {caminho}")
+
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            try:
+                status, etag, corpo = api.handle(url.path, parse_qs(url.query), self.headers.get("If-None-Match"))
+            except ApiError as e:
+                status, etag, corpo = e.status, None, json.dumps({"erro": str(e)}, ensure_ascii=False).encode("utf-8")
+            except Exception as e:
+                status, etag, corpo = 500, None, json.dumps({"erro": str(e)}, ensure_ascii=False).encode("utf-8")
+
+            self.send_response(status)
+            if etag is not None:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            if corpo is not None:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            if corpo is not None:
+                self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class PooledHTTPServer(HTTPServer):
+    """Servidor HTTP que atende as conexões em um conjunto limitado de threads.
+
+    Até ``trabalhadores`` requisições rodam ao mesmo tempo e outras tantas
+    esperam na fila; além disso a conexão recebe 503 imediatamente.
+    """
+
+    def __init__(self, endereco, handler, trabalhadores=TRABALHADORES):
+        # Antes do ``super().__init__``: se o bind falhar ele chama ``server_close``
+        self._pool = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="acai-api")
+        self._vagas = threading.BoundedSemaphore(2 * trabalhadores)
+        super().__init__(endereco, handler)
+
+    def process_request(self, request, client_address):
+        if not self._vagas.acquire(blocking=False):
+            try:
+                request.sendall(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nRetry-After: 1\r\n\r\n")
+            finally:
+                self.shutdown_request(request)
+            return
+        self._pool.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._vagas.release()
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
+def serve(refreshers, host="127.0.0.1", porta=PORTA, trabalhadores=TRABALHADORES, cache=None):
+    """Cria o servidor da API sobre ``refreshers`` (nome -> refresher), sem iniciá-lo."""
+    return PooledHTTPServer((host, porta), make_handler(DashboardApi(refreshers, cache)), trabalhadores)
+
+
+def start_in_background(refreshers, host="127.0.0.1", porta=PORTA, trabalhadores=TRABALHADORES, cache=None):
+    """Inicia a API em uma thread daemon e retorna o servidor."""
+    servidor = serve(refreshers, host, porta, trabalhadores, cache)
+    threading.Thread(target=servidor.serve_forever, name="acai-api", daemon=True).start()
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API JSON local do dashboard Açaí Fitness")
+    parser.add_argument("--registro", default=None, help="Registro dos conjuntos (padrão: ACAI_DATASETS ou datasets.json)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA)
+    parser.add_argument("--trabalhadores", type=int, default=TRABALHADORES)
+    args = parser.parse_args()
+
+    # Um refresher por conjunto: cada arquivo é observado e recarregado por conta própria
+    refreshers = {
+        nome: DatasetRefresher(fonte.caminho, builder(fonte)).start()
+        for nome, fonte in load_registry(args.registro).items()
+    }
+    for refresher in refreshers.values():
+        refresher.current()
+    servidor = serve(refreshers, args.host, args.porta, args.trabalhadores)
+    print(f"API em http://{args.host}:{args.porta} (Ctrl+C para encerrar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
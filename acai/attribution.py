@@ -0,0 +1,94 @@
+"""Atribuição da variação de um KPI entre dois períodos em efeitos volume, mix e taxa.
+
+Para uma métrica aditiva M = Σ V_g · r_g (V = volume, r = taxa por unidade do
+grupo g), a variação M1 - M0 se decompõe em:
+
+* volume: (V1 - V0) · R0, com R0 = M0 / V0 a taxa média da base;
+* mix: Σ V1 · (s1_g - s0_g) · (r0_g - R0), com s a participação no volume;
+* taxa: Σ V1_g · (r1_g - r0_g).
+
+Para razões (ticket médio = Valor_Total / Clientes_Unicos) não há efeito
+volume e a variação T1 - T0 se divide apenas em mix e taxa. Tudo é calculado
+sobre os agregados por grupo dos dois períodos, sem laços por grupo.
+"""
+import numpy as np
+import pandas as pd
+
+from acai.comparison import ATUAL
+
+# Métrica exibida -> (coluna da métrica, coluna de volume, é razão)
+METRICAS = {
+    "Vendas": ("Valor_Total", "Qtd_Vendida", False),
+    "Lucro Líquido": ("Lucro_Liquido", "Qtd_Vendida", False),
+    "Ticket Médio": ("Valor_Total", "Clientes_Unicos", True),
+}
+
+MEDIDAS = ["Valor_Total", "Lucro_Liquido", "Qtd_Vendida", "Clientes_Unicos"]
+
+
+def _wide(grouped, dim, base, cols):
+    """Arrays (atual, base) de cada coluna a partir da saída longa de ``compare``."""
+    wide = grouped.pivot(index=dim, columns="Periodo", values=cols)
+    wide = wide.reindex(columns=pd.MultiIndex.from_product([cols, [ATUAL, base]])).fillna(0.0)
+    arrays = {col: (wide[(col, ATUAL)].to_numpy(), wide[(col, base)].to_numpy()) for col in cols}
+    return wide.index, arrays
+
+
+def _safe_div(num, den, fallback):
+    """Divisão elemento a elemento que usa ``fallback`` onde ``den`` é zero."""
+    return np.divide(num, den, out=np.full(den.shape, fallback, dtype=float), where=den != 0)
+
+
+def attribution(grouped, dim, base, metrica):
+    """Decompõe a variação de ``metrica`` entre a ``base`` e o período atual.
+
+    ``grouped`` é a saída de ``compare(..., by=dim)`` com as colunas de
+    ``MEDIDAS``. Retorna ``(efeitos, contribuicoes)``: um dicionário com Base,
+    Volume, Mix, Taxa e Atual, e um DataFrame com a contribuição de cada grupo
+    aos efeitos mix e taxa.
+    """
+    col, vol, ratio = METRICAS[metrica]
+    if grouped.empty:
+        efeitos = dict.fromkeys(["Base", "Volume", "Mix", "Taxa", "Atual"], 0.0)
+        return efeitos, pd.DataFrame(columns=[dim, "Mix", "Taxa", "Total"])
+
+    index, arrays = _wide(grouped, dim, base, [col, vol])
+    m1, m0 = arrays[col]
+    v1, v0 = arrays[vol]
+
+    M1, M0, V1, V0 = m1.sum(), m0.sum(), v1.sum(), v0.sum()
+    R0 = M0 / V0 if V0 else 0.0
+
+    # Grupos sem volume na base usam a taxa média da base como referência
+    r0 = _safe_div(m0, v0, R0)
+    r1 = _safe_div(m1, v1, 0.0)
+    s1 = v1 / V1 if V1 else np.zeros_like(v1)
+    s0 = v0 / V0 if V0 else np.zeros_like(v0)
+
+    if ratio:
+        # Razão: participação no denominador ponderando a taxa de cada grupo
+        mix = (s1 - s0) * (r0 - R0)
+        taxa = s1 * (r1 - r0)
+        volume = 0.0
+        inicio, fim = R0, (M1 / V1 if V1 else 0.0)
+    else:
+        mix = V1 * (s1 - s0) * (r0 - R0)
+        taxa = v1 * (r1 - r0)
+        volume = (V1 - V0) * R0
+        inicio, fim = M0, M1
+
+    efeitos = {
+        "Base": float(inicio),
+        "Volume": float(volume),
+        "Mix": float(mix.sum()),
+        "Taxa": float(taxa.sum()),
+        "Atual": float(fim),
+    }
+
+    contribuicoes = pd.DataFrame({
+        dim: np.asarray(index),
+        "Mix": mix,
+        "Taxa": taxa,
+        "Total": mix + taxa,
+    })
+    return efeitos, contribuicoes
@@ -0,0 +1,222 @@
+"""Cache global com orçamento de memória e descarte por tamanho e custo.
+
+Um único ``MemoryCache`` guarda as visões filtradas, as amostras, as
+anomalias, as figuras serializadas e as respostas da API. Cada entrada tem o tamanho medido em bytes
+(DataFrames com ``memory_usage(deep=True)``, arrays com ``nbytes``, coleções
+somando os elementos) e o custo medido como o tempo gasto para calculá-la.
+
+O descarte segue o GreedyDual-Size: a prioridade de uma entrada é
+``L + custo / tamanho``, renovada a cada acerto; quando o total passa do
+orçamento, sai a de menor prioridade e ``L`` sobe para esse valor. Entradas
+grandes e baratas saem primeiro, e as que não são usadas envelhecem à medida
+que ``L`` cresce (com custos iguais, o comportamento é o de um LRU).
+
+Os dados carregados ficam fixados (``pin``): contam nos bytes residentes e
+reduzem o espaço das demais entradas, mas nunca são descartados.
+"""
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Orçamento padrão (em MB) de todas as entradas, incluindo as fixadas
+ORCAMENTO_MB = 512
+
+# Custo mínimo (em segundos) de uma entrada, para que valores instantâneos não empatem em zero
+CUSTO_MINIMO = 1e-6
+
+
+def size_of(valor, _vistos=None):
+    """Tamanho aproximado em bytes de ``valor``, seguindo DataFrames, arrays e coleções."""
+    if _vistos is None:
+        _vistos = set()
+    if id(valor) in _vistos:
+        return 0
+    _vistos.add(id(valor))
+
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True, index=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(
+            size_of(k, _vistos) + size_of(v, _vistos) for k, v in valor.items()
+        )
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return sys.getsizeof(valor) + sum(size_of(v, _vistos) for v in valor)
+    if hasattr(valor, "__dict__") and not isinstance(valor, type):
+        return sys.getsizeof(valor) + size_of(vars(valor), _vistos)
+    return sys.getsizeof(valor)
+
+
+class _Entrada:
+    __slots__ = ("valor", "tamanho", "custo", "prioridade")
+
+    def __init__(self, valor, tamanho, custo, prioridade):
+        self.valor = valor
+        self.tamanho = tamanho
+        self.custo = custo
+        self.prioridade = prioridade
+
+
+class MemoryCache:
+    """Cache compartilhado limitado a ``orcamento`` bytes.
+
+    As chaves são tuplas que começam pelo espaço de nomes (``"visoes"``,
+    ``"api"``, ...), usado também nas estatísticas.
+    """
+
+    def __init__(self, orcamento=ORCAMENTO_MB * 2 ** 20):
+        self.orcamento = orcamento
+        self._entradas = OrderedDict()
+        self._fixadas = {}
+        self._inflacao = 0.0
+        self._lock = threading.Lock()
+        self._contadores = {}
+
+    def _conta(self, espaco, evento, n=1):
+        contadores = self._contadores.setdefault(espaco, {"acertos": 0, "falhas": 0, "descartes": 0, "rejeitadas": 0})
+        contadores[evento] += n
+
+    def _fixados(self):
+        return sum(tamanho for _, tamanho, _ in self._fixadas.values())
+
+    def _prioridade(self, custo, tamanho):
+        return self._inflacao + max(custo, CUSTO_MINIMO) / max(tamanho, 1)
+
+    def get(self, chave):
+        """``(True, valor)`` se a chave estiver no cache, senão ``(False, None)``."""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self._conta(chave[0], "falhas")
+                return False, None
+            entrada.prioridade = self._prioridade(entrada.custo, entrada.tamanho)
+            self._entradas.move_to_end(chave)
+            self._conta(chave[0], "acertos")
+            return True, entrada.valor
+
+    def put(self, chave, valor, custo=0.0, tamanho=None):
+        """Guarda ``valor`` e descarta entradas até caber no orçamento.
+
+        Um valor maior que o espaço livre de fixações não é guardado.
+        """
+        if tamanho is None:
+            tamanho = size_of(valor)
+        with self._lock:
+            self._entradas.pop(chave, None)
+            disponivel = self.orcamento - self._fixados()
+            if tamanho > disponivel:
+                self._conta(chave[0], "rejeitadas")
+                return False
+            self._entradas[chave] = _Entrada(valor, tamanho, custo, self._prioridade(custo, tamanho))
+            self._descartar(disponivel)
+            return True
+
+    def _descartar(self, disponivel):
+        ocupado = sum(e.tamanho for e in self._entradas.values())
+        while ocupado > disponivel and self._entradas:
+            # Menor prioridade; nos empates, a usada há mais tempo (início do OrderedDict)
+            chave = min(self._entradas, key=lambda c: self._entradas[c].prioridade)
+            entrada = self._entradas.pop(chave)
+            self._inflacao = entrada.prioridade
+            ocupado -= entrada.tamanho
+            self._conta(chave[0], "descartes")
+
+    def get_or_compute(self, chave, calcular):
+        """Valor em cache para ``chave`` ou ``calcular()``, guardado com o tempo gasto como custo."""
+        achou, valor = self.get(chave)
+        if achou:
+            return valor
+        inicio = time.perf_counter()
+        valor = calcular()
+        self.put(chave, valor, custo=time.perf_counter() - inicio)
+        return valor
+
+    def memoize(self, espaco):
+        """Decorador: guarda os resultados da função sob ``espaco``.
+
+        Como no ``st.cache_data``, argumentos cujo nome começa com ``_`` não
+        entram na chave (devem vir acompanhados de algo que os identifique,
+        como o número da versão dos dados). A função decorada ganha ``warm``,
+        que só preenche o cache (usado no pré-aquecimento).
+        """
+        def decorador(funcao):
+            assinatura = inspect.signature(funcao)
+
+            def chave(args, kwargs):
+                argumentos = assinatura.bind(*args, **kwargs)
+                argumentos.apply_defaults()
+                return (espaco,) + tuple(
+                    (nome, valor) for nome, valor in argumentos.arguments.items() if not nome.startswith("_")
+                )
+
+            @functools.wraps(funcao)
+            def envoltorio(*args, **kwargs):
+                return self.get_or_compute(chave(args, kwargs), lambda: funcao(*args, **kwargs))
+
+            def warm(*args, **kwargs):
+                """Calcula e guarda o resultado, se ainda não estiver no cache.
+
+                Retorna ``False`` quando o resultado é maior que o espaço livre
+                de fixações e por isso não foi guardado.
+                """
+                chave_entrada = chave(args, kwargs)
+                with self._lock:
+                    if chave_entrada in self._entradas:
+                        return True
+                inicio = time.perf_counter()
+                valor = funcao(*args, **kwargs)
+                return self.put(chave_entrada, valor, custo=time.perf_counter() - inicio)
+
+            envoltorio.warm = warm
+            return envoltorio
+
+        return decorador
+
+    def pin(self, nome, valor, marca=None):
+        """Fixa ``valor`` sob ``nome`` (substitui o anterior quando ``marca`` muda)."""
+        with self._lock:
+            atual = self._fixadas.get(nome)
+            if atual is not None and marca is not None and atual[2] == marca:
+                return
+        tamanho = size_of(valor)
+        with self._lock:
+            self._fixadas[nome] = (valor, tamanho, marca)
+            self._descartar(self.orcamento - self._fixados())
+
+    def clear(self, espaco=None):
+        """Remove as entradas de ``espaco`` (ou todas); as fixadas permanecem."""
+        with self._lock:
+            for chave in [c for c in self._entradas if espaco is None or c[0] == espaco]:
+                del self._entradas[chave]
+
+    def stats(self):
+        """Acertos, falhas, descartes e bytes residentes, no total e por espaço de nomes."""
+        with self._lock:
+            espacos = {}
+            for espaco, contadores in self._contadores.items():
+                espacos[espaco] = dict(contadores, entradas=0, bytes=0)
+            for chave, entrada in self._entradas.items():
+                linha = espacos.setdefault(chave[0], {"acertos": 0, "falhas": 0, "descartes": 0, "rejeitadas": 0,
+                                                      "entradas": 0, "bytes": 0})
+                linha["entradas"] += 1
+                linha["bytes"] += entrada.tamanho
+            fixados = self._fixados()
+            total = {
+                evento: sum(linha[evento] for linha in espacos.values())
+                for evento in ("acertos", "falhas", "descartes", "rejeitadas", "entradas", "bytes")
+            }
+            total["fixados"] = fixados
+            total["residentes"] = total["bytes"] + fixados
+            total["orcamento"] = self.orcamento
+            consultas = total["acertos"] + total["falhas"]
+            total["taxa_acerto"] = total["acertos"] / consultas if consultas else 0.0
+            return {"total": total, "espacos": espacos}
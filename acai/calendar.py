@@ -0,0 +1,113 @@
+"""Calendário denso loja × canal × dia para séries diárias e mapas de calor.
+
+O calendário são as células do cubo do filtro cruzado somadas nos produtos:
+um array ``loja × canal × dia × medida`` cujo eixo de dias começa na primeira
+data dos dados e tem uma posição para cada dia corrido, inclusive os dias sem
+vendas (que ficam com zero explícito). A posição de uma data é só a diferença
+em dias para o início, então recortar um período é uma fatia do array (sem
+busca nem cópia), e a série diária de qualquer combinação de lojas e canais
+sai de uma redução desse recorte.
+"""
+import numpy as np
+import pandas as pd
+
+from acai.crossfilter import MEDIDAS_CUBO, cube_sums
+
+MEDIDAS_CALENDARIO = MEDIDAS_CUBO
+
+# Colunas do mapa ano × dia do ano: posições de um ano bissexto, para que a
+# mesma data caia na mesma coluna em todos os anos (29/02 fica vazio nos outros)
+DIAS_ANO = 366
+INICIO_MESES = np.cumsum([0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30]) + 1
+SEMANAS_ANO = 53
+
+
+def build_calendar(cubo, produtos=None):
+    """Calendário a partir do cubo de ``build_cube``, com todos os produtos ou só ``produtos``."""
+    lojas, canais, n_produtos = cubo["forma"]
+    forma = (lojas, canais, len(cubo["datas"]))
+    # A combinação é (loja × canal) × produto: a divisão pelo número de produtos dá loja × canal
+    posicao = cubo["combinacao"] // n_produtos * forma[2] + cubo["dia"]
+    pesos = None
+    if produtos is not None:
+        pesos = np.isin(cubo["rotulos"]["Produto"], list(produtos)).astype(float)[cubo["combinacao"] % n_produtos]
+    denso = cube_sums(cubo["valores"], posicao, int(np.prod(forma)), pesos).reshape(forma + (len(MEDIDAS_CUBO),))
+    datas = cubo["datas"]
+    return {
+        "valores": denso,
+        "rotulos": {dim: cubo["rotulos"][dim] for dim in ("Localizacao", "Canal")},
+        "inicio": datas[0] if len(datas) else None,
+        "dias": len(datas),
+    }
+
+
+def day_index(calendario, data):
+    """Posição de ``data`` no eixo de dias (pode cair fora do calendário)."""
+    return (pd.Timestamp(data).normalize() - calendario["inicio"]).days
+
+
+def calendar_series(calendario, inicio, fim, lojas=None, canais=None, medida="Valor_Total"):
+    """Série diária de ``medida`` de ``inicio`` a ``fim``, com zero nos dias sem vendas.
+
+    O período é limitado às datas do calendário; ``lojas`` e ``canais``
+    (``None`` = todos) restringem a soma.
+    """
+    if not calendario["dias"]:
+        return pd.Series(dtype=float, name=medida)
+    t0 = max(day_index(calendario, inicio), 0)
+    t1 = min(day_index(calendario, fim) + 1, calendario["dias"])
+    t1 = max(t1, t0)
+
+    bloco = calendario["valores"][:, :, t0:t1, MEDIDAS_CALENDARIO.index(medida)]
+    operandos = [bloco]
+    for selecao, rotulos in ((lojas, calendario["rotulos"]["Localizacao"]), (canais, calendario["rotulos"]["Canal"])):
+        operandos.append(np.ones(len(rotulos)) if selecao is None else np.isin(rotulos, list(selecao)).astype(float))
+    serie = np.einsum("lct,l,c->t", *operandos, optimize=True)
+
+    datas = pd.date_range(calendario["inicio"] + pd.Timedelta(days=t0), periods=t1 - t0, freq="D")
+    return pd.Series(serie, index=datas, name=medida)
+
+
+def grid_positions(datas):
+    """Linha (ano a partir do primeiro) e coluna (dia do ano bissexto, a partir de 0) de cada data."""
+    anos = datas.year.to_numpy()
+    colunas = datas.dayofyear.to_numpy() - 1 + ((~datas.is_leap_year) & (datas.month > 2))
+    return anos - anos.min(), colunas
+
+
+def year_grid(serie):
+    """Mapa ano × dia do ano de uma série diária (NaN nos dias fora da série).
+
+    As colunas são as posições de 1 a 366 de um ano bissexto; ``INICIO_MESES``
+    tem a primeira coluna de cada mês.
+    """
+    datas = serie.index
+    if not len(datas):
+        return pd.DataFrame(columns=pd.RangeIndex(1, DIAS_ANO + 1), dtype=float)
+    linhas, colunas = grid_positions(datas)
+    grade = np.full((linhas.max() + 1, DIAS_ANO), np.nan)
+    grade[linhas, colunas] = serie.to_numpy()
+    primeiro = datas[0].year
+    return pd.DataFrame(grade, index=pd.RangeIndex(primeiro, primeiro + len(grade), name="Ano"),
+                        columns=pd.RangeIndex(1, DIAS_ANO + 1))
+
+
+def weekly_by_year(serie):
+    """Totais por ano ISO × semana ISO (1 a 53) e o número de dias da série em cada semana.
+
+    Semanas com menos de 7 dias (nas pontas do período) ficam com o total
+    parcial; quem compara semanas deve olhar ``dias``.
+    """
+    colunas = pd.RangeIndex(1, SEMANAS_ANO + 1, name="Semana")
+    if not len(serie):
+        vazio = pd.DataFrame(columns=colunas, dtype=float)
+        return vazio, vazio.copy()
+    iso = serie.index.isocalendar()
+    anos = iso["year"].to_numpy(dtype=np.int64)
+    codigo = (anos - anos.min()) * SEMANAS_ANO + iso["week"].to_numpy(dtype=np.int64) - 1
+    forma = (anos.max() - anos.min() + 1, SEMANAS_ANO)
+    tamanho = forma[0] * forma[1]
+    indice = pd.RangeIndex(anos.min(), anos.max() + 1, name="Ano_ISO")
+    totais = np.bincount(codigo, weights=serie.to_numpy(), minlength=tamanho).reshape(forma)
+    dias = np.bincount(codigo, minlength=tamanho).reshape(forma)
+    return pd.DataFrame(totais, index=indice, columns=colunas), pd.DataFrame(dias, index=indice, columns=colunas)
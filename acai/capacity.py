@@ -0,0 +1,91 @@
+"""Utilização da capacidade e dimensionamento de equipe por loja e dia da semana.
+
+``Funcionarios`` e ``Capacidade_Max`` descrevem a loja no dia e se repetem
+nas linhas de venda; por isso entram pela média do dia, enquanto
+``Pessoas_Atendidas`` e ``Valor_Total`` são somados. A razão entre as pessoas
+atendidas no dia e a capacidade diária é a ``Demanda``, que pode passar de 1
+quando o arquivo traz mais atendimentos que a capacidade informada; a
+``Utilizacao`` é essa razão limitada a 1 (a loja não atende acima de 100%), e
+os dias com demanda acima do limiar contam como saturados. O agregado diário
+por loja é calculado uma vez e todas as métricas por loja × dia da semana
+saem dele.
+"""
+import numpy as np
+import pandas as pd
+
+from acai.aggregation import DIAS_ORDEM, aggregate
+
+# Utilização a partir da qual o dia é considerado saturado
+LIMIAR_SATURACAO = 0.9
+
+
+def daily_capacity(df):
+    """Agregado loja × dia com atendimentos, capacidade, equipe, demanda e utilização (até 1)."""
+    diario = aggregate(df, ["Localizacao", "Data"], {
+        "Valor_Total": "sum",
+        "Pessoas_Atendidas": "sum",
+        "Funcionarios": "mean",
+        "Capacidade_Max": "mean",
+    })
+    diario["Dia_Semana"] = pd.Categorical(diario["Data"].dt.day_name(), categories=DIAS_ORDEM, ordered=True)
+
+    capacidade = diario["Capacidade_Max"].to_numpy(dtype=float)
+    pessoas = diario["Pessoas_Atendidas"].to_numpy(dtype=float)
+    diario["Demanda"] = np.divide(pessoas, capacidade, out=np.zeros_like(pessoas), where=capacidade > 0)
+    diario["Utilizacao"] = np.minimum(diario["Demanda"], 1.0)
+    return diario
+
+
+def capacity_profile(diario, limiar=LIMIAR_SATURACAO):
+    """Métricas por loja × dia da semana a partir de ``daily_capacity``.
+
+    Retorna a utilização e a demanda médias, a receita por funcionário-dia, a
+    média diária de atendimentos, capacidade e equipe, e quantos dias tiveram
+    demanda acima de ``limiar``. ``Dia_Semana`` continua categórico, na ordem
+    da semana, para que tabelas e mapas de calor não fiquem em ordem alfabética.
+    """
+    chaves = ["Localizacao", "Dia_Semana"]
+    frame = diario.assign(
+        Funcionario_Dia=diario["Funcionarios"],
+        Dias_Saturados=diario["Demanda"] >= limiar,
+    )
+    perfil = aggregate(frame, chaves, {
+        "Data": "count",
+        "Utilizacao": "mean",
+        "Demanda": "mean",
+        "Pessoas_Atendidas": "mean",
+        "Capacidade_Max": "mean",
+        "Funcionarios": "mean",
+        "Valor_Total": "sum",
+        "Funcionario_Dia": "sum",
+        "Dias_Saturados": "sum",
+    }, as_category=True).rename(columns={"Data": "Dias"})
+
+    receita = perfil.pop("Valor_Total").to_numpy(dtype=float)
+    funcionario_dia = perfil.pop("Funcionario_Dia").to_numpy(dtype=float)
+    perfil["Receita_Funcionario"] = np.divide(receita, funcionario_dia, out=np.zeros_like(receita), where=funcionario_dia > 0)
+    perfil["Pct_Saturado"] = perfil["Dias_Saturados"] / perfil["Dias"] * 100
+    return perfil
+
+
+def staffing_recommendation(perfil, alvo=0.8):
+    """Equipe sugerida por loja × dia da semana para atingir a utilização ``alvo``.
+
+    Supõe que a capacidade cresce proporcionalmente à equipe: com a capacidade
+    média por funcionário do próprio grupo, a equipe necessária é a demanda
+    média dividida por ``alvo`` vezes essa capacidade, arredondada para cima
+    (mínimo de um funcionário).
+    """
+    funcionarios = perfil["Funcionarios"].to_numpy(dtype=float)
+    capacidade = perfil["Capacidade_Max"].to_numpy(dtype=float)
+    pessoas = perfil["Pessoas_Atendidas"].to_numpy(dtype=float)
+
+    por_funcionario = np.divide(capacidade, funcionarios, out=np.zeros_like(capacidade), where=funcionarios > 0)
+    necessario = np.divide(pessoas, alvo * por_funcionario, out=np.full_like(pessoas, np.nan), where=por_funcionario > 0)
+    sugerido = np.where(np.isnan(necessario), np.round(funcionarios), np.maximum(np.ceil(necessario - 1e-9), 1))
+
+    result = perfil[["Localizacao", "Dia_Semana", "Funcionarios", "Utilizacao"]].copy()
+    result["Funcionarios_Sugeridos"] = sugerido.astype(np.int64)
+    result["Diferenca"] = result["Funcionarios_Sugeridos"] - np.round(funcionarios).astype(np.int64)
+    result["Utilizacao_Projetada"] = np.divide(pessoas, sugerido * por_funcionario, out=np.zeros_like(pessoas), where=sugerido * por_funcionario > 0)
+    return result
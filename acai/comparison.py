@@ -0,0 +1,145 @@
+"""Comparação entre períodos nomeados (anterior, mês/ano anterior, base personalizada).
+
+Cada linha é atribuída a quantos períodos contiverem a sua data em uma única
+passagem vetorizada: as medidas são somadas por (grupo, dia) com
+``np.bincount`` e a matriz dias × períodos reduz tudo de uma vez.
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from acai.aggregation import dimension_codes, group_index
+
+ATUAL = "Atual"
+
+# Bases de comparação disponíveis e a frase usada nos cards de KPI
+COMPARACOES = {
+    "Período anterior": "ao período anterior",
+    "Mês anterior": "ao mês anterior",
+    "Ano anterior": "ao ano anterior",
+    "Ano anterior (mesmo dia da semana)": "ao ano anterior (mesmo dia da semana)",
+    "Base personalizada": "à base personalizada",
+}
+
+
+def comparison_periods(start, end, baseline=None):
+    """Monta o período atual e todas as bases de comparação.
+
+    O "Período anterior" mantém a regra original do dashboard: termina no dia
+    anterior a ``start`` e começa ``(end - start)`` dias antes dele. O ano
+    anterior alinhado pelo dia da semana recua 364 dias (52 semanas).
+    """
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp(end).normalize()
+    days_diff = (end - start).days
+
+    periods = {
+        ATUAL: (start, end),
+        "Período anterior": (start - timedelta(days=days_diff), start - timedelta(days=1)),
+        "Mês anterior": (start - pd.DateOffset(months=1), end - pd.DateOffset(months=1)),
+        "Ano anterior": (start - pd.DateOffset(years=1), end - pd.DateOffset(years=1)),
+        "Ano anterior (mesmo dia da semana)": (start - timedelta(days=364), end - timedelta(days=364)),
+    }
+    if baseline is not None:
+        periods["Base personalizada"] = (pd.Timestamp(baseline[0]).normalize(), pd.Timestamp(baseline[1]).normalize())
+    return periods
+
+
+def period_span(periods):
+    """Menor intervalo de datas que cobre todos os períodos."""
+    return min(p[0] for p in periods.values()), max(p[1] for p in periods.values())
+
+
+def _daily_sums(df, measures, by):
+    """Somas das medidas por (grupo, dia): array grupos × dias × medidas."""
+    day_codes, days = dimension_codes(df["Data"])
+    n_days = len(days)
+
+    if by:
+        groups, valid, shape, labels = group_index(df, by)
+        day_codes = day_codes[valid]
+    else:
+        groups, valid, shape, labels = np.zeros(len(df), dtype=np.int64), np.ones(len(df), dtype=bool), (1,), []
+
+    n_groups = int(np.prod(shape))
+    cell = groups * n_days + day_codes
+    sums = np.empty((n_groups, n_days, len(measures)))
+    for i, col in enumerate(measures):
+        values = df[col].to_numpy(dtype=float)[valid]
+        sums[:, :, i] = np.bincount(cell, weights=values, minlength=n_groups * n_days).reshape(n_groups, n_days)
+
+    counts = np.bincount(cell, minlength=n_groups * n_days).reshape(n_groups, n_days)
+    return sums, counts, days, shape, labels
+
+
+def _membership(days, periods):
+    """Matriz booleana dias × períodos (um dia pode pertencer a vários períodos)."""
+    starts = np.array([p[0] for p in periods.values()], dtype="datetime64[ns]")
+    ends = np.array([p[1] for p in periods.values()], dtype="datetime64[ns]")
+    return (days[:, None] >= starts) & (days[:, None] <= ends)
+
+
+def compare(df, periods, measures, by=None):
+    """Soma ``measures`` em cada período nomeado, opcionalmente por ``by``.
+
+    Sem ``by`` retorna um DataFrame indexado pelo nome do período; com ``by``
+    retorna uma linha por (grupo, período) com a coluna ``Periodo``.
+    """
+    by = [by] if isinstance(by, str) else list(by or [])
+    nomes = list(periods)
+
+    if df.empty:
+        if not by:
+            return pd.DataFrame(0.0, index=pd.Index(nomes, name="Periodo"), columns=measures)
+        return pd.DataFrame(columns=by + ["Periodo"] + list(measures))
+
+    sums, counts, days, shape, labels = _daily_sums(df, measures, by)
+    member = _membership(days, periods).astype(float)
+
+    # Redução única: grupos × dias × medidas contra dias × períodos
+    totals = np.einsum("gdm,dp->gpm", sums, member)
+
+    if not by:
+        return pd.DataFrame(totals[0], index=pd.Index(nomes, name="Periodo"), columns=measures)
+
+    # Manter apenas grupos com linhas em algum período
+    rows = counts @ member
+    g_idx, p_idx = np.nonzero(rows > 0)
+    positions = np.unravel_index(g_idx, shape)
+    result = {col: lab[pos] for col, lab, pos in zip(by, labels, positions)}
+    result["Periodo"] = np.array(nomes)[p_idx]
+    for i, col in enumerate(measures):
+        result[col] = totals[g_idx, p_idx, i]
+    return pd.DataFrame(result)
+
+
+def aligned_series(df, periods, measures, base):
+    """Série diária do período ``base`` alinhada às datas do período atual.
+
+    O dia ``i`` da base é associado ao dia ``i`` do período atual, o que
+    permite sobrepor as duas curvas no gráfico de tendência.
+    """
+    inicio_atual, fim_atual = periods[ATUAL]
+    inicio_base, fim_base = periods[base]
+
+    if df.empty:
+        return pd.DataFrame(columns=["Data", "Data_Base"] + list(measures))
+
+    sums, _, days, _, _ = _daily_sums(df, measures, [])
+    datas_base = pd.date_range(inicio_base, fim_base, freq="D")
+    datas_base = datas_base[:len(pd.date_range(inicio_atual, fim_atual, freq="D"))]
+
+    # Dias da base sem vendas (ou fora dos dados) entram como zero
+    pos = np.searchsorted(days, datas_base.to_numpy())
+    pos_clip = np.minimum(pos, len(days) - 1)
+    found = days[pos_clip] == datas_base.to_numpy()
+    values = np.where(found[:, None], sums[0][pos_clip], 0.0)
+
+    result = {
+        "Data": inicio_atual + pd.to_timedelta(np.arange(len(datas_base)), unit="D"),
+        "Data_Base": datas_base,
+    }
+    for i, col in enumerate(measures):
+        result[col] = values[:, i]
+    return pd.DataFrame(result)
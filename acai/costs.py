@@ -0,0 +1,90 @@
+"""Decomposição da receita até o lucro líquido pelas colunas de custo.
+
+Cada venda deve fechar a conta
+
+    Lucro_Liquido = Valor_Total - Taxa_Plataforma - Custo_Materiais - Custo_Entrega
+                    - Comissao_Func - Desconto_Cliente - Desconto_Promocao
+
+A receita, os componentes, o lucro e a diferença de conciliação são somados
+por grupo em uma única agregação multi-medida.
+"""
+import numpy as np
+
+from acai.aggregation import aggregate
+
+# Coluna de custo -> rótulo exibido na cascata, na ordem da conta
+COMPONENTES = {
+    "Taxa_Plataforma": "Taxa da plataforma",
+    "Custo_Materiais": "Materiais",
+    "Custo_Entrega": "Entrega",
+    "Comissao_Func": "Comissão",
+    "Desconto_Cliente": "Desconto ao cliente",
+    "Desconto_Promocao": "Desconto de promoção",
+}
+
+MEDIDAS = ["Valor_Total"] + list(COMPONENTES) + ["Lucro_Liquido"]
+
+# Arredondamento dos componentes a centavos pode deixar alguns centavos de diferença
+TOLERANCIA = 0.05
+
+
+def _reconcile(colunas):
+    """Diferenças de conciliação a partir dos arrays de ``MEDIDAS``, na ordem da conta."""
+    recalculado = colunas[0].copy()
+    for componente in colunas[1:-1]:
+        recalculado -= componente
+    return recalculado - colunas[-1]
+
+
+def reconciliation(df):
+    """Diferença por linha entre o lucro recalculado pelos componentes e o informado."""
+    return _reconcile([df[col].to_numpy(dtype=float) for col in MEDIDAS])
+
+
+def cost_breakdown(df, by=None, tolerancia=TOLERANCIA):
+    """Receita, componentes de custo e lucro por grupo de ``by``.
+
+    Além das ``MEDIDAS``, retorna ``Pedidos``, a soma das diferenças de
+    conciliação (``Diferenca``) e o número de linhas que não fecham a conta
+    (``Linhas_Divergentes``). Sem ``by`` retorna uma única linha com o total.
+    """
+    by = [by] if isinstance(by, str) else list(by or [])
+    # As medidas são lidas uma vez, para a conciliação e para a agregação
+    colunas = [df[col].to_numpy(dtype=float) for col in MEDIDAS]
+    diferenca = _reconcile(colunas)
+
+    agg = {m: "sum" for m in MEDIDAS + ["Diferenca", "Linhas_Divergentes"]}
+    agg["Pedidos"] = "count"
+
+    valores = dict(zip(MEDIDAS, colunas))
+    valores["Diferenca"] = diferenca
+    valores["Linhas_Divergentes"] = np.abs(diferenca) > tolerancia
+    result = aggregate(df, by, agg, values=valores)
+
+    receita = result["Valor_Total"].to_numpy(dtype=float)
+    lucro = result["Lucro_Liquido"].to_numpy(dtype=float)
+    result["Margem"] = np.divide(lucro * 100, receita, out=np.zeros_like(receita), where=receita != 0)
+    return result
+
+
+def waterfall_steps(linha, tolerancia=TOLERANCIA):
+    """Passos (rótulo, valor, tipo) da cascata receita -> lucro de uma linha agregada.
+
+    A diferença não conciliada aparece como um passo próprio quando passa da
+    tolerância, para que a cascata sempre termine no lucro informado.
+    """
+    passos = [("Receita bruta", float(linha["Valor_Total"]), "absolute")]
+    passos += [(rotulo, -float(linha[col]), "relative") for col, rotulo in COMPONENTES.items()]
+    if abs(linha["Diferenca"]) > tolerancia:
+        passos.append(("Não conciliado", -float(linha["Diferenca"]), "relative"))
+    passos.append(("Lucro líquido", float(linha["Lucro_Liquido"]), "total"))
+    return passos
+
+
+def divergent_rows(df, tolerancia=TOLERANCIA):
+    """Linhas cujos componentes não fecham o lucro informado, com a diferença."""
+    diferenca = reconciliation(df)
+    mask = np.abs(diferenca) > tolerancia
+    result = df.loc[mask, ["Data", "Localizacao", "Canal", "Produto"] + MEDIDAS].copy()
+    result["Diferenca"] = diferenca[mask]
+    return result.sort_values("Diferenca", key=np.abs, ascending=False)
@@ -0,0 +1,235 @@
+"""Filtro cruzado com recálculo incremental dos agregados.
+
+O cubo ``loja × canal × produto × dia × medida`` é montado uma vez no
+carregamento e guarda só as células com vendas (uma por combinação presente,
+ordenadas por dia), de modo que a memória cresce com o número de combinações
+vendidas e não com o produto do número de lojas, canais, produtos e dias.
+
+``CrossFilter`` mantém, para a seleção atual, os agregados por loja, por
+canal, por produto e por dia. Como no crossfilter clássico, o agregado de uma
+dimensão aplica os filtros de todas as outras, mas não o dela própria, para
+que o gráfico continue mostrando os valores que podem ser clicados. Ao mudar
+o período, as células do período são somadas em um bloco denso loja × canal
+× produto (sem o eixo dos dias), de onde saem os agregados por dimensão.
+Quando um valor entra ou sai da seleção de uma dimensão, os agregados das
+demais dimensões recebem (ou perdem) só a fatia desse valor no bloco, e a
+série diária só as células desse valor no período, localizadas por um índice
+por dimensão; a reconstrução a partir das fatias selecionadas é usada quando
+sai mais barata (por exemplo, ao passar de "todas as lojas" para uma só).
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from acai.aggregation import group_index
+
+# Eixos do cubo: dimensões filtráveis, dia e medida
+DIMENSOES_CUBO = ["Localizacao", "Canal", "Produto"]
+# ``Linhas`` conta as vendas de cada célula (diz se um valor tem vendas depois de somas e subtrações)
+MEDIDAS_CUBO = ["Valor_Total", "Lucro_Liquido", "Qtd_Vendida", "Clientes_Unicos", "Clientes_Novos", "Linhas"]
+
+# Letras usadas nos índices do einsum (uma por dimensão, depois a medida)
+_LETRAS = "lcp"
+
+
+def build_cube(df):
+    """Células com vendas por loja, canal, produto e dia, com as medidas somadas.
+
+    Retorna ``valores`` (medida × célula), ``combinacao`` (posição de cada
+    célula no bloco loja × canal × produto de tamanho ``forma``), ``dia``
+    (posição em ``datas``, que tem todos os dias corridos), ``dias`` (as
+    células do dia ``t`` são ``dias[t]:dias[t + 1]``), ``indices`` (por
+    dimensão, as células ordenadas pelo valor e o início de cada valor, com
+    os dias em ordem dentro dele), os rótulos e a categoria de cada produto.
+    """
+    combinado, validas, forma, rotulos = group_index(df, ["Data"] + DIMENSOES_CUBO)
+    celulas, inverso = np.unique(combinado, return_inverse=True)
+    valores = np.empty((len(MEDIDAS_CUBO), len(celulas)))
+    for i, col in enumerate(MEDIDAS_CUBO):
+        pesos = None if col == "Linhas" else df[col].to_numpy(dtype=float)[validas]
+        valores[i] = np.bincount(inverso, weights=pesos, minlength=len(celulas))
+
+    # O dia é o primeiro eixo do índice combinado: o resto é a combinação loja × canal × produto
+    dia, combinacao = np.divmod(celulas, int(np.prod(forma[1:])))
+    indices = {}
+    for dim, codigos, tamanho in zip(DIMENSOES_CUBO, np.unravel_index(combinacao, forma[1:]), forma[1:]):
+        # Ordenação estável: dentro de cada valor as células continuam em ordem de dia
+        ordem = np.argsort(codigos, kind="stable").astype(np.int32)
+        indices[dim] = (ordem, np.concatenate([[0], np.cumsum(np.bincount(codigos, minlength=tamanho))]))
+
+    categorias = df.drop_duplicates("Produto").set_index("Produto")["Categoria"]
+    return {
+        "valores": valores,
+        "combinacao": combinacao.astype(np.int32),
+        "dia": dia.astype(np.int32),
+        "dias": np.searchsorted(dia, np.arange(forma[0] + 1)),
+        "indices": indices,
+        "forma": forma[1:],
+        "rotulos": dict(zip(DIMENSOES_CUBO, rotulos[1:])),
+        "datas": pd.DatetimeIndex(rotulos[0]),
+        "categorias": categorias.reindex(rotulos[1 + DIMENSOES_CUBO.index("Produto")]).to_numpy(),
+    }
+
+
+def cube_sums(valores, codigos, tamanho, pesos=None):
+    """Medidas de ``valores`` (medida × célula) somadas por ``codigos``: array ``tamanho × medida``."""
+    somas = np.empty((tamanho, len(valores)))
+    for i, coluna in enumerate(valores):
+        somas[:, i] = np.bincount(codigos, weights=coluna if pesos is None else coluna * pesos, minlength=tamanho)
+    return somas
+
+
+def _reduce(bloco, eixos, mascaras, manter):
+    """Soma ``bloco`` (eixos nomeados por letras) ponderado pelas máscaras, mantendo ``manter`` e a medida."""
+    operandos = [bloco]
+    indices = [eixos + "m"]
+    for letra in eixos:
+        if letra not in manter:
+            operandos.append(mascaras[letra])
+            indices.append(letra)
+    return np.einsum(",".join(indices) + "->" + manter + "m", *operandos, optimize=True)
+
+
+class CrossFilter:
+    """Agregados da seleção atual sobre um cubo de ``build_cube``.
+
+    ``update`` leva a seleção (valores escolhidos por dimensão) e o período ao
+    novo estado e registra em ``ultima_atualizacao`` o modo usado, o número de
+    fatias somadas ou subtraídas e o tempo gasto.
+    """
+
+    def __init__(self, cubo):
+        self.cubo = cubo
+        self.periodo = None
+        self.selecao = None
+        self.ultima_atualizacao = None
+
+    def _mascara(self, dim, valores):
+        return np.isin(self.cubo["rotulos"][dim], list(valores)).astype(float)
+
+    def _daily(self, celulas, fora):
+        """Medidas por dia das ``celulas``, ponderadas pelas máscaras das dimensões fora de ``fora``."""
+        t0, t1 = self.periodo
+        pesos = None
+        if any(letra not in fora and not self._mascaras[letra].all() for letra in _LETRAS):
+            mascaras = [np.ones_like(self._mascaras[letra]) if letra in fora else self._mascaras[letra] for letra in _LETRAS]
+            pesos = np.einsum("l,c,p->lcp", *mascaras).ravel()[self.cubo["combinacao"][celulas]]
+        return cube_sums(self.cubo["valores"][:, celulas], self.cubo["dia"][celulas] - t0, t1 - t0, pesos)
+
+    def _cells_of(self, dim, posicoes):
+        """Células do período com os valores ``posicoes`` de ``dim`` (pelo índice da dimensão)."""
+        ordem, inicios = self.cubo["indices"][dim]
+        dias = self.cubo["dia"]
+        t0, t1 = self.periodo
+        partes = []
+        for pos in posicoes:
+            bloco = ordem[inicios[pos]:inicios[pos + 1]]
+            dias_bloco = dias[bloco]
+            partes.append(bloco[dias_bloco.searchsorted(t0):dias_bloco.searchsorted(t1)])
+        return np.concatenate(partes) if partes else np.array([], dtype=np.int32)
+
+    def _recompute(self):
+        """Soma as células do período no bloco loja × canal × produto e recalcula todos os agregados."""
+        dias = self.cubo["dias"]
+        celulas = slice(dias[self.periodo[0]], dias[self.periodo[1]])
+        forma = self.cubo["forma"]
+        somas = cube_sums(self.cubo["valores"][:, celulas], self.cubo["combinacao"][celulas], int(np.prod(forma)))
+        self._bloco = somas.reshape(forma + (len(MEDIDAS_CUBO),))
+        self._por_dim = {
+            letra: _reduce(self._bloco, _LETRAS, self._mascaras, letra) for letra in _LETRAS
+        }
+        self._por_dia = self._daily(celulas, "")
+
+    def _apply(self, letra, posicoes, sinal):
+        """Soma (``sinal=1``) ou subtrai (``-1``) as fatias de ``posicoes`` em ``letra``."""
+        eixo = _LETRAS.index(letra)
+        fatia = np.take(self._bloco, posicoes, axis=eixo).sum(axis=eixo) * sinal
+        restantes = _LETRAS.replace(letra, "")
+        for outra in restantes:
+            self._por_dim[outra] += _reduce(fatia, restantes, self._mascaras, outra)
+        self._por_dia += sinal * self._daily(self._cells_of(DIMENSOES_CUBO[eixo], posicoes), letra)
+
+    def _rebuild_from(self, letra, posicoes):
+        """Zera os agregados que dependem de ``letra`` e soma só as fatias selecionadas."""
+        for outra in _LETRAS.replace(letra, ""):
+            self._por_dim[outra][:] = 0
+        self._por_dia[:] = 0
+        if len(posicoes):
+            self._apply(letra, posicoes, 1)
+
+    def update(self, inicio, fim, selecao):
+        """Leva os agregados ao período ``[inicio, fim]`` e à ``selecao`` (dimensão -> valores)."""
+        comeco = time.perf_counter()
+        datas = self.cubo["datas"]
+        periodo = (
+            int(datas.searchsorted(pd.to_datetime(inicio), side="left")),
+            int(datas.searchsorted(pd.to_datetime(fim), side="right")),
+        )
+        selecao = {dim: frozenset(selecao[dim]) for dim in DIMENSOES_CUBO}
+
+        if periodo != self.periodo or self.selecao is None:
+            self.periodo, self.selecao = periodo, selecao
+            self._mascaras = {
+                letra: self._mascara(dim, selecao[dim]) for letra, dim in zip(_LETRAS, DIMENSOES_CUBO)
+            }
+            self._recompute()
+            self.ultima_atualizacao = {"modo": "completo", "fatias": None, "tempo": time.perf_counter() - comeco}
+            return self.ultima_atualizacao
+
+        fatias = 0
+        for letra, dim in zip(_LETRAS, DIMENSOES_CUBO):
+            antes, depois = self.selecao[dim], selecao[dim]
+            if antes == depois:
+                continue
+            rotulos = self.cubo["rotulos"][dim]
+            novos = np.flatnonzero(np.isin(rotulos, list(depois - antes)))
+            removidos = np.flatnonzero(np.isin(rotulos, list(antes - depois)))
+            selecionados = np.flatnonzero(np.isin(rotulos, list(depois)))
+            # A máscara da própria dimensão não entra nas fatias dela
+            if len(novos) + len(removidos) <= len(selecionados):
+                if len(novos):
+                    self._apply(letra, novos, 1)
+                if len(removidos):
+                    self._apply(letra, removidos, -1)
+                fatias += len(novos) + len(removidos)
+            else:
+                self._rebuild_from(letra, selecionados)
+                fatias += len(selecionados)
+            self._mascaras[letra] = self._mascara(dim, depois)
+        self.selecao = selecao
+
+        self.ultima_atualizacao = {"modo": "incremental", "fatias": fatias, "tempo": time.perf_counter() - comeco}
+        return self.ultima_atualizacao
+
+    def totals(self):
+        """Totais das medidas na seleção atual."""
+        return pd.Series(self._por_dia.sum(axis=0), index=MEDIDAS_CUBO)
+
+    def by(self, dim):
+        """Medidas por valor de ``dim`` (com os filtros das outras dimensões) e se o valor está selecionado."""
+        rotulos = self.cubo["rotulos"][dim]
+        letra = _LETRAS[DIMENSOES_CUBO.index(dim)]
+        resultado = pd.DataFrame(self._por_dim[letra], columns=MEDIDAS_CUBO)
+        resultado.insert(0, dim, rotulos)
+        resultado["Selecionado"] = self._mascaras[letra].astype(bool)
+        return resultado
+
+    def selected(self, dim):
+        """Medidas dos valores selecionados de ``dim`` com vendas no período (todos os filtros aplicados).
+
+        É o mesmo agrupamento das linhas filtradas por ``dim``; os produtos
+        trazem também a ``Categoria``.
+        """
+        resultado = self.by(dim)
+        if dim == "Produto":
+            resultado.insert(1, "Categoria", self.cubo["categorias"])
+        com_vendas = resultado["Linhas"].to_numpy() > 0.5
+        return resultado[resultado["Selecionado"].to_numpy() & com_vendas].drop(columns="Selecionado").reset_index(drop=True)
+
+    def daily(self):
+        """Medidas por dia do período na seleção atual."""
+        datas = self.cubo["datas"][self.periodo[0]:self.periodo[1]]
+        resultado = pd.DataFrame(self._por_dia, columns=MEDIDAS_CUBO)
+        resultado.insert(0, "Data", datas)
+        return resultado
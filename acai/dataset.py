@@ -0,0 +1,70 @@
+"""Carga do arquivo de vendas e dos agregados pré-calculados sobre ele.
+
+Usado pelo dashboard e pela API: os dois leem o mesmo conjunto de dados
+tipado e os mesmos agregados.
+"""
+
+from acai.aggregation import encode_dimensions
+from acai.calendar import build_calendar
+from acai.capacity import daily_capacity
+from acai.crossfilter import build_cube
+from acai.delivery import build_delivery_cells
+from acai.rollups import build_rollups
+from acai.sketches import build_sketches
+from acai.validation import read_validated
+
+ARQUIVO_DADOS = "vendas_acai_5_anos_completo.csv"
+
+
+def load_data(caminho=ARQUIVO_DADOS, colunas=None, separador=","):
+    """Lê e valida o CSV de vendas e cria as colunas derivadas usadas nas análises.
+
+    ``colunas`` e ``separador`` descrevem o esquema do arquivo (veja
+    ``acai.registry``). Retorna os dados sem as linhas em quarentena e o
+    resumo de qualidade de ``read_validated``.
+    """
+    df, qualidade = read_validated(caminho, colunas, separador)
+    
+    # Criar colunas adicionais para análise
+    df['Ano'] = df['Data'].dt.year
+    df['Mes'] = df['Data'].dt.month
+    df['Mes_Nome'] = df['Data'].dt.month_name()
+    df['Dia_Semana'] = df['Data'].dt.day_name()
+    df['Semana'] = df['Data'].dt.isocalendar().week
+    df['Dia'] = df['Data'].dt.day
+    
+    # Mapear dimensões para códigos inteiros (usados pelo kernel de agregação)
+    df = encode_dimensions(df)
+    
+    # Calcular métricas adicionais
+    df['Rentabilidade'] = (df['Lucro_Liquido'] / df['Valor_Total']) * 100
+    df['Taxa_Retorno'] = df['Cliente_Novo'].apply(lambda x: 0 if x else 1)
+    df['Clientes_Novos'] = df['Clientes_Unicos'].where(df['Cliente_Novo'], 0)
+    
+    # Calcular eficiência operacional (Valor produzido por minuto de preparo)
+    df['Eficiencia_Operacional'] = df['Valor_Total'] / df['Tempo_Preparo'].replace(0, 1)
+    
+    return df, qualidade
+
+
+def build_dataset(caminho=ARQUIVO_DADOS, colunas=None, separador=","):
+    """Dados tipados e agregados pré-calculados de uma versão do arquivo."""
+    df, qualidade = load_data(caminho, colunas, separador)
+    cubo = build_cube(df)
+    return {
+        "df": df,
+        # Resumo da validação (quarentena, alertas e motivos)
+        "qualidade": qualidade,
+        # Agregados temporais materializados (dia → semana → mês → ano) por loja e canal
+        "rollups": build_rollups(df),
+        # Agregado diário por loja com atendimentos, capacidade e equipe
+        "capacidade": daily_capacity(df),
+        # Células de entrega (dia, loja, canal, faixa de distância, faixa de tempo)
+        "entregas": build_delivery_cells(df),
+        # Esboços de quantis por (dia, loja, canal) para tempos de preparo/entrega e ticket
+        "quantis": build_sketches(df),
+        # Cubo loja × canal × produto × dia do filtro cruzado (só as células com vendas)
+        "cubo": cubo,
+        # Calendário denso loja × canal × dia (dias sem vendas com zero)
+        "calendario": build_calendar(cubo),
+    }
@@ -0,0 +1,117 @@
+"""Desempenho das entregas: custo por km, tempo × distância e atrasos (SLA).
+
+Só os pedidos entregues entram (``delivery_rows``): as vendas de balcão não
+têm distância nem tempo de entrega e diluiriam as métricas. Esses pedidos
+são agrupados uma única vez em células (dia, loja, canal, faixa de
+distância, faixa de tempo) com o número de pedidos e as somas de distância,
+tempo e custo de entrega. Os filtros de período, loja e canal apenas
+selecionam células, e todas as métricas saem do histograma de tempo de cada
+faixa de distância, sem voltar às linhas.
+"""
+import numpy as np
+import pandas as pd
+
+from acai.aggregation import aggregate, group_index
+
+# Faixas de distância [borda_i, borda_i+1) em km
+DISTANCIA_BORDAS = np.array([0, 2, 4, 6, 8, 10, 15])
+
+# Faixas de tempo (borda_i, borda_i+1] em minutos; a última é aberta (> 120)
+TEMPO_BORDAS = np.arange(0, 125, 5)
+
+CELULA = ["Data", "Localizacao", "Canal", "Faixa_Distancia", "Faixa_Tempo"]
+
+SOMAS = ["Distancia_Entrega", "Tempo_Entrega", "Custo_Entrega"]
+
+# Canal das vendas no balcão (sem entrega)
+CANAL_BALCAO = "Loja Física"
+
+
+def distance_labels():
+    """Rótulos das faixas de distância, na ordem dos códigos."""
+    bordas = list(DISTANCIA_BORDAS)
+    return [f"{a}–{b} km" for a, b in zip(bordas, bordas[1:])] + [f"{bordas[-1]}+ km"]
+
+
+def distance_bins(distancia):
+    return np.searchsorted(DISTANCIA_BORDAS, np.asarray(distancia), side="right") - 1
+
+
+def time_bins(tempo):
+    return np.maximum(np.searchsorted(TEMPO_BORDAS, np.asarray(tempo), side="left") - 1, 0)
+
+
+def delivery_rows(df):
+    """Máscara dos pedidos entregues: fora do balcão e com distância de entrega."""
+    return (df["Canal"] != CANAL_BALCAO).to_numpy() & (df["Distancia_Entrega"].to_numpy(dtype=float) > 0)
+
+
+def build_delivery_cells(df):
+    """Células (dia, loja, canal, faixa de distância, faixa de tempo) dos pedidos entregues."""
+    df = df[delivery_rows(df)]
+    frame = df[["Data", "Localizacao", "Canal"] + SOMAS].assign(
+        Faixa_Distancia=distance_bins(df["Distancia_Entrega"]),
+        Faixa_Tempo=time_bins(df["Tempo_Entrega"])
+    )
+    agg = {col: "sum" for col in SOMAS}
+    agg["Pedidos"] = "count"
+    return aggregate(frame, CELULA, agg)
+
+
+def _time_quantile(hist, q):
+    """Quantil ``q`` do tempo por grupo a partir do histograma grupos × faixas de tempo.
+
+    Interpola linearmente dentro da faixa; a faixa aberta usa a sua borda inferior.
+    """
+    total = hist.sum(axis=1)
+    acumulado = np.cumsum(hist, axis=1)
+    alvo = q * total
+    faixa = np.minimum((acumulado < alvo[:, None]).sum(axis=1), hist.shape[1] - 1)
+
+    linhas = np.arange(len(hist))
+    antes = np.where(faixa > 0, acumulado[linhas, np.maximum(faixa - 1, 0)], 0.0)
+    dentro = hist[linhas, faixa]
+    fracao = np.divide(alvo - antes, dentro, out=np.zeros_like(alvo), where=dentro > 0)
+
+    largura = np.diff(TEMPO_BORDAS)[0]
+    inicio = TEMPO_BORDAS[np.minimum(faixa, len(TEMPO_BORDAS) - 1)]
+    fracao = np.where(faixa >= len(TEMPO_BORDAS) - 1, 0.0, fracao)
+    return np.where(total > 0, inicio + fracao * largura, np.nan)
+
+
+def delivery_stats(celulas, by, sla=45):
+    """Métricas de entrega por grupo de ``by`` a partir das células.
+
+    Retorna pedidos, custo por km, tempo médio e P90, distância média e a
+    proporção de pedidos acima do ``sla`` (minutos, múltiplo de 5).
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    colunas = by + ["Pedidos", "Custo_Km", "Custo_Medio", "Distancia_Media", "Tempo_Medio", "Tempo_P90", "Pct_Atraso"]
+    if celulas.empty:
+        return pd.DataFrame(columns=colunas)
+
+    atrasado = celulas["Faixa_Tempo"].to_numpy() >= sla // (TEMPO_BORDAS[1] - TEMPO_BORDAS[0])
+    frame = celulas.assign(Atrasos=np.where(atrasado, celulas["Pedidos"], 0))
+    agg = {col: "sum" for col in SOMAS + ["Pedidos", "Atrasos"]}
+    result = aggregate(frame, by, agg)
+
+    # Histograma de tempo por grupo, alinhado às linhas do resultado
+    groups, valid, shape, _ = group_index(frame, by)
+    n_faixas = len(TEMPO_BORDAS)
+    hist = np.bincount(
+        groups * n_faixas + frame["Faixa_Tempo"].to_numpy()[valid],
+        weights=frame["Pedidos"].to_numpy(dtype=float)[valid],
+        minlength=int(np.prod(shape)) * n_faixas
+    ).reshape(-1, n_faixas)
+    hist = hist[np.flatnonzero(hist.sum(axis=1) > 0)]
+
+    pedidos = result["Pedidos"].to_numpy(dtype=float)
+    distancia = result["Distancia_Entrega"].to_numpy(dtype=float)
+    custo = result["Custo_Entrega"].to_numpy(dtype=float)
+    result["Custo_Km"] = np.divide(custo, distancia, out=np.full_like(custo, np.nan), where=distancia > 0)
+    result["Custo_Medio"] = custo / pedidos
+    result["Distancia_Media"] = distancia / pedidos
+    result["Tempo_Medio"] = result["Tempo_Entrega"] / pedidos
+    result["Tempo_P90"] = _time_quantile(hist, 0.9)
+    result["Pct_Atraso"] = result["Atrasos"] / pedidos * 100
+    return result[colunas]
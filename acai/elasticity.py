@@ -0,0 +1,85 @@
+"""Elasticidade-preço da demanda por produto e canal (opcionalmente por loja).
+
+Para cada grupo ajusta-se log(quantidade diária) = a + b · log(preço médio do
+dia), onde b é a elasticidade. Em vez de um modelo por grupo, todas as
+regressões são resolvidas juntas a partir das somas suficientes (n, Σx, Σy,
+Σx², Σxy, Σy²) acumuladas por grupo com ``np.bincount``.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from acai.aggregation import aggregate, group_index
+
+GRUPOS = ["Produto", "Canal"]
+
+
+def t_critical(gl, z=1.959964):
+    """Quantil 97,5% da t de Student (expansão de Cornish-Fisher, sem SciPy)."""
+    gl = np.maximum(np.asarray(gl, dtype=float), 1.0)
+    return (z
+            + (z ** 3 + z) / (4 * gl)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * gl ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * gl ** 3))
+
+
+def price_elasticity(df, by=GRUPOS, min_obs=10):
+    """Ajusta as regressões log-log de todos os grupos de uma vez.
+
+    Cada observação é um dia do grupo: quantidade vendida total e preço médio
+    ponderado (Valor_Total / Qtd_Vendida). Grupos com menos de ``min_obs`` dias
+    ou sem variação de preço ficam de fora. O tempo de ajuste fica em
+    ``resultado.attrs["tempo"]``.
+    """
+    inicio = time.perf_counter()
+    by = list(by)
+    colunas = by + ["Elasticidade", "IC_Inferior", "IC_Superior", "Erro_Padrao", "R2", "Observacoes"]
+
+    diario = aggregate(df, by + ["Data"], {"Valor_Total": "sum", "Qtd_Vendida": "sum"}, as_category=True)
+    diario = diario[(diario["Qtd_Vendida"] > 0) & (diario["Valor_Total"] > 0)]
+    if diario.empty:
+        result = pd.DataFrame(columns=colunas)
+        result.attrs["tempo"] = time.perf_counter() - inicio
+        return result
+
+    qtd = diario["Qtd_Vendida"].to_numpy(dtype=float)
+    x = np.log(diario["Valor_Total"].to_numpy(dtype=float) / qtd)
+    y = np.log(qtd)
+
+    groups, _, shape, labels = group_index(diario, by)
+    size = int(np.prod(shape))
+
+    def soma(pesos=None):
+        return np.bincount(groups, weights=pesos, minlength=size)
+
+    n = soma()
+    sx, sy = soma(x), soma(y)
+    sxx, sxy, syy = soma(x * x), soma(x * y), soma(y * y)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        Sxx = sxx - sx ** 2 / n
+        Sxy = sxy - sx * sy / n
+        Syy = syy - sy ** 2 / n
+        b = Sxy / Sxx
+        residuo = np.maximum(Syy - b * Sxy, 0.0) / (n - 2)
+        erro = np.sqrt(residuo / Sxx)
+        r2 = np.where(Syy > 0, b * Sxy / Syy, 0.0)
+
+    # Exige observações suficientes e alguma variação de preço
+    ok = (n >= max(min_obs, 3)) & (Sxx > 1e-12)
+    idx = np.flatnonzero(ok)
+    margem = t_critical(n[idx] - 2) * erro[idx]
+
+    positions = np.unravel_index(idx, shape)
+    result = pd.DataFrame({col: lab[pos] for col, lab, pos in zip(by, labels, positions)})
+    result["Elasticidade"] = b[idx]
+    result["IC_Inferior"] = b[idx] - margem
+    result["IC_Superior"] = b[idx] + margem
+    result["Erro_Padrao"] = erro[idx]
+    result["R2"] = r2[idx]
+    result["Observacoes"] = n[idx].astype(np.int64)
+
+    result = result.sort_values("Elasticidade").reset_index(drop=True)
+    result.attrs["tempo"] = time.perf_counter() - inicio
+    return result
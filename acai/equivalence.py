@@ -0,0 +1,692 @@
+"""Equivalência e desempenho dos motores contra as contas originais em pandas.
+
+    python -m acai.equivalence                 # compara e confere a referência de tempo
+    python -m acai.equivalence --atualizar     # grava os tempos como nova referência
+
+Os motores de ``acai`` (kernel de agregação, agregados temporais, cubo do
+filtro cruzado, esboços de quantis, ranking) precisam mostrar os mesmos
+números que as contas em pandas do dashboard original. Para cada conjunto
+de dados sintético (``CONJUNTOS``, gerados com semente fixa e carregados pelo
+mesmo ``build_dataset`` do dashboard) e cada cenário de filtros
+(``cenarios``), cada etapa roda das duas formas:
+
+- ``kpis``: cards de vendas, lucro, ticket médio e novos clientes com o
+  período anterior;
+- ``quebras``: tabelas por canal, loja, produto e categoria;
+- ``diario`` e ``mensal``: séries da tendência (pelos agregados temporais
+  quando só há filtro de loja e canal);
+- ``top_produtos``: top 10 produtos;
+- ``filtro_cruzado``: agregados por loja, canal e produto do cubo;
+- ``calendario``: série diária do calendário denso, com zero nos dias sem vendas;
+- ``quantis``: P50/P90/P99 dos esboços contra os quantis exatos;
+- ``custos``: receita, componentes de custo e lucro;
+- ``insights``: textos do resumo de insights.
+
+Os resultados são comparados com tolerância numérica (``TOLERANCIAS``); os
+tempos (melhor de ``--repeticoes``) e o pico de memória (``tracemalloc``)
+de cada lado são registrados. O comando termina com código 1 se algum
+resultado divergir, se uma etapa dos motores for mais lenta que a conta em
+pandas (ou, nas etapas de ``GANHO_MEMORIA``, usar mais memória) ou se uma
+etapa regredir em relação à referência gravada. Uma regressão exige que o
+tempo dos motores passe da referência além da tolerância *e* que a razão
+motores/pandas, medidas alternadamente na mesma execução, também passe: uma
+máquina momentaneamente mais lenta atrasa os dois lados e não conta como
+regressão. A referência só protege contra regressões em relação à última
+gravação; o confronto com o pandas impede que uma etapa mais lenta seja
+gravada como referência. Como no ``acai.startup``, grave a referência no
+mesmo ambiente em que a comparação vai rodar.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from acai.aggregation import aggregate
+from acai.calendar import build_calendar, calendar_series
+from acai.costs import COMPONENTES, cost_breakdown
+from acai.crossfilter import DIMENSOES_CUBO, CrossFilter
+from acai.dataset import build_dataset
+from acai.delivery import delivery_rows
+from acai.filters import date_rows, default_filters, filter_rows, value_rows
+from acai.kpis import breakdown, kpi_summary, period_totals
+from acai.ranking import rank_products, top_k
+from acai.rollups import query
+from acai.sketches import ALFA, sketch_quantiles
+
+REFERENCIA = os.path.join("benchmarks", "equivalence.json")
+TOLERANCIA = 0.3
+REPETICOES = 3
+
+# Folga absoluta (s) no limite de tempo, para que etapas de poucos milissegundos não oscilem
+FOLGA = 0.005
+
+# Conjuntos sintéticos: nome -> (linhas, semente)
+CONJUNTOS = {
+    "pequeno": (20_000, 1),
+    "medio": (200_000, 2),
+}
+
+# Etapas cujo ganho declarado é de memória e não de tempo: os esboços de
+# quantis têm quase tantas células quanto linhas em conjuntos pequenos
+GANHO_MEMORIA = {"quantis"}
+
+# Tolerância relativa por etapa (somas em outra ordem e esboços com erro relativo ALFA)
+TOLERANCIAS = {
+    "quantis": 2 * ALFA,
+}
+RTOL = 1e-9
+ATOL = 1e-6
+
+PRODUTOS = [f"Açaí {i}" for i in range(20)]
+CATEGORIAS = ["Tradicional", "Premium", "Fit"]
+LOJAS = ["Aeroporto", "Bairro Norte", "Centro", "Praia", "Shopping"]
+CANAIS = ["Loja Física", "Delivery", "iFood", "Rappi"]
+PLATAFORMAS = ["iFood", "Rappi"]
+
+DIAS_PTBR = {
+    'Monday': 'Segunda-feira', 'Tuesday': 'Terça-feira', 'Wednesday': 'Quarta-feira',
+    'Thursday': 'Quinta-feira', 'Friday': 'Sexta-feira', 'Saturday': 'Sábado', 'Sunday': 'Domingo'
+}
+
+
+def synthetic_sales(linhas, seed=0, dias=730, inicio="2022-01-01"):
+    """Vendas sintéticas no formato do CSV, com buracos de propósito.
+
+    A Praia não vende pelo Rappi e alguns dias não têm nenhuma venda, para
+    que os motores lidem com combinações e dias vazios. As datas vêm como
+    DD/MM/AAAA, com dias acima de 12, para que uma carga que troque dia e mês
+    apareça em ``load_differences``.
+    """
+    rng = np.random.default_rng(seed)
+    categoria_produto = rng.choice(CATEGORIAS, len(PRODUTOS))
+
+    dia = rng.integers(0, dias, linhas)
+    dia = np.where(dia % 97 == 0, dia + 1, dia)
+    produto = rng.integers(0, len(PRODUTOS), linhas)
+    loja = rng.integers(0, len(LOJAS), linhas)
+    canal = rng.integers(0, len(CANAIS), linhas)
+    canal = np.where((loja == LOJAS.index("Praia")) & (canal == CANAIS.index("Rappi")), CANAIS.index("iFood"), canal)
+
+    nomes_canal = np.array(CANAIS)[canal]
+    balcao = nomes_canal == "Loja Física"
+    plataforma = np.isin(nomes_canal, PLATAFORMAS)
+    promocao = rng.random(linhas) < 0.2
+
+    qtd = rng.integers(1, 6, linhas)
+    preco = np.round(rng.uniform(15, 40, linhas), 2)
+    valor = np.round(qtd * preco, 2)
+    materiais = np.round(valor * rng.uniform(0.3, 0.4, linhas), 2)
+    distancia = np.where(balcao, 0, rng.integers(1, 16, linhas))
+    entrega = np.where(balcao, 0.0, np.round(distancia * rng.uniform(0.3, 0.6, linhas), 2))
+    desconto = np.round(valor * 0.02, 2)
+    taxa = np.where(plataforma, np.round(valor * 0.27, 2), 0.0)
+    comissao = np.round(valor * 0.05, 2)
+    desconto_promocao = np.where(promocao, np.round(valor * 0.1, 2), 0.0)
+    lucro = np.round(valor - taxa - materiais - entrega - comissao - desconto - desconto_promocao, 2)
+    clientes = rng.integers(1, 5, linhas)
+
+    return pd.DataFrame({
+        "Data": (pd.Timestamp(inicio) + pd.to_timedelta(dia, unit="D")).strftime("%d/%m/%Y"),
+        "Produto": np.array(PRODUTOS)[produto],
+        "Categoria": categoria_produto[produto],
+        "Localizacao": np.array(LOJAS)[loja],
+        "Canal": nomes_canal,
+        "Qtd_Vendida": qtd,
+        "Preco_Unitario": preco,
+        "Valor_Total": valor,
+        "Custo_Materiais": materiais,
+        "Custo_Entrega": entrega,
+        "Receita_Liquida": np.round(valor - desconto, 2),
+        "Receita_Loja": np.round(valor - desconto - taxa, 2),
+        "Desconto_Cliente": desconto,
+        "Taxa_Plataforma": taxa,
+        "Lucro_Liquido": lucro,
+        "Funcionarios": rng.integers(2, 9, linhas),
+        "Comissao_Func": comissao,
+        "Tempo_Preparo": rng.integers(5, 16, linhas),
+        "Distancia_Entrega": distancia,
+        "Clientes_Unicos": clientes,
+        "Pessoas_Atendidas": clientes + rng.integers(0, 3, linhas),
+        "Tempo_Entrega": np.where(balcao, 0, distancia * 3 + rng.integers(5, 20, linhas)),
+        "Valor_Ticket_Medio": np.round(valor / clientes, 2),
+        "Cliente_Novo": rng.random(linhas) < 0.3,
+        "Capacidade_Max": rng.integers(40, 81, linhas),
+        "Promocao": promocao,
+        "Desconto_Promocao": desconto_promocao,
+        "Qtde_Desconto": np.where(promocao, 1, 0),
+    })
+
+
+def cenarios(df):
+    """Cenários de filtros (período e seleções da barra lateral) sobre ``df``."""
+    produtos, categorias, lojas, canais = default_filters(df)
+    fim = df["Data"].max()
+    # Início no primeiro dia de um mês e no meio do mês seguinte: os agregados
+    # mensais só respondem o primeiro; o segundo precisa cair no nível diário
+    mes = (fim - timedelta(days=180)).to_period("M").start_time
+    return {
+        "tudo": (df["Data"].min(), fim, produtos, categorias, lojas, canais),
+        "90 dias": (fim - timedelta(days=90), fim, produtos, categorias, lojas, canais),
+        "uma loja": (fim - timedelta(days=365), fim, produtos, categorias, lojas[:1], canais),
+        "lojas e canais": (fim - timedelta(days=30), fim, produtos, categorias, lojas[1:4], canais[:2]),
+        "produtos": (fim - timedelta(days=180), fim, produtos[::3], categorias[:2], lojas, canais),
+        "7 dias": (fim - timedelta(days=7), fim, produtos, categorias, lojas, canais),
+        "meses cheios": (mes, fim, produtos, categorias, lojas, canais),
+        "meio do mês": (mes + pd.DateOffset(months=1, days=14), fim, produtos, categorias, lojas[:2], canais),
+    }
+
+
+def _filter(df, inicio, fim, produtos, categorias, lojas, canais):
+    """Filtro do dashboard original."""
+    return df[
+        (df["Data"] >= pd.to_datetime(inicio)) &
+        (df["Data"] <= pd.to_datetime(fim)) &
+        (df["Produto"].isin(produtos)) &
+        (df["Categoria"].isin(categorias)) &
+        (df["Localizacao"].isin(lojas)) &
+        (df["Canal"].isin(canais))
+    ]
+
+
+def _filtered(dados, cenario):
+    """Linhas do cenário pelo filtro dos motores (uma máscara sobre os códigos das dimensões).
+
+    As etapas que só usam as linhas filtradas não pagam pelas linhas e totais
+    dos períodos de comparação de ``period_view``, que no dashboard são
+    calculados uma vez e compartilhados por todas as seções.
+    """
+    return dados["df"][filter_rows(dados["df"], *cenario)]
+
+
+def _groupby(df, by, agg):
+    return df.groupby(by, observed=True).agg(agg).reset_index()
+
+
+def _keyed(frame, chaves):
+    """``frame`` indexado pelas chaves em texto (categóricas e objetos comparam igual)."""
+    frame = frame.copy()
+    for chave in chaves:
+        frame[chave] = frame[chave].astype(str)
+    return frame.set_index(chaves).sort_index()
+
+
+# Etapas: cada uma tem a conta original em pandas e a conta pelos motores
+
+def reference_kpis(df, cenario):
+    inicio, fim, *filtros = cenario
+    atual = _filter(df, inicio, fim, *filtros)
+    dias = (pd.to_datetime(fim) - pd.to_datetime(inicio)).days
+    anterior = _filter(df, pd.to_datetime(inicio) - timedelta(days=dias), pd.to_datetime(inicio) - timedelta(days=1), *filtros)
+
+    def valores(frame):
+        clientes = frame["Clientes_Unicos"].sum()
+        return {
+            "vendas": frame["Valor_Total"].sum(),
+            "lucro": frame["Lucro_Liquido"].sum(),
+            "ticket_medio": frame["Valor_Total"].sum() / clientes if clientes > 0 else 0,
+            "novos_clientes": frame[frame["Cliente_Novo"] == True]["Clientes_Unicos"].sum(),  # noqa: E712
+        }
+
+    a, b = valores(atual), valores(anterior)
+    return {
+        nome: {"valor": a[nome], "base": b[nome], "variacao": (a[nome] - b[nome]) / b[nome] * 100 if b[nome] > 0 else 0}
+        for nome in a
+    }
+
+
+def engine_kpis(dados, cenario):
+    inicio, fim, *filtros = cenario
+    totais = period_totals(dados["df"], inicio, fim, None, filtros)
+    return kpi_summary(totais["totais_periodos"], "Período anterior")
+
+
+QUEBRAS = ["Canal", "Localizacao", "Produto", "Categoria"]
+
+
+def reference_breakdowns(df, cenario):
+    filtrado = _filter(df, *cenario)
+    resultado = {}
+    for dim in QUEBRAS:
+        tabela = _groupby(filtrado, dim, {"Valor_Total": "sum", "Lucro_Liquido": "sum", "Qtd_Vendida": "sum", "Clientes_Unicos": "sum"})
+        tabela["Margem"] = (tabela["Lucro_Liquido"] / tabela["Valor_Total"]) * 100
+        tabela["Ticket_Medio"] = tabela["Valor_Total"] / tabela["Clientes_Unicos"]
+        resultado[dim] = _keyed(tabela, [dim])
+    return resultado
+
+
+def engine_breakdowns(dados, cenario):
+    filtrado = _filtered(dados, cenario)
+    return {dim: _keyed(breakdown(filtrado, dim), [dim]) for dim in QUEBRAS}
+
+
+def _rollup_query(dados, cenario, grao):
+    """Agregados temporais quando só há filtros de loja e canal; senão o kernel sobre as linhas."""
+    inicio, fim, produtos, categorias, lojas, canais = cenario
+    todos = default_filters(dados["df"])
+    if list(produtos) == list(todos[0]) and list(categorias) == list(todos[1]):
+        return query(dados["rollups"], grao, inicio, fim, lojas, canais)
+    filtrado = _filtered(dados, cenario)
+    chaves = {"dia": ["Data"], "mes": ["Ano", "Mes"]}[grao]
+    return aggregate(filtrado, chaves, {m: "sum" for m in ["Valor_Total", "Lucro_Liquido", "Qtd_Vendida", "Clientes_Unicos"]})
+
+
+def reference_daily(df, cenario):
+    filtrado = _filter(df, *cenario)
+    return _keyed(_groupby(filtrado, "Data", {"Valor_Total": "sum", "Lucro_Liquido": "sum"}), ["Data"])
+
+
+def engine_daily(dados, cenario):
+    inicio, fim = pd.to_datetime(cenario[0]), pd.to_datetime(cenario[1])
+    resultado = _rollup_query(dados, cenario, "dia")
+    resultado = resultado[(resultado["Data"] >= inicio) & (resultado["Data"] <= fim)]
+    return _keyed(resultado[["Data", "Valor_Total", "Lucro_Liquido"]], ["Data"])
+
+
+def reference_monthly(df, cenario):
+    filtrado = _filter(df, *cenario)
+    mensal = _groupby(filtrado, ["Ano", "Mes"], {"Valor_Total": "sum", "Lucro_Liquido": "sum", "Qtd_Vendida": "sum"})
+    return _keyed(mensal, ["Ano", "Mes"])
+
+
+def engine_monthly(dados, cenario):
+    # Sem alinhar o início ao mês: períodos que cortam um mês precisam sair do nível diário
+    resultado = _rollup_query(dados, cenario, "mes")
+    return _keyed(resultado[["Ano", "Mes", "Valor_Total", "Lucro_Liquido", "Qtd_Vendida"]], ["Ano", "Mes"])
+
+
+def reference_top_products(df, cenario):
+    filtrado = _filter(df, *cenario)
+    produtos = _groupby(filtrado, ["Produto", "Categoria"], {"Valor_Total": "sum", "Qtd_Vendida": "sum", "Lucro_Liquido": "sum"})
+    top = produtos.sort_values("Valor_Total", ascending=False).head(10)
+    return {"ordem": top["Produto"].astype(str).tolist(), "valores": top["Valor_Total"].to_numpy()}
+
+
+def engine_top_products(dados, cenario):
+    filtrado = _filtered(dados, cenario)
+    agregado = aggregate(filtrado, ["Produto", "Categoria"], {"Valor_Total": "sum", "Qtd_Vendida": "sum", "Lucro_Liquido": "sum"})
+    top = rank_products(agregado, 10, outros=False)
+    return {"ordem": top["Produto"].astype(str).tolist(), "valores": top["Valor_Total"].to_numpy()}
+
+
+MEDIDAS_CRUZADAS = ["Valor_Total", "Lucro_Liquido", "Qtd_Vendida", "Clientes_Unicos", "Clientes_Novos"]
+
+
+def reference_crossfilter(df, cenario):
+    inicio, fim, produtos, categorias, lojas, canais = cenario
+    selecao = {"Localizacao": lojas, "Canal": canais, "Produto": produtos}
+    # O filtro de categoria entra na seleção de produtos, então não vale para o gráfico de produtos
+    selecao["Produto"] = df.loc[df["Produto"].isin(produtos) & df["Categoria"].isin(categorias), "Produto"].unique()
+    base = df[(df["Data"] >= pd.to_datetime(inicio)) & (df["Data"] <= pd.to_datetime(fim))]
+    resultado = {}
+    for dim in DIMENSOES_CUBO:
+        mascara = np.ones(len(base), dtype=bool)
+        for outra in DIMENSOES_CUBO:
+            if outra != dim:
+                mascara &= base[outra].isin(selecao[outra]).to_numpy()
+        tabela = _keyed(_groupby(base[mascara], dim, {m: "sum" for m in MEDIDAS_CRUZADAS}), [dim])
+        # O motor lista todos os valores da dimensão, com zero quando não há vendas
+        todos = sorted(df[dim].astype(str).unique())
+        resultado[dim] = tabela.reindex(todos, fill_value=0).rename_axis(dim)
+    return resultado
+
+
+def engine_crossfilter(dados, cenario):
+    inicio, fim, produtos, categorias, lojas, canais = cenario
+    cubo = dados["cubo"]
+    categoria_produto = dict(zip(cubo["rotulos"]["Produto"], cubo["categorias"]))
+    motor = CrossFilter(cubo)
+    motor.update(inicio, fim, {
+        "Localizacao": lojas,
+        "Canal": canais,
+        "Produto": [p for p in produtos if categoria_produto.get(p) in categorias],
+    })
+    return {dim: _keyed(motor.by(dim)[[dim] + MEDIDAS_CRUZADAS], [dim]) for dim in DIMENSOES_CUBO}
+
+
+def reference_calendar(df, cenario):
+    filtrado = _filter(df, *cenario)
+    diario = filtrado.groupby("Data")["Valor_Total"].sum()
+    # Todos os dias do período dentro das datas dos dados, com zero quando não há vendas
+    dias = pd.date_range(max(pd.to_datetime(cenario[0]), df["Data"].min()), min(pd.to_datetime(cenario[1]), df["Data"].max()))
+    return diario.reindex(dias, fill_value=0.0).to_numpy()
+
+
+def engine_calendar(dados, cenario):
+    inicio, fim, produtos, categorias, lojas, canais = cenario
+    calendario = dados["calendario"]
+    todos = default_filters(dados["df"])
+    if list(produtos) != list(todos[0]) or list(categorias) != list(todos[1]):
+        cubo = dados["cubo"]
+        categoria_produto = dict(zip(cubo["rotulos"]["Produto"], cubo["categorias"]))
+        calendario = build_calendar(cubo, [p for p in produtos if categoria_produto.get(p) in categorias])
+    return calendar_series(calendario, inicio, fim, lojas, canais).to_numpy()
+
+
+COLUNAS_QUANTIS = ["Valor_Total", "Tempo_Preparo", "Tempo_Entrega"]
+
+
+def reference_quantiles(df, cenario):
+    inicio, fim, _, _, lojas, canais = cenario
+    filtrado = _filter(df, inicio, fim, df["Produto"].unique(), df["Categoria"].unique(), lojas, canais)
+    entregues = filtrado[delivery_rows(filtrado)]
+    return {
+        # Mesma posição dos esboços: o elemento de ordem ``q · (n - 1)``, arredondada para baixo
+        col: np.quantile((entregues if col == "Tempo_Entrega" else filtrado)[col].to_numpy(dtype=float),
+                         [0.5, 0.9, 0.99], method="lower")
+        for col in COLUNAS_QUANTIS
+    }
+
+
+def engine_quantiles(dados, cenario):
+    inicio, fim, _, _, lojas, canais = cenario
+    resultado = {}
+    for col in COLUNAS_QUANTIS:
+        esboco = dados["quantis"][col]
+        esboco = esboco[
+            date_rows(esboco, inicio, fim) & value_rows(esboco, "Localizacao", lojas) & value_rows(esboco, "Canal", canais)
+        ]
+        resultado[col] = sketch_quantiles(esboco)[["P50", "P90", "P99"]].to_numpy()[0]
+    return resultado
+
+
+def reference_costs(df, cenario):
+    filtrado = _filter(df, *cenario)
+    return {col: filtrado[col].sum() for col in ["Valor_Total"] + list(COMPONENTES) + ["Lucro_Liquido"]}
+
+
+def engine_costs(dados, cenario):
+    linha = cost_breakdown(_filtered(dados, cenario)).iloc[0]
+    return {col: linha[col] for col in ["Valor_Total"] + list(COMPONENTES) + ["Lucro_Liquido"]}
+
+
+def _insight_texts(top_produto, top_categoria, top_dia, canal, margem, loja, tempo_loja, tempo_medio):
+    return [
+        f"O produto mais vendido é **{top_produto}** da categoria **{top_categoria}**.",
+        f"O dia com maior volume de vendas é **{DIAS_PTBR.get(top_dia, top_dia)}**.",
+        f"O canal **{canal}** apresenta a maior margem de lucro ({margem:.1f}%).",
+        f"A loja **{loja}** tem o menor tempo médio de preparo ({tempo_loja:.1f} min vs. média geral de {tempo_medio:.1f} min).",
+    ]
+
+
+def reference_insights(df, cenario):
+    filtrado = _filter(df, *cenario)
+    rentabilidade = _groupby(filtrado, "Canal", {"Valor_Total": "sum", "Lucro_Liquido": "sum"})
+    rentabilidade["Margem"] = (rentabilidade["Lucro_Liquido"] / rentabilidade["Valor_Total"]) * 100
+    canal = rentabilidade.loc[rentabilidade["Margem"].idxmax()]
+    loja = filtrado.groupby("Localizacao", observed=True)["Tempo_Preparo"].mean().nsmallest(1)
+    return {"textos": _insight_texts(
+        filtrado.groupby("Produto", observed=True)["Valor_Total"].sum().nlargest(1).index[0],
+        filtrado.groupby("Categoria", observed=True)["Valor_Total"].sum().nlargest(1).index[0],
+        filtrado.groupby("Dia_Semana", observed=True)["Valor_Total"].sum().nlargest(1).index[0],
+        canal["Canal"], canal["Margem"], loja.index[0], loja.values[0], filtrado["Tempo_Preparo"].mean(),
+    )}
+
+
+def engine_insights(dados, cenario):
+    filtrado = _filtered(dados, cenario)
+    produtos = aggregate(filtrado, ["Produto", "Categoria"], {"Valor_Total": "sum"})
+    vendas_produto = aggregate(produtos, "Produto", {"Valor_Total": "sum"})
+    vendas_categoria = aggregate(produtos, "Categoria", {"Valor_Total": "sum"})
+    rentabilidade = aggregate(filtrado, "Canal", {"Valor_Total": "sum", "Lucro_Liquido": "sum"})
+    rentabilidade["Margem"] = (rentabilidade["Lucro_Liquido"] / rentabilidade["Valor_Total"]) * 100
+    canal = rentabilidade.loc[rentabilidade["Margem"].idxmax()]
+    loja = aggregate(filtrado, "Localizacao", {"Tempo_Preparo": "mean"}).nsmallest(1, "Tempo_Preparo")
+    return {"textos": _insight_texts(
+        vendas_produto["Produto"].iloc[top_k(vendas_produto["Valor_Total"], 1)[0]],
+        vendas_categoria["Categoria"].iloc[top_k(vendas_categoria["Valor_Total"], 1)[0]],
+        aggregate(filtrado, "Dia_Semana", {"Valor_Total": "sum"}).nlargest(1, "Valor_Total")["Dia_Semana"].iloc[0],
+        canal["Canal"], canal["Margem"], loja["Localizacao"].iloc[0], loja["Tempo_Preparo"].iloc[0],
+        filtrado["Tempo_Preparo"].mean(),
+    )}
+
+
+# Etapa -> (conta em pandas, conta pelos motores)
+ETAPAS = {
+    "kpis": (reference_kpis, engine_kpis),
+    "quebras": (reference_breakdowns, engine_breakdowns),
+    "diario": (reference_daily, engine_daily),
+    "mensal": (reference_monthly, engine_monthly),
+    "top_produtos": (reference_top_products, engine_top_products),
+    "filtro_cruzado": (reference_crossfilter, engine_crossfilter),
+    "calendario": (reference_calendar, engine_calendar),
+    "quantis": (reference_quantiles, engine_quantiles),
+    "custos": (reference_costs, engine_costs),
+    "insights": (reference_insights, engine_insights),
+}
+
+
+def compare_values(esperado, obtido, rtol=RTOL, atol=ATOL, caminho=""):
+    """Diferenças entre dois resultados (dicionários, listas, DataFrames, arrays ou escalares)."""
+    if isinstance(esperado, dict):
+        if set(esperado) != set(obtido):
+            return [f"{caminho}: chaves {sorted(esperado)} != {sorted(obtido)}"]
+        return [d for chave in esperado for d in compare_values(esperado[chave], obtido[chave], rtol, atol, f"{caminho}/{chave}")]
+
+    if isinstance(esperado, pd.DataFrame):
+        if list(esperado.index) != list(obtido.index):
+            faltam = list(esperado.index.difference(obtido.index))[:5]
+            sobram = list(obtido.index.difference(esperado.index))[:5]
+            return [f"{caminho}: linhas diferentes (faltam {faltam}, sobram {sobram}, {len(esperado)} != {len(obtido)})"]
+        diferencas = []
+        for col in esperado.columns:
+            if col not in obtido.columns:
+                diferencas.append(f"{caminho}: coluna {col} ausente")
+                continue
+            diferencas += compare_values(esperado[col].to_numpy(), obtido[col].to_numpy(), rtol, atol, f"{caminho}.{col}")
+        return diferencas
+
+    if isinstance(esperado, (list, np.ndarray)):
+        esperado, obtido = np.asarray(esperado), np.asarray(obtido)
+        if esperado.shape != obtido.shape:
+            return [f"{caminho}: formato {esperado.shape} != {obtido.shape}"]
+        if esperado.dtype.kind in "biuf" and obtido.dtype.kind in "biuf":
+            a, b = esperado.astype(float), obtido.astype(float)
+            iguais = np.isclose(a, b, rtol=rtol, atol=atol, equal_nan=True)
+        else:
+            a, b = esperado.astype(str), obtido.astype(str)
+            iguais = a == b
+        if iguais.all():
+            return []
+        i = int(np.flatnonzero(~iguais)[0])
+        return [f"{caminho}[{i}]: {a[i]!r} != {b[i]!r} ({int((~iguais).sum())} de {len(iguais)} diferentes)"]
+
+    if isinstance(esperado, str) or isinstance(obtido, str):
+        return [] if str(esperado) == str(obtido) else [f"{caminho}: {esperado!r} != {obtido!r}"]
+    if np.isclose(float(esperado), float(obtido), rtol=rtol, atol=atol, equal_nan=True):
+        return []
+    return [f"{caminho}: {float(esperado)!r} != {float(obtido)!r}"]
+
+
+def _best_times(referencia, motor, repeticoes):
+    """Resultados e melhores tempos de ``referencia()`` e ``motor()``, rodados alternadamente.
+
+    Alternar as duas contas faz com que oscilações da máquina atinjam os dois
+    lados por igual, o que mantém estável a razão entre os tempos.
+    """
+    melhores = [float("inf"), float("inf")]
+    for _ in range(repeticoes):
+        resultados = []
+        for lado, funcao in enumerate((referencia, motor)):
+            inicio = time.perf_counter()
+            resultados.append(funcao())
+            melhores[lado] = min(melhores[lado], time.perf_counter() - inicio)
+    return resultados[0], resultados[1], melhores[0], melhores[1]
+
+
+def _peak_memory(funcao):
+    """Pico de memória (bytes) alocada durante ``funcao()``."""
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_dataset(dados, repeticoes=REPETICOES, etapas=None):
+    """Compara as etapas em todos os cenários de ``dados`` e mede tempo e memória de cada lado.
+
+    Retorna, por etapa, as diferenças encontradas, os tempos somados dos
+    cenários e o maior pico de memória de cada lado.
+    """
+    df = dados["df"]
+    casos = cenarios(df)
+    resultado = {}
+    for nome in etapas or ETAPAS:
+        referencia, motor = ETAPAS[nome]
+        linha = {"diferencas": [], "tempo_pandas": 0.0, "tempo_motor": 0.0, "memoria_pandas": 0, "memoria_motor": 0}
+        for rotulo, cenario in casos.items():
+            esperado, obtido, tempo_pandas, tempo_motor = _best_times(
+                lambda: referencia(df, cenario), lambda: motor(dados, cenario), repeticoes
+            )
+            tolerancia = TOLERANCIAS.get(nome, RTOL)
+            linha["diferencas"] += [f"{rotulo}: {d}" for d in compare_values(esperado, obtido, rtol=tolerancia)]
+            linha["tempo_pandas"] += tempo_pandas
+            linha["tempo_motor"] += tempo_motor
+            linha["memoria_pandas"] = max(linha["memoria_pandas"], _peak_memory(lambda: referencia(df, cenario)))
+            linha["memoria_motor"] = max(linha["memoria_motor"], _peak_memory(lambda: motor(dados, cenario)))
+        resultado[nome] = linha
+    return resultado
+
+
+def load_differences(sinteticas, df):
+    """Diferenças entre as vendas geradas e as lidas pelo ``build_dataset`` (número de linhas e datas)."""
+    if len(df) != len(sinteticas):
+        return [f"carga: {len(df)} linhas lidas de {len(sinteticas)} geradas"]
+    geradas = pd.to_datetime(sinteticas["Data"], format="%d/%m/%Y").to_numpy()
+    trocadas = int((df["Data"].to_numpy() != geradas).sum())
+    return [f"carga: {trocadas} datas lidas diferentes das geradas"] if trocadas else []
+
+
+def measure(conjuntos=None, repeticoes=REPETICOES, etapas=None):
+    """Gera cada conjunto sintético, carrega com ``build_dataset`` e roda as etapas."""
+    medicao = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome in conjuntos or CONJUNTOS:
+            linhas, semente = CONJUNTOS[nome]
+            caminho = os.path.join(pasta, f"{nome}.csv")
+            sinteticas = synthetic_sales(linhas, semente)
+            sinteticas.to_csv(caminho, index=False)
+            inicio = time.perf_counter()
+            dados = build_dataset(caminho)
+            carga = time.perf_counter() - inicio
+            medicao[nome] = {
+                "carga": carga,
+                "diferencas_carga": load_differences(sinteticas, dados["df"]),
+                "etapas": run_dataset(dados, repeticoes, etapas),
+            }
+    return medicao
+
+
+def check(medicao, referencia=None, tolerancia=TOLERANCIA):
+    """Lista de problemas: resultados divergentes e etapas mais lentas que o pandas ou que a referência."""
+    problemas = []
+    for conjunto, valores in medicao.items():
+        problemas += [f"{conjunto}/{d}" for d in valores["diferencas_carga"]]
+        for etapa, linha in valores["etapas"].items():
+            problemas += [f"{conjunto}/{etapa}: {d}" for d in linha["diferencas"]]
+            if etapa in GANHO_MEMORIA:
+                if linha["memoria_motor"] > linha["memoria_pandas"]:
+                    problemas.append(
+                        f"{conjunto}/{etapa}: {linha['memoria_motor'] / 2 ** 20:.1f} MB nos motores > "
+                        f"{linha['memoria_pandas'] / 2 ** 20:.1f} MB no pandas"
+                    )
+            elif linha["tempo_motor"] > linha["tempo_pandas"]:
+                problemas.append(
+                    f"{conjunto}/{etapa}: {linha['tempo_motor'] * 1000:.1f} ms nos motores > "
+                    f"{linha['tempo_pandas'] * 1000:.1f} ms no pandas"
+                )
+            if referencia is None or etapa not in referencia.get(conjunto, {}):
+                continue
+            gravada = _reference_times(referencia[conjunto][etapa])
+            limite = gravada["motor"] * (1 + tolerancia) + FOLGA
+            if linha["tempo_motor"] <= limite:
+                continue
+            # Mais lenta que a referência, mas também o pandas: oscilação da máquina, não regressão
+            if gravada.get("pandas") and linha["tempo_pandas"]:
+                razao = linha["tempo_motor"] / linha["tempo_pandas"]
+                razao_gravada = gravada["motor"] / gravada["pandas"]
+                if razao <= razao_gravada * (1 + tolerancia):
+                    continue
+            problemas.append(
+                f"{conjunto}/{etapa}: {linha['tempo_motor'] * 1000:.1f} ms > {limite * 1000:.1f} ms "
+                f"(referência {gravada['motor'] * 1000:.1f} ms)"
+            )
+    return problemas
+
+
+def _reference_times(gravada):
+    """Tempos gravados de uma etapa; referências antigas guardam só o tempo dos motores."""
+    return gravada if isinstance(gravada, dict) else {"motor": gravada}
+
+
+def report(medicao, referencia=None):
+    linhas = []
+    for conjunto, valores in medicao.items():
+        linhas.append(f"{conjunto} (carga {valores['carga']:.2f} s)")
+        linhas.append(f"  {'Etapa':<16}{'Resultado':>12}{'pandas':>11}{'motores':>11}{'ganho':>8}{'memória pandas':>17}{'memória motores':>17}")
+        for etapa, linha in valores["etapas"].items():
+            situacao = "ok" if not linha["diferencas"] else f"{len(linha['diferencas'])} diverg."
+            ganho = linha["tempo_pandas"] / linha["tempo_motor"] if linha["tempo_motor"] else float("inf")
+            texto = (
+                f"  {etapa:<16}{situacao:>12}{linha['tempo_pandas'] * 1000:>8.1f} ms{linha['tempo_motor'] * 1000:>8.1f} ms"
+                f"{ganho:>7.1f}x{linha['memoria_pandas'] / 2 ** 20:>14.1f} MB{linha['memoria_motor'] / 2 ** 20:>14.1f} MB"
+            )
+            if referencia is not None and etapa in referencia.get(conjunto, {}):
+                texto += f"   (referência {_reference_times(referencia[conjunto][etapa])['motor'] * 1000:.1f} ms)"
+            linhas.append(texto)
+        linhas.append("")
+    return "\n".join(linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Equivalência e desempenho dos motores contra o pandas")
+    parser.add_argument("--conjuntos", nargs="+", choices=list(CONJUNTOS), default=list(CONJUNTOS))
+    parser.add_argument("--etapas", nargs="+", choices=list(ETAPAS), default=list(ETAPAS))
+    parser.add_argument("--referencia", default=REFERENCIA)
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    parser.add_argument("--atualizar", action="store_true", help="Grava os tempos dos motores como nova referência")
+    args = parser.parse_args()
+
+    medicao = measure(args.conjuntos, args.repeticoes, args.etapas)
+    referencia = None
+    if not args.atualizar and os.path.exists(args.referencia):
+        with open(args.referencia) as f:
+            referencia = json.load(f)
+    print(report(medicao, referencia))
+
+    if args.atualizar:
+        divergencias = check(medicao)
+        if divergencias:
+            for problema in divergencias:
+                print(f"PROBLEMA: {problema}")
+            print("\nReferência não gravada: os resultados divergem ou uma etapa perde para o pandas.")
+            sys.exit(1)
+        os.makedirs(os.path.dirname(args.referencia) or ".", exist_ok=True)
+        with open(args.referencia, "w") as f:
+            json.dump({
+                conjunto: {
+                    etapa: {"motor": round(linha["tempo_motor"], 4), "pandas": round(linha["tempo_pandas"], 4)}
+                    for etapa, linha in valores["etapas"].items()
+                }
+                for conjunto, valores in medicao.items()
+            }, f, indent=2)
+        print(f"Referência gravada em {args.referencia}")
+        return
+
+    problemas = check(medicao, referencia, args.tolerancia)
+    for problema in problemas:
+        print(f"REGRESSÃO: {problema}")
+    sys.exit(1 if problemas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Filtros do dashboard: períodos pré-definidos e seleção de linhas.
+
+Compartilhados pela barra lateral do dashboard, pelo pré-aquecimento do cache
+e pelos parâmetros da API.
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Períodos pré-definidos do filtro lateral
+PERIODOS = ["Últimos 7 dias", "Últimos 30 dias", "Últimos 90 dias", "Último ano", "Tudo"]
+PERIODO_PADRAO = "Últimos 90 dias"
+
+# Dimensões filtráveis, na ordem dos filtros da barra lateral
+DIMENSOES_FILTRO = ["Produto", "Categoria", "Localizacao", "Canal"]
+
+
+def period_dates(selected_period, df):
+    """(início, fim) de um período pré-definido; o fim é a última data dos dados."""
+    today = df["Data"].max()
+
+    if selected_period == "Últimos 7 dias":
+        start_date = today - timedelta(days=7)
+    elif selected_period == "Últimos 30 dias":
+        start_date = today - timedelta(days=30)
+    elif selected_period == "Últimos 90 dias":
+        start_date = today - timedelta(days=90)
+    elif selected_period == "Último ano":
+        start_date = today - timedelta(days=365)
+    else:
+        start_date = df["Data"].min()
+
+    return start_date, today
+
+
+def default_filters(df):
+    """Filtros padrão (todos os valores) de produto, categoria, loja e canal."""
+    return tuple(tuple(sorted(df[col].unique())) for col in DIMENSOES_FILTRO)
+
+
+def date_rows(frame, inicio, fim):
+    """Máscara (array booleano) das linhas com data entre ``inicio`` e ``fim``."""
+    datas = frame["Data"].to_numpy()
+    return (datas >= pd.to_datetime(inicio).to_datetime64()) & (datas <= pd.to_datetime(fim).to_datetime64())
+
+
+def value_rows(frame, col, valores):
+    """Máscara (array booleano) de ``frame[col].isin(valores)``; dimensões categóricas usam só os códigos."""
+    serie = frame[col]
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Uma posição extra no fim para o código -1 (valor ausente)
+        selecionadas = np.append(serie.cat.categories.isin(list(valores)), False)
+        return selecionadas[serie.cat.codes.to_numpy()]
+    return serie.isin(valores).to_numpy()
+
+
+def filter_rows(frame, inicio, fim, produtos, categorias, lojas, canais):
+    """Máscara (array booleano) das linhas dentro do período e dos valores selecionados."""
+    return (
+        date_rows(frame, inicio, fim) &
+        value_rows(frame, "Produto", produtos) &
+        value_rows(frame, "Categoria", categorias) &
+        value_rows(frame, "Localizacao", lojas) &
+        value_rows(frame, "Canal", canais)
+    )
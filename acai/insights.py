@@ -0,0 +1,114 @@
+"""Insights e recomendações em texto a partir dos agregados.
+
+As frases são montadas aqui, sem Streamlit, para que a seção de insights do
+dashboard e os relatórios por loja digam a mesma coisa com os mesmos números.
+Cada função recebe um agregado já calculado pelos motores (eficiência por
+loja, vendas por mês ou dia da semana, totais de ``promotion_uplift``,
+quebras por canal, perfil de capacidade...) e devolve a frase, ou ``None``
+quando não há o que dizer; o destaque visual fica com quem exibe.
+"""
+import numpy as np
+
+from acai.aggregation import DIAS_ORDEM, aggregate
+from acai.capacity import LIMIAR_SATURACAO
+
+DIAS_PT = dict(zip(DIAS_ORDEM, ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo"]))
+MESES_PT = {1: "Jan", 2: "Fev", 3: "Mar", 4: "Abr", 5: "Mai", 6: "Jun",
+            7: "Jul", 8: "Ago", 9: "Set", 10: "Out", 11: "Nov", 12: "Dez"}
+
+
+def _no_dia(dia):
+    """Dia da semana com a preposição ("na Segunda", "no Sábado")."""
+    return f"{'no' if dia in ('Saturday', 'Sunday') else 'na'} {DIAS_PT[dia]}"
+
+
+def store_efficiency(df):
+    """Tempo de preparo, margem e eficiência por loja, da mais para a menos eficiente."""
+    eficiencia = aggregate(df, "Localizacao", {
+        "Tempo_Preparo": "mean",
+        "Lucro_Liquido": "sum",
+        "Valor_Total": "sum",
+        "Eficiencia_Operacional": "mean"
+    })
+    eficiencia["Margem"] = (eficiencia["Lucro_Liquido"] / eficiencia["Valor_Total"]) * 100
+    return eficiencia.sort_values("Eficiencia_Operacional", ascending=False)
+
+
+def efficiency_insight(eficiencia):
+    """Loja mais eficiente como referência para a menos eficiente (de ``store_efficiency``)."""
+    if len(eficiencia) < 2:
+        return None
+    mais_eficiente = eficiencia.iloc[0]["Localizacao"]
+    menos_eficiente = eficiencia.iloc[-1]["Localizacao"]
+    return (f"A loja {mais_eficiente} demonstra a maior eficiência operacional. Considere analisar seus processos "
+            f"e implementar as melhores práticas na loja {menos_eficiente} para melhorar o desempenho.")
+
+
+def seasonality_insight(vendas, coluna):
+    """Período de vendas mais altas e mais baixas em ``vendas`` por ``coluna`` ("Mes" ou "Dia_Semana")."""
+    if len(vendas) < 2:
+        return None
+    valores = vendas["Valor_Total"].to_numpy(dtype=float)
+    alto = vendas[coluna].iloc[int(np.argmax(valores))]
+    baixo = vendas[coluna].iloc[int(np.argmin(valores))]
+    if coluna == "Mes":
+        return (f"As vendas tendem a ser mais altas em {MESES_PT[alto]} e mais baixas em {MESES_PT[baixo]}. "
+                "Considere ajustar campanhas promocionais e estoques de acordo com esses períodos.")
+    return (f"As vendas tendem a ser mais altas {_no_dia(alto)} e mais baixas {_no_dia(baixo)}. "
+            "Considere ajustar a escala de funcionários e promoções para estes dias.")
+
+
+def promotion_insight(totais):
+    """Recomendação a partir dos totais de ``promotion_uplift``."""
+    if not totais["Celulas"]:
+        return "Não há vendas com promoção no período e filtros selecionados."
+    receita_incremental = totais["Receita_Incremental"]
+    lucro_incremental = totais["Lucro_Incremental"]
+    if receita_incremental > 0 and lucro_incremental > 0:
+        return (f"As promoções geraram R$ {receita_incremental:,.2f} de receita e R$ {lucro_incremental:,.2f} de lucro "
+                "além do esperado sem desconto. Recomenda-se continuar com a estratégia promocional.")
+    if receita_incremental > 0:
+        return (f"As promoções aumentam a receita (R$ {receita_incremental:,.2f} incrementais), mas o custo de "
+                f"R$ {totais['Custo_Desconto']:,.2f} em descontos reduz o lucro em R$ {abs(lucro_incremental):,.2f}. "
+                "Considere ajustar os percentuais de desconto.")
+    return ("As promoções não estão gerando receita acima da base sem desconto. "
+            "Considere revisar a estratégia promocional para melhorar a efetividade.")
+
+
+def sales_insight(vendas, frase_comparacao):
+    """Variação das vendas (``kpi_summary(...)["vendas"]``) em relação à base de comparação."""
+    movimento = "cresceram" if vendas["variacao"] >= 0 else "caíram"
+    return f"As vendas {movimento} {abs(vendas['variacao']):.1f}% em relação {frase_comparacao}."
+
+
+def channel_insight(canais):
+    """Participação e margem do principal canal (``breakdown`` por Canal, do maior para o menor)."""
+    if canais.empty:
+        return None
+    melhor = canais.iloc[0]
+    participacao = melhor["Valor_Total"] / canais["Valor_Total"].sum() * 100
+    return f"{melhor['Canal']} é o principal canal ({participacao:.0f}% das vendas, margem de {melhor['Margem']:.1f}%)."
+
+
+def product_insight(produtos):
+    """Produto mais vendido do ranking de ``rank_products``."""
+    if produtos.empty:
+        return None
+    return f"{produtos.iloc[0]['Produto']} é o produto mais vendido (R$ {produtos.iloc[0]['Valor_Total']:,.2f})."
+
+
+def saturation_insight(perfil):
+    """Dia da semana em que a loja mais fica saturada (``capacity_profile``)."""
+    if perfil is None or perfil.empty or perfil["Pct_Saturado"].max() <= 0:
+        return None
+    saturado = perfil.loc[perfil["Pct_Saturado"].idxmax()]
+    return (f"A loja fica saturada (utilização ≥ {LIMIAR_SATURACAO:.0%}) em {saturado['Pct_Saturado']:.0f}% "
+            f"das {DIAS_PT[saturado['Dia_Semana']]}s.")
+
+
+def delivery_insight(por_faixa, sla):
+    """Faixa de distância com mais entregas atrasadas (``delivery_stats`` com a coluna ``Faixa``)."""
+    if por_faixa.empty or por_faixa["Pct_Atraso"].max() <= 0:
+        return None
+    pior = por_faixa.loc[por_faixa["Pct_Atraso"].idxmax()]
+    return f"Entregas de {pior['Faixa']} atrasam em {pior['Pct_Atraso']:.1f}% dos pedidos (prazo de {sla} min)."
@@ -0,0 +1,119 @@
+"""KPIs principais e quebras por canal, loja e produto.
+
+As mesmas funções alimentam os cards do dashboard e as respostas da API.
+"""
+from acai.aggregation import aggregate
+from acai.comparison import ATUAL, compare, comparison_periods, period_span
+from acai.filters import DIMENSOES_FILTRO, date_rows, filter_rows
+
+MEDIDAS_KPI = ["Valor_Total", "Lucro_Liquido", "Clientes_Unicos", "Clientes_Novos"]
+
+# Colunas das linhas de comparação (séries da base e atribuição volume/mix/taxa)
+COLUNAS_COMPARACAO = ["Data"] + DIMENSOES_FILTRO + ["Qtd_Vendida"] + MEDIDAS_KPI
+
+# Dimensão pedida -> coluna dos dados
+QUEBRAS = {"canal": "Canal", "loja": "Localizacao", "produto": "Produto", "categoria": "Categoria"}
+
+
+def variation(atual, base):
+    """Variação percentual em relação à base (zero quando a base não é positiva)."""
+    return ((atual - base) / base * 100) if base > 0 else 0
+
+
+def _ticket(totais):
+    return totais["Valor_Total"] / totais["Clientes_Unicos"] if totais["Clientes_Unicos"] > 0 else 0
+
+
+def period_view(df, inicio, fim, baseline, filtros):
+    """Linhas filtradas do período, linhas de todos os períodos comparados e totais por período.
+
+    Os filtros são avaliados uma vez sobre ``df``; o período atual é só o
+    recorte de datas dessa máscara. As linhas de comparação trazem apenas
+    ``COLUNAS_COMPARACAO``, para não copiar todas as colunas de um intervalo
+    que pode ser bem maior que o período atual.
+    """
+    periodos = comparison_periods(inicio, fim, baseline)
+    no_intervalo = filter_rows(df, *period_span(periodos), *filtros)
+    comparison_df = df.loc[no_intervalo, [col for col in COLUNAS_COMPARACAO if col in df.columns]]
+    filtered_df = df[no_intervalo & date_rows(df, inicio, fim)]
+    return {
+        "filtered_df": filtered_df,
+        "periodos": periodos,
+        "comparison_df": comparison_df,
+        "totais_periodos": compare(comparison_df, periodos, MEDIDAS_KPI),
+    }
+
+
+def cached_views(cache):
+    """``period_view`` e ``period_totals`` memoizadas em ``cache`` (``view_results``, ``view_totals``).
+
+    O dashboard e a API criam as suas sobre o mesmo ``MemoryCache``: como a
+    chave é formada pelos argumentos (versão como ``(conjunto, número)``,
+    período, base e filtros), os dois leem e preenchem as mesmas entradas.
+    """
+    @cache.memoize("visoes")
+    def view_results(_dados, versao, inicio, fim, baseline, produtos, categorias, lojas, canais):
+        return period_view(_dados["df"], inicio, fim, baseline, (produtos, categorias, lojas, canais))
+
+    # Só os totais por período dos KPIs (poucos bytes, cabem no cache para qualquer período)
+    @cache.memoize("totais")
+    def view_totals(_dados, versao, inicio, fim, baseline, produtos, categorias, lojas, canais):
+        return period_totals(_dados["df"], inicio, fim, baseline, (produtos, categorias, lojas, canais))
+
+    return view_results, view_totals
+
+
+def view_size(df, inicio, fim, baseline, bytes_coluna):
+    """Bytes aproximados de ``period_view`` sem filtros de dimensão, sem calculá-la.
+
+    ``bytes_coluna`` é o tamanho médio por linha de cada coluna de ``df``
+    (``df.memory_usage(deep=True, index=False) / len(df)``); as linhas do
+    período entram com todas as colunas e as do intervalo comparado só com
+    ``COLUNAS_COMPARACAO``.
+    """
+    periodos = comparison_periods(inicio, fim, baseline)
+    no_periodo = int(date_rows(df, inicio, fim).sum())
+    no_intervalo = int(date_rows(df, *period_span(periodos)).sum())
+    comparacao = bytes_coluna[[col for col in COLUNAS_COMPARACAO if col in bytes_coluna.index]].sum()
+    return no_periodo * bytes_coluna.sum() + no_intervalo * comparacao
+
+
+def period_totals(df, inicio, fim, baseline, filtros):
+    """Só os totais por período de ``period_view``, sem guardar as linhas.
+
+    É a parte compacta da visão (algumas dezenas de números), que cabe no
+    cache para qualquer período, mesmo quando as linhas não caberiam.
+    """
+    periodos = comparison_periods(inicio, fim, baseline)
+    no_intervalo = filter_rows(df, *period_span(periodos), *filtros)
+    linhas = df.loc[no_intervalo, ["Data"] + [col for col in MEDIDAS_KPI if col in df.columns]]
+    return {"periodos": periodos, "totais_periodos": compare(linhas, periodos, MEDIDAS_KPI)}
+
+
+def kpi_summary(totais_periodos, comparacao):
+    """Vendas, lucro, ticket médio e novos clientes do período atual e da base."""
+    atual = totais_periodos.loc[ATUAL]
+    base = totais_periodos.loc[comparacao]
+    valores = {
+        "vendas": (atual["Valor_Total"], base["Valor_Total"]),
+        "lucro": (atual["Lucro_Liquido"], base["Lucro_Liquido"]),
+        "ticket_medio": (_ticket(atual), _ticket(base)),
+        "novos_clientes": (atual["Clientes_Novos"], base["Clientes_Novos"]),
+    }
+    return {
+        nome: {"valor": float(a), "base": float(b), "variacao": float(variation(a, b))}
+        for nome, (a, b) in valores.items()
+    }
+
+
+def breakdown(df, dim):
+    """Vendas, lucro, quantidade, clientes, margem e ticket médio por ``dim``."""
+    result = aggregate(df, dim, {
+        "Valor_Total": "sum",
+        "Lucro_Liquido": "sum",
+        "Qtd_Vendida": "sum",
+        "Clientes_Unicos": "sum"
+    })
+    result["Margem"] = (result["Lucro_Liquido"] / result["Valor_Total"]) * 100
+    result["Ticket_Medio"] = result["Valor_Total"] / result["Clientes_Unicos"]
+    return result.sort_values("Valor_Total", ascending=False).reset_index(drop=True)
@@ -0,0 +1,20 @@
+"""Seções do dashboard, importadas sob demanda.
+
+Cada módulo expõe ``render(ctx)``, que desenha a seção a partir do contexto
+da execução (versão dos dados, filtros e linhas filtradas). Um módulo só é
+importado quando a sua seção é desenhada pela primeira vez, então o plotly e
+os motores de cada seção não atrasam o carregamento inicial nem os KPIs do
+topo da página.
+"""
+import importlib
+
+# Seções exibidas abaixo dos KPIs, na ordem da página
+PAINEIS = [
+    "filtro_cruzado", "tendencias", "produtos", "precos", "custos", "capacidade", "entregas",
+    "insights", "segmentos", "alertas", "padroes", "clientes", "resumo",
+]
+
+
+def render(nome, ctx):
+    """Importa (na primeira vez) e desenha a seção ``nome``."""
+    importlib.import_module(f"{__name__}.{nome}").render(ctx)
@@ -0,0 +1,63 @@
+"""Seção "Alertas": anomalias recentes nas séries diárias."""
+import numpy as np
+import streamlit as st
+
+from acai.anomalies import LIMIAR_ALERTA, SERIES_ALERTA
+
+GRANULARIDADES = {
+    "Loja": SERIES_ALERTA,
+    "Loja × Canal": ["Localizacao", "Canal"],
+    "Loja × Produto × Canal": ["Localizacao", "Produto", "Canal"]
+}
+DIAS_ALERTA = 7
+
+
+def alert_options():
+    """Séries, limiar e dias escolhidos na seção (os padrão antes da primeira escolha).
+
+    Lidos do estado da sessão, para que o Resumo use as mesmas opções sem
+    depender da ordem em que as seções são desenhadas.
+    """
+    estado = st.session_state
+    granularidade = estado.get("alerta_granularidade", next(iter(GRANULARIDADES)))
+    return GRANULARIDADES[granularidade], estado.get("alerta_limiar", LIMIAR_ALERTA), estado.get("alerta_dias", DIAS_ALERTA)
+
+
+def render(ctx):
+    # Alertas de anomalias nas séries diárias
+    st.markdown("## 🚨 Alertas")
+    
+    alert_col1, alert_col2 = st.columns([1, 3])
+    
+    with alert_col1:
+        st.selectbox("Séries analisadas", list(GRANULARIDADES), key="alerta_granularidade")
+        st.slider("Limiar do escore robusto", 2.0, 6.0, LIMIAR_ALERTA, step=0.5, key="alerta_limiar")
+        st.slider("Dias analisados (fim do período)", 1, 30, DIAS_ALERTA, key="alerta_dias")
+    
+    # Últimos dias do período, com os filtros aplicados (em cache, compartilhados com o Resumo)
+    series_alerta, limiar_alerta, dias_alerta = alert_options()
+    alertas_recentes = ctx.latest_alerts(series_alerta, limiar_alerta, dias_alerta)
+    
+    with alert_col2:
+        if alertas_recentes.empty:
+            st.success(f"✅ Nenhuma anomalia nos últimos {dias_alerta} dias do período selecionado.")
+        else:
+            tabela_alertas = alertas_recentes.assign(
+                Data=alertas_recentes["Data"].dt.strftime("%d/%m/%Y"),
+                Tipo=np.where(alertas_recentes["Variacao"] < 0, "📉 Queda", "📈 Alta")
+            ).rename(columns={"Localizacao": "Loja", "Valor": "Vendas (R$)", "Esperado": "Esperado (R$)", "Variacao": "Variação (%)"})
+            
+            st.dataframe(
+                tabela_alertas,
+                column_config={
+                    "Vendas (R$)": st.column_config.NumberColumn(format="%.2f"),
+                    "Esperado (R$)": st.column_config.NumberColumn(format="%.2f"),
+                    "Variação (%)": st.column_config.NumberColumn(format="%+.1f"),
+                    "Score": st.column_config.NumberColumn(format="%.1f")
+                },
+                hide_index=True,
+                use_container_width=True,
+                height=250
+            )
+        
+        st.caption(f"{alertas_recentes.attrs.get('series', 0):,} séries diárias pontuadas em {alertas_recentes.attrs.get('tempo', 0):.2f}s (mediana e MAD do mesmo dia da semana nas 8 semanas anteriores).")
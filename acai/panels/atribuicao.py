@@ -0,0 +1,64 @@
+"""Decomposição da variação dos KPIs em efeitos volume, mix e taxa."""
+import plotly.graph_objects as go
+import streamlit as st
+
+from acai.attribution import MEDIDAS as MEDIDAS_ATRIBUICAO, METRICAS, attribution
+from acai.comparison import ATUAL, compare
+
+
+def render(ctx):
+    comparison_df = ctx.comparison_df
+    periodos = ctx.periodos
+    comparacao = ctx.comparacao
+    frase_comparacao = ctx.frase_comparacao
+    
+    # Decomposição da variação dos KPIs em efeitos volume, mix e taxa
+    with st.expander(f"🔎 O que explica a variação em relação {frase_comparacao}?"):
+        attr_col1, attr_col2 = st.columns([3, 2])
+        
+        with attr_col2:
+            metrica_atribuicao = st.radio("Métrica", list(METRICAS), horizontal=True)
+            dimensao_nome = st.radio("Dimensão", ["Loja", "Produto", "Canal"], horizontal=True)
+            dimensao_atribuicao = {"Loja": "Localizacao"}.get(dimensao_nome, dimensao_nome)
+        
+        grupos_periodos = compare(
+            comparison_df,
+            {ATUAL: periodos[ATUAL], comparacao: periodos[comparacao]},
+            MEDIDAS_ATRIBUICAO,
+            by=dimensao_atribuicao
+        )
+        efeitos, contribuicoes = attribution(grupos_periodos, dimensao_atribuicao, comparacao, metrica_atribuicao)
+        
+        with attr_col1:
+            fig = go.Figure(go.Waterfall(
+                x=[comparacao, "Volume", "Mix", "Taxa", "Atual"],
+                y=[efeitos["Base"], efeitos["Volume"], efeitos["Mix"], efeitos["Taxa"], efeitos["Atual"]],
+                measure=["absolute", "relative", "relative", "relative", "total"],
+                text=[f"R$ {v:,.2f}" for v in (efeitos["Base"], efeitos["Volume"], efeitos["Mix"], efeitos["Taxa"], efeitos["Atual"])],
+                textposition="outside",
+                increasing=dict(marker=dict(color="#1cc88a")),
+                decreasing=dict(marker=dict(color="#e74a3b")),
+                totals=dict(marker=dict(color="#4e73df")),
+                connector=dict(line=dict(color="#858796", dash="dot"))
+            ))
+            
+            fig.update_layout(
+                title=f"{metrica_atribuicao}: efeitos volume, mix e taxa",
+                title_font=dict(size=16),
+                showlegend=False,
+                template="plotly_white",
+                height=350,
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with attr_col2:
+            maiores = contribuicoes.reindex(contribuicoes["Total"].abs().sort_values(ascending=False).index).head(10)
+            st.markdown("**Maiores contribuições (mix + taxa)**")
+            st.dataframe(
+                maiores,
+                column_config={col: st.column_config.NumberColumn(format="%.2f") for col in ("Mix", "Taxa", "Total")},
+                hide_index=True,
+                use_container_width=True
+            )
@@ -0,0 +1,103 @@
+"""Seção "Capacidade e Equipe": utilização por loja e dia da semana e equipe sugerida."""
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from acai.capacity import LIMIAR_SATURACAO, capacity_profile, staffing_recommendation
+
+
+def render(ctx):
+    dados = ctx.dados
+    start_date = ctx.start_date
+    end_date = ctx.end_date
+    lojas = ctx.lojas
+    
+    # Utilização da capacidade e dimensionamento de equipe
+    st.markdown("## 👥 Capacidade e Equipe")
+    
+    capacidade_diaria = dados["capacidade"]
+    capacidade_diaria = capacidade_diaria[
+        (capacidade_diaria["Data"] >= pd.to_datetime(start_date)) &
+        (capacidade_diaria["Data"] <= pd.to_datetime(end_date)) &
+        (capacidade_diaria["Localizacao"].isin(lojas))
+    ]
+    
+    if capacidade_diaria.empty:
+        st.info("💡 **Capacidade:** Não há dados de atendimento no período e lojas selecionados.")
+    else:
+        perfil_capacidade = capacity_profile(capacidade_diaria)
+        
+        dias_ordem = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        dias_ptbr = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+        dias_map = dict(zip(dias_ordem, dias_ptbr))
+        
+        cap_metric_cols = st.columns(3)
+        with cap_metric_cols[0]:
+            st.metric(
+                "Utilização Média", f"{capacidade_diaria['Utilizacao'].mean() * 100:.1f}%",
+                help="Pessoas atendidas no dia sobre a capacidade diária, limitada a 100%."
+            )
+            dias_acima = int((capacidade_diaria["Demanda"] > 1).sum())
+            if dias_acima:
+                st.caption(f"{dias_acima:,} dias com mais atendimentos que a capacidade informada (contados como 100%).")
+        with cap_metric_cols[1]:
+            st.metric("Receita por Funcionário/Dia", f"R$ {capacidade_diaria['Valor_Total'].sum() / max(capacidade_diaria['Funcionarios'].sum(), 1):,.2f}")
+        with cap_metric_cols[2]:
+            st.metric("Dias Saturados", f"{int(perfil_capacidade['Dias_Saturados'].sum()):,} de {len(capacidade_diaria):,}")
+        
+        cap_col1, cap_col2 = st.columns(2)
+        
+        with cap_col1:
+            utilizacao_pivot = perfil_capacidade.pivot(index="Localizacao", columns="Dia_Semana", values="Utilizacao") * 100
+            utilizacao_pivot.columns = [dias_map[d] for d in utilizacao_pivot.columns]
+            
+            fig = px.imshow(
+                utilizacao_pivot,
+                text_auto=".0f",
+                color_continuous_scale="RdYlGn_r",
+                aspect="auto",
+                labels=dict(x="Dia da Semana", y="Loja", color="Utilização (%)"),
+                title="Utilização Média da Capacidade (%)"
+            )
+            
+            fig.update_layout(
+                title_font=dict(size=16),
+                template="plotly_white",
+                height=350,
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with cap_col2:
+            utilizacao_alvo = st.slider("Utilização alvo (%)", 50, 100, 80, step=5)
+            recomendacao = staffing_recommendation(perfil_capacidade, utilizacao_alvo / 100)
+            recomendacao["Dia_Semana"] = recomendacao["Dia_Semana"].astype(str).map(dias_map)
+            recomendacao["Utilizacao"] = recomendacao["Utilizacao"] * 100
+            recomendacao["Utilizacao_Projetada"] = recomendacao["Utilizacao_Projetada"] * 100
+            
+            st.dataframe(
+                recomendacao.rename(columns={
+                    "Localizacao": "Loja",
+                    "Dia_Semana": "Dia",
+                    "Funcionarios": "Equipe Média",
+                    "Utilizacao": "Utilização (%)",
+                    "Funcionarios_Sugeridos": "Equipe Sugerida",
+                    "Diferenca": "Diferença",
+                    "Utilizacao_Projetada": "Utilização Projetada (%)"
+                }),
+                column_config={
+                    "Equipe Média": st.column_config.NumberColumn(format="%.1f"),
+                    "Utilização (%)": st.column_config.NumberColumn(format="%.1f"),
+                    "Diferença": st.column_config.NumberColumn(format="%+d"),
+                    "Utilização Projetada (%)": st.column_config.NumberColumn(format="%.1f")
+                },
+                hide_index=True,
+                use_container_width=True,
+                height=300
+            )
+        
+        saturado = perfil_capacidade.loc[perfil_capacidade["Pct_Saturado"].idxmax()]
+        st.caption("Capacidade e equipe são atributos da loja no dia: filtros de produto, categoria e canal não se aplicam a esta seção.")
+        if saturado["Pct_Saturado"] > 0:
+            st.info(f"💡 **Equipe:** A loja {saturado['Localizacao']} fica saturada (utilização ≥ {LIMIAR_SATURACAO:.0%}) em {saturado['Pct_Saturado']:.0f}% das {dias_map[saturado['Dia_Semana']]}s. Ajuste a escala desses dias para a equipe sugerida.")
@@ -0,0 +1,216 @@
+"""Seção "Análise de Clientes": novos clientes, recorrência e ticket médio."""
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from acai.aggregation import aggregate
+
+
+def render(ctx):
+    filtered_df = ctx.filtered_df
+    
+    # Quinta linha - Análise de Clientes e Métricas Principais
+    st.markdown("## 👥 Análise de Clientes")
+    client_col1, client_col2 = st.columns(2)
+    
+    with client_col1:
+        # Análise de novos clientes vs. recorrentes
+        clientes_analysis = aggregate(filtered_df, "Cliente_Novo", {
+            "Clientes_Unicos": "sum",
+            "Valor_Total": "sum",
+            "Lucro_Liquido": "sum"
+        })
+        
+        clientes_analysis["Tipo_Cliente"] = clientes_analysis["Cliente_Novo"].map({True: "Novos", False: "Recorrentes"})
+        clientes_analysis["Ticket_Medio"] = clientes_analysis["Valor_Total"] / clientes_analysis["Clientes_Unicos"]
+        
+        # Calcular percentuais
+        total_clientes = clientes_analysis["Clientes_Unicos"].sum()
+        clientes_analysis["Percentual"] = (clientes_analysis["Clientes_Unicos"] / total_clientes) * 100
+        
+        # Criar gráfico de pizza com métricas
+        colors = ['#1cc88a', '#4e73df']
+        
+        fig = make_subplots(
+            rows=1, cols=2,
+            specs=[[{"type": "domain"}, {"type": "xy"}]],
+            subplot_titles=("Distribuição de Clientes", "Ticket Médio por Tipo")
+        )
+        
+        # Gráfico de pizza
+        fig.add_trace(
+            go.Pie(
+                labels=clientes_analysis["Tipo_Cliente"],
+                values=clientes_analysis["Clientes_Unicos"],
+                hole=0.7,
+                textinfo="percent",
+                marker=dict(colors=colors),
+                textposition="inside",
+                hovertemplate="Tipo: %{label}<br>Quantidade: %{value:,.0f}<br>Percentual: %{percent}<extra></extra>"
+            ),
+            row=1, col=1
+        )
+        
+        # Adicionar texto ao centro do gráfico de pizza
+        fig.add_annotation(
+            text=f"{total_clientes:,.0f}<br>Clientes",
+            font=dict(size=14, color="black", family="Arial"),
+            showarrow=False,
+            x=0.5, y=0.5,
+            xref="paper", yref="paper",
+            xanchor="center", yanchor="middle"
+        )
+        # fig.add_annotation(
+        #     x=0.5, y=0.5,
+        #     text=f"{total_clientes:,.0f}<br>Clientes",
+        #     font=dict(size=14, color="black", family="Arial"),
+        #     showarrow=False,
+        #     xref="x domain", yref="y domain",
+        #     row=1, col=1
+        # )
+        
+        # Gráfico de barras
+        fig.add_trace(
+            go.Bar(
+                x=clientes_analysis["Tipo_Cliente"],
+                y=clientes_analysis["Ticket_Medio"],
+                marker_color=colors,
+                text=clientes_analysis["Ticket_Medio"].apply(lambda x: f"R$ {x:,.2f}"),
+                textposition="auto",
+                hovertemplate="Tipo: %{x}<br>Ticket Médio: R$ %{y:,.2f}<extra></extra>"
+            ),
+            row=1, col=2
+        )
+        
+        fig.update_layout(
+            title="Análise de Clientes Novos vs. Recorrentes",
+            #titlefont=dict(size=16),
+            title_font=dict(size=16),  # Note o underscore entre title e font
+            showlegend=False,
+            template="plotly_white",
+            margin=dict(l=20, r=20, t=60, b=20),
+            height=350
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Recomendação de clientes
+        if len(clientes_analysis) == 2:
+            novos = clientes_analysis[clientes_analysis["Cliente_Novo"] == True]
+            recorrentes = clientes_analysis[clientes_analysis["Cliente_Novo"] == False]
+            
+            if not novos.empty and not recorrentes.empty:
+                prop_novos = novos["Clientes_Unicos"].values[0] / total_clientes * 100
+                diff_ticket = (recorrentes["Ticket_Medio"].values[0] / novos["Ticket_Medio"].values[0] - 1) * 100
+                
+                if prop_novos > 40:
+                    base_rec = "A proporção de novos clientes está alta (acima de 40%)."
+                elif prop_novos < 15:
+                    base_rec = "A proporção de novos clientes está baixa (menos de 15%)."
+                else:
+                    base_rec = "A proporção entre novos clientes e recorrentes está equilibrada."
+                
+                if diff_ticket > 20:
+                    ticket_rec = "Os clientes recorrentes têm um ticket médio significativamente maior que os novos."
+                    acao = "Desenvolva estratégias de fidelização para converter mais clientes novos em recorrentes."
+                elif diff_ticket < -10:
+                    ticket_rec = "Os clientes novos têm um ticket médio maior que os recorrentes."
+                    acao = "Analise por que os clientes recorrentes estão gastando menos e desenvolva ofertas especiais para aumentar seu consumo."
+                else:
+                    ticket_rec = "O ticket médio é similar entre clientes novos e recorrentes."
+                    acao = "Continue investindo em estratégias balanceadas de aquisição e retenção."
+                
+                st.info(f"💡 **Análise de Base de Clientes:** {base_rec} {ticket_rec} {acao}")
+    
+    with client_col2:
+        # Análise de frequência e recorrência
+        
+        # Verificar se há dados de valor de ticket médio ou calculá-lo
+        # if "Valor_Ticket_Medio" in filtered_df.columns:
+        #     ticket_data = filtered_df.groupby("Localizacao")["Valor_Ticket_Medio"].mean().reset_index()
+        # else:
+            # Calcular o ticket médio por localização
+        ticket_data = ctx.cruzado.selected("Localizacao")[["Localizacao", "Valor_Total", "Clientes_Unicos"]]
+
+            
+            
+            #ticket_data["Valor_Ticket_Medio"] = ticket_data["Valor_Total"] / ticket_data["Clientes_Unicos"]
+            # Criar coluna de ticket médio
+        ticket_data["Valor_Ticket_Medio"] = ticket_data.apply(
+                lambda row: row["Valor_Total"] / row["Clientes_Unicos"] if row["Clientes_Unicos"] > 0 else 0, 
+                axis=1
+            )
+                    
+        # Ordenar por ticket médio
+        #ticket_data = ticket_data.sort_values("Valor_Ticket_Medio", ascending=False)
+        # Ordenar por ticket médio
+        ticket_data = ticket_data.sort_values("Valor_Ticket_Medio", ascending=False)
+        
+        # Criar gráfico de barras
+        fig = px.bar(
+            ticket_data,
+            x="Localizacao",
+            y="Valor_Ticket_Medio",
+            text=ticket_data["Valor_Ticket_Medio"].apply(lambda x: f"R$ {x:,.2f}"),
+            color="Valor_Ticket_Medio",
+            color_continuous_scale="Viridis",
+            labels={"Valor_Ticket_Medio": "Ticket Médio (R$)", "Localizacao": "Loja"}
+        )
+        
+        # Adicionar linha para média geral
+        media_geral = ticket_data["Valor_Ticket_Medio"].mean()
+        
+        fig.add_shape(
+            type="line",
+            x0=-0.5,
+            y0=media_geral,
+            x1=len(ticket_data) - 0.5,
+            y1=media_geral,
+            line=dict(color="red", width=2, dash="dash")
+        )
+        
+        fig.add_annotation(
+            x=len(ticket_data) / 2,
+            y=media_geral * 1.1,
+            text=f"Média Geral: R$ {media_geral:.2f}",
+            showarrow=False,
+            font=dict(color="red")
+        )
+        
+        fig.update_layout(
+            title="Ticket Médio por Loja",
+            #titlefont=dict(size=16),
+            title_font=dict(size=16),  # Note o underscore entre title e font
+            showlegend=False,
+            template="plotly_white",
+            margin=dict(l=20, r=20, t=40, b=20),
+            height=350,
+            coloraxis_colorbar=dict(title="Ticket Médio (R$)")
+        )
+        
+        fig.update_traces(textposition="outside")
+        
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Recomendação de ticket médio
+        # Recomendação de ticket médio
+        if not ticket_data.empty:
+            highest_location = ticket_data.iloc[0]["Localizacao"]
+            lowest_location = ticket_data.iloc[-1]["Localizacao"]
+            highest_ticket = ticket_data.iloc[0]["Valor_Ticket_Medio"]
+            lowest_ticket = ticket_data.iloc[-1]["Valor_Ticket_Medio"]
+            
+            # Adicione um valor mínimo para evitar divisão por zero
+            if lowest_ticket <= 0.01:
+                lowest_ticket = 0.01  # Estabelecer um valor mínimo
+            
+            diff_percent = ((highest_ticket / lowest_ticket) - 1) * 100
+            
+            if diff_percent > 30:
+                st.info(f"💡 **Análise de Ticket Médio:** Há uma variação de {diff_percent:.1f}% entre o maior e o menor ticket médio. A loja {highest_location} tem as melhores práticas de venda com ticket de R$ {highest_ticket:.2f}. Considere aplicar técnicas de venda cruzada e upselling na loja {lowest_location} para aumentar seu ticket médio atual.")
+            else:
+                st.info(f"💡 **Análise de Ticket Médio:** A diferença entre o maior e o menor ticket médio é de {diff_percent:.1f}%, indicando uma relativa consistência entre as lojas. Continue monitorando e ajustando estratégias para manter essa uniformidade.")
+        else:
+            # Para o caso raro onde o DataFrame está vazio
+            st.info("💡 **Análise de Ticket Médio:** Os filtros aplicados não retornaram dados suficientes para análise de ticket médio. Tente ajustar os filtros para incluir mais dados.")
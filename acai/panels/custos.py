@@ -0,0 +1,103 @@
+"""Seção "Da Receita ao Lucro": cascata de custos e conciliação."""
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from acai.costs import COMPONENTES, MEDIDAS as MEDIDAS_CUSTOS, cost_breakdown, divergent_rows, waterfall_steps
+
+
+def render(ctx):
+    filtered_df = ctx.filtered_df
+    
+    # Cascata da receita bruta até o lucro líquido pelos componentes de custo
+    st.markdown("## 🧾 Da Receita ao Lucro")
+    cost_col1, cost_col2 = st.columns(2)
+    
+    with cost_col2:
+        dimensao_custos_nome = st.radio("Detalhar custos por", ["Canal", "Loja", "Produto"], horizontal=True)
+        dimensao_custos = {"Loja": "Localizacao"}.get(dimensao_custos_nome, dimensao_custos_nome)
+    
+    custos = cost_breakdown(filtered_df, dimensao_custos)
+    
+    with cost_col2:
+        grupo_custos = st.selectbox(f"{dimensao_custos_nome} na cascata", ["Todos"] + [str(g) for g in custos[dimensao_custos]])
+    
+    if custos.empty:
+        st.info("💡 **Custos:** Não há vendas no período e filtros selecionados.")
+    else:
+        if grupo_custos == "Todos":
+            linha_custos = custos[MEDIDAS_CUSTOS + ["Diferenca"]].sum()
+        else:
+            linha_custos = custos[custos[dimensao_custos].astype(str) == grupo_custos].iloc[0]
+        passos = waterfall_steps(linha_custos)
+        
+        with cost_col1:
+            fig = go.Figure(go.Waterfall(
+                x=[p[0] for p in passos],
+                y=[p[1] for p in passos],
+                measure=[p[2] for p in passos],
+                text=[f"R$ {p[1]:,.0f}" for p in passos],
+                textposition="outside",
+                increasing=dict(marker=dict(color="#1cc88a")),
+                decreasing=dict(marker=dict(color="#e74a3b")),
+                totals=dict(marker=dict(color="#4e73df")),
+                connector=dict(line=dict(color="#858796", dash="dot"))
+            ))
+            
+            fig.update_layout(
+                title=f"Receita → Lucro ({grupo_custos})",
+                title_font=dict(size=16),
+                showlegend=False,
+                template="plotly_white",
+                height=400,
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with cost_col2:
+            # Participação de cada componente de custo na receita bruta de cada grupo
+            participacao = custos.melt(
+                id_vars=[dimensao_custos],
+                value_vars=list(COMPONENTES),
+                var_name="Componente",
+                value_name="Valor"
+            )
+            participacao["Componente"] = participacao["Componente"].map(COMPONENTES)
+            participacao["Percentual"] = participacao["Valor"] / participacao[dimensao_custos].map(
+                custos.set_index(dimensao_custos)["Valor_Total"]
+            ) * 100
+            
+            fig = px.bar(
+                participacao,
+                x="Percentual",
+                y=dimensao_custos,
+                color="Componente",
+                orientation="h",
+                title="Custos em % da Receita Bruta",
+                labels={"Percentual": "% da receita", dimensao_custos: dimensao_custos_nome},
+                color_discrete_sequence=px.colors.qualitative.Set2
+            )
+            
+            fig.update_layout(
+                title_font=dict(size=16),
+                template="plotly_white",
+                height=max(300, 30 * len(custos)),
+                legend=dict(orientation="h", yanchor="top", y=-0.15, xanchor="center", x=0.5),
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Verificação de consistência: componentes devem fechar o lucro informado
+        linhas_divergentes = int(custos["Linhas_Divergentes"].sum())
+        if linhas_divergentes:
+            st.warning(f"⚠️ {linhas_divergentes:,} de {int(custos['Pedidos'].sum()):,} vendas não fecham a conta receita − custos = lucro (diferença total de R$ {custos['Diferenca'].sum():,.2f}).")
+            with st.expander("🔎 Ver vendas não conciliadas"):
+                st.dataframe(
+                    divergent_rows(filtered_df).head(500).rename(columns={"Localizacao": "Loja"}),
+                    hide_index=True,
+                    use_container_width=True
+                )
+        else:
+            st.caption(f"✅ Todas as {int(custos['Pedidos'].sum()):,} vendas fecham a conta receita − custos = lucro.")
@@ -0,0 +1,153 @@
+"""Seção "Entregas": tempo, atrasos e custo por faixa de distância."""
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from acai.aggregation import aggregate
+from acai.delivery import TEMPO_BORDAS, build_delivery_cells, delivery_stats, distance_labels
+
+
+def render(ctx):
+    dados = ctx.dados
+    filtered_df = ctx.filtered_df
+    start_date = ctx.start_date
+    end_date = ctx.end_date
+    lojas = ctx.lojas
+    canais = ctx.canais
+    usa_rollups = ctx.usa_rollups
+    
+    # Desempenho das entregas por faixa de distância
+    st.markdown("## 🛵 Entregas")
+    
+    # As células respondem filtros de período, loja e canal; com produtos ou
+    # categorias restritos são montadas a partir das linhas filtradas
+    if usa_rollups:
+        celulas_entrega = dados["entregas"]
+        celulas_entrega = celulas_entrega[
+            (celulas_entrega["Data"] >= pd.to_datetime(start_date)) &
+            (celulas_entrega["Data"] <= pd.to_datetime(end_date)) &
+            (celulas_entrega["Localizacao"].isin(lojas)) &
+            (celulas_entrega["Canal"].isin(canais))
+        ]
+    else:
+        celulas_entrega = build_delivery_cells(filtered_df)
+    
+    if celulas_entrega.empty:
+        st.info("💡 **Entregas:** Não há entregas no período e filtros selecionados.")
+    else:
+        sla_entrega = st.slider("Prazo de entrega (SLA, minutos)", 15, 90, 45, step=5)
+        faixas_distancia = distance_labels()
+        
+        entrega_total = delivery_stats(celulas_entrega, "Faixa_Distancia", sla_entrega)
+        entrega_loja_faixa = delivery_stats(celulas_entrega, ["Localizacao", "Faixa_Distancia"], sla_entrega)
+        entrega_loja = delivery_stats(celulas_entrega, "Localizacao", sla_entrega)
+        for tabela in (entrega_total, entrega_loja_faixa):
+            tabela["Faixa"] = [faixas_distancia[f] for f in tabela["Faixa_Distancia"]]
+        
+        delivery_col1, delivery_col2 = st.columns(2)
+        
+        with delivery_col1:
+            # Curvas de tempo × distância por loja, com o P90 geral
+            fig = px.line(
+                entrega_loja_faixa,
+                x="Faixa",
+                y="Tempo_Medio",
+                color="Localizacao",
+                markers=True,
+                title="Tempo de Entrega por Distância",
+                labels={"Faixa": "Distância", "Tempo_Medio": "Tempo médio (min)", "Localizacao": "Loja"},
+                category_orders={"Faixa": faixas_distancia}
+            )
+            
+            fig.add_trace(go.Scatter(
+                x=entrega_total["Faixa"],
+                y=entrega_total["Tempo_P90"],
+                mode="lines",
+                name="P90 (todas as lojas)",
+                line=dict(color="#858796", dash="dash")
+            ))
+            
+            fig.add_hline(y=sla_entrega, line=dict(color="red", width=1, dash="dot"))
+            
+            fig.update_layout(
+                title_font=dict(size=16),
+                template="plotly_white",
+                height=400,
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with delivery_col2:
+            atraso_pivot = entrega_loja_faixa.pivot(index="Localizacao", columns="Faixa", values="Pct_Atraso")
+            atraso_pivot = atraso_pivot.reindex(columns=[f for f in faixas_distancia if f in atraso_pivot.columns])
+            
+            fig = px.imshow(
+                atraso_pivot,
+                text_auto=".0f",
+                color_continuous_scale="Reds",
+                aspect="auto",
+                labels=dict(x="Distância", y="Loja", color="Atrasos (%)"),
+                title=f"Pedidos Acima de {sla_entrega} min (%)"
+            )
+            
+            fig.update_layout(
+                title_font=dict(size=16),
+                template="plotly_white",
+                height=400,
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+        
+        delivery_col3, delivery_col4 = st.columns(2)
+        
+        with delivery_col3:
+            fig = px.bar(
+                entrega_loja.sort_values("Custo_Km", ascending=False),
+                x="Localizacao",
+                y="Custo_Km",
+                color="Custo_Km",
+                color_continuous_scale="Oranges",
+                title="Custo de Entrega por km",
+                labels={"Localizacao": "Loja", "Custo_Km": "R$ por km"}
+            )
+            
+            fig.update_layout(
+                title_font=dict(size=16),
+                template="plotly_white",
+                coloraxis_showscale=False,
+                height=350,
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with delivery_col4:
+            # Distribuição conjunta distância × tempo (pedidos por célula)
+            distribuicao = aggregate(celulas_entrega, ["Faixa_Distancia", "Faixa_Tempo"], {"Pedidos": "sum"})
+            distribuicao_pivot = distribuicao.pivot(index="Faixa_Tempo", columns="Faixa_Distancia", values="Pedidos").fillna(0)
+            distribuicao_pivot.index = [f"≤ {TEMPO_BORDAS[t + 1]} min" if t < len(TEMPO_BORDAS) - 1 else f"> {TEMPO_BORDAS[-1]} min" for t in distribuicao_pivot.index]
+            distribuicao_pivot.columns = [faixas_distancia[f] for f in distribuicao_pivot.columns]
+            
+            fig = px.imshow(
+                distribuicao_pivot,
+                color_continuous_scale="Blues",
+                aspect="auto",
+                origin="lower",
+                labels=dict(x="Distância", y="Tempo de entrega", color="Pedidos"),
+                title="Pedidos por Distância × Tempo"
+            )
+            
+            fig.update_layout(
+                title_font=dict(size=16),
+                template="plotly_white",
+                height=350,
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+        
+        pior_loja = entrega_loja.loc[entrega_loja["Pct_Atraso"].idxmax()]
+        st.info(f"💡 **Entregas:** {pior_loja['Localizacao']} tem a maior taxa de atraso ({pior_loja['Pct_Atraso']:.1f}% dos pedidos acima de {sla_entrega} min), com custo médio de R$ {pior_loja['Custo_Km']:.2f} por km.")
@@ -0,0 +1,105 @@
+"""Seção "Filtro Cruzado": clique em uma loja, canal ou produto para filtrar o dashboard."""
+import inspect
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from acai.crossfilter import DIMENSOES_CUBO
+
+# Gráficos da seção: dimensão -> (título, rótulo do eixo)
+GRAFICOS = {
+    "Localizacao": ("Vendas por Loja", "Loja"),
+    "Canal": ("Vendas por Canal", "Canal"),
+    "Produto": ("Vendas por Produto", "Produto"),
+}
+
+# Eventos de clique em gráficos só existem nas versões mais novas do Streamlit
+SELECAO_NO_GRAFICO = "on_select" in inspect.signature(st.plotly_chart).parameters
+
+
+def empty_selection():
+    return {dim: [] for dim in DIMENSOES_CUBO}
+
+
+def toggle(dim, valor):
+    """Clique em ``valor``: sem filtro na dimensão, filtra só ele; senão ele entra ou sai do filtro."""
+    selecionados = st.session_state["filtro_cruzado"][dim]
+    if valor in selecionados:
+        selecionados.remove(valor)
+    else:
+        selecionados.append(valor)
+
+
+def _on_chart_select(dim, chave):
+    pontos = st.session_state[chave].selection.points
+    for ponto in pontos:
+        toggle(dim, ponto["x"])
+
+
+def _clear():
+    st.session_state["filtro_cruzado"] = empty_selection()
+
+
+def render(ctx):
+    motor = ctx.cruzado
+    atualizacao = motor.ultima_atualizacao
+    filtro_cruzado = ctx.filtro_cruzado
+
+    # Filtro cruzado (cliques nos gráficos) sobre o cubo loja × canal × produto × dia
+    st.markdown("## 🎯 Filtro Cruzado")
+
+    ativos = [(dim, valor) for dim in DIMENSOES_CUBO for valor in filtro_cruzado[dim]]
+    filtro_col1, filtro_col2 = st.columns([4, 1])
+    with filtro_col1:
+        if ativos:
+            st.markdown("**Filtrando por:** " + " · ".join(f"{GRAFICOS[dim][1]} = {valor}" for dim, valor in ativos))
+        else:
+            acao = "nas barras" if SELECAO_NO_GRAFICO else "nos botões abaixo dos gráficos"
+            st.caption(f"Clique {acao} para filtrar todo o dashboard por loja, canal ou produto.")
+    with filtro_col2:
+        st.button("Limpar filtro cruzado", on_click=_clear, disabled=not ativos, use_container_width=True)
+
+    cross_cols = st.columns([1, 1, 2])
+    for coluna, dim in zip(cross_cols, DIMENSOES_CUBO):
+        titulo, rotulo = GRAFICOS[dim]
+        por_valor = motor.by(dim)
+        por_valor = por_valor[por_valor["Valor_Total"] > 0]
+
+        fig = go.Figure(go.Bar(
+            x=por_valor[dim],
+            y=por_valor["Valor_Total"],
+            marker_color=["#4e73df" if s else "#d1d3e2" for s in por_valor["Selecionado"]],
+            hovertemplate=f"{rotulo}: %{{x}}<br>Vendas: R$ %{{y:,.2f}}<extra></extra>"
+        ))
+
+        fig.update_layout(
+            title=titulo,
+            title_font=dict(size=16),
+            template="plotly_white",
+            height=300,
+            margin=dict(l=20, r=20, t=40, b=20),
+            xaxis=dict(tickangle=45 if dim == "Produto" else 0),
+            yaxis_title="Vendas (R$)"
+        )
+
+        with coluna:
+            if SELECAO_NO_GRAFICO:
+                chave = f"grafico_cruzado_{dim}"
+                st.plotly_chart(fig, use_container_width=True, key=chave, selection_mode="points",
+                                on_select=lambda dim=dim, chave=chave: _on_chart_select(dim, chave))
+            else:
+                st.plotly_chart(fig, use_container_width=True)
+                # Sem eventos de clique, cada barra tem um botão (exceto os produtos, que são muitos)
+                if dim != "Produto":
+                    botoes = st.columns(len(por_valor))
+                    for botao, valor in zip(botoes, por_valor[dim]):
+                        botao.button(
+                            str(valor), key=f"cruzado_{dim}_{valor}", on_click=toggle, args=(dim, valor),
+                            type="primary" if valor in filtro_cruzado[dim] else "secondary",
+                            use_container_width=True
+                        )
+
+    if atualizacao["modo"] == "incremental":
+        st.caption(f"Agregados atualizados com {atualizacao['fatias']} fatia(s) do cubo em {atualizacao['tempo'] * 1000:.1f} ms (sem reagrupar as vendas).")
+    else:
+        st.caption(f"Agregados do período calculados a partir do cubo em {atualizacao['tempo'] * 1000:.1f} ms.")
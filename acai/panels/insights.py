@@ -0,0 +1,262 @@
+"""Seção "Insights e Recomendações": dia da semana, eficiência e promoções."""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from acai.aggregation import DIAS_ORDEM
+from acai.insights import DIAS_PT, MESES_PT, efficiency_insight, promotion_insight, seasonality_insight, store_efficiency
+from acai.uplift import promotion_uplift
+
+# Acima deste número de lojas o radar fica ilegível e a comparação vai para a segmentação
+LIMITE_RADAR = 10
+
+
+def render(ctx):
+    filtered_df = ctx.filtered_df
+    temporal = ctx.temporal
+    quantis = ctx.quantis
+    
+    # Terceira linha de insights
+    st.markdown("## 💡 Insights e Recomendações")
+    insight_cols = st.columns(3)
+    
+    with insight_cols[0]:
+        # Eficiência operacional
+        st.markdown("### Eficiência Operacional")
+        
+        estatistica_preparo = st.radio("Tempo de preparo", ["Média", "P50", "P90", "P99"], horizontal=True)
+        
+        # Calcular eficiência por loja
+        loja_eficiencia = store_efficiency(filtered_df)
+        
+        # Percentil do tempo de preparo no lugar da média (esboços por loja)
+        if estatistica_preparo != "Média":
+            percentis_loja = quantis("Tempo_Preparo", "Localizacao").set_index("Localizacao")[estatistica_preparo]
+            loja_eficiencia["Tempo_Preparo"] = loja_eficiencia["Localizacao"].map(percentis_loja).astype(float)
+        
+        # Radar de eficiência, rapidez e margem (legível até LIMITE_RADAR lojas)
+        categories = loja_eficiencia["Localizacao"].tolist()
+        if len(categories) > LIMITE_RADAR:
+            st.caption(f"Com mais de {LIMITE_RADAR} lojas, compare-as na seção Segmentação de Lojas.")
+        else:
+            # Normalizar dados para o gráfico de radar
+            eficiencia_norm = (loja_eficiencia["Eficiencia_Operacional"] / loja_eficiencia["Eficiencia_Operacional"].max()) * 100
+            tempo_norm = (1 - (loja_eficiencia["Tempo_Preparo"] / loja_eficiencia["Tempo_Preparo"].max())) * 100
+            margem_norm = (loja_eficiencia["Margem"] / loja_eficiencia["Margem"].max()) * 100
+            
+            fig = go.Figure()
+            
+            fig.add_trace(go.Scatterpolar(
+                r=eficiencia_norm,
+                theta=categories,
+                fill='toself',
+                name='Eficiência',
+                line=dict(color="#4e73df")
+            ))
+            
+            fig.add_trace(go.Scatterpolar(
+                r=tempo_norm,
+                theta=categories,
+                fill='toself',
+                name='Rapidez',
+                line=dict(color="#1cc88a")
+            ))
+            
+            fig.add_trace(go.Scatterpolar(
+                r=margem_norm,
+                theta=categories,
+                fill='toself',
+                name='Margem',
+                line=dict(color="#f6c23e")
+            ))
+            
+            fig.update_layout(
+                polar=dict(
+                    radialaxis=dict(
+                        visible=True,
+                        range=[0, 100]
+                    )
+                ),
+                showlegend=True,
+                template="plotly_white",
+                margin=dict(l=20, r=20, t=20, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Recomendação operacional
+        dica = efficiency_insight(loja_eficiencia)
+        if dica:
+            st.info(f"💡 **Dica Operacional:** {dica}")
+    
+    with insight_cols[1]:
+        # Análise de sazonalidade
+        st.markdown("### Padrões de Sazonalidade")
+        
+        # Análise mensal se tiver pelo menos 60 dias de dados
+        if (filtered_df["Data"].max() - filtered_df["Data"].min()).days >= 60:
+            monthly_data = temporal("mes")
+            
+            # Criar nomes de meses para a exibição
+            monthly_data["Mes_Nome"] = monthly_data["Mes"].map(MESES_PT)
+            monthly_data["Periodo"] = monthly_data["Ano"].astype(str) + "-" + monthly_data["Mes_Nome"]
+            
+            # Criar gráfico de linha
+            fig = go.Figure()
+            
+            fig.add_trace(go.Scatter(
+                x=monthly_data["Periodo"],
+                y=monthly_data["Valor_Total"],
+                mode="lines+markers",
+                name="Vendas",
+                line=dict(color="#4e73df", width=3),
+                marker=dict(size=8),
+                hovertemplate="Período: %{x}<br>Vendas: R$ %{y:,.2f}<extra></extra>"
+            ))
+            
+            # Adicionar linha de tendência
+            z = np.polyfit(np.arange(len(monthly_data)), monthly_data["Valor_Total"], 1)
+            p = np.poly1d(z)
+            fig.add_trace(go.Scatter(
+                x=monthly_data["Periodo"],
+                y=p(np.arange(len(monthly_data))),
+                mode="lines",
+                name="Tendência",
+                line=dict(color="red", width=2, dash="dash"),
+                hovertemplate="Período: %{x}<br>Tendência: R$ %{y:,.2f}<extra></extra>"
+            ))
+            
+            fig.update_layout(
+                title="Tendência Mensal de Vendas",
+                #titlefont=dict(size=16),
+                title_font=dict(size=16),  # Note o underscore entre title e font
+                xaxis_title="Período",
+                yaxis_title="Vendas (R$)",
+                template="plotly_white",
+                xaxis=dict(tickangle=45),
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Identificar meses de alta e baixa
+            padrao = seasonality_insight(monthly_data, "Mes")
+            if padrao:
+                st.info(f"💡 **Padrão Sazonal:** {padrao}")
+        
+        else:
+            # Mostrar padrão semanal se não tiver dados mensais suficientes
+            weekly_data = temporal("dia_semana")
+            
+            # Ordenar dias da semana corretamente
+            weekly_data['Dia_Semana_PT'] = weekly_data['Dia_Semana'].map(DIAS_PT)
+            weekly_data = weekly_data.sort_values(by='Dia_Semana', key=lambda x: pd.Categorical(x, categories=DIAS_ORDEM, ordered=True))
+            
+            # Criar gráfico de barras
+            fig = px.bar(
+                weekly_data,
+                x="Dia_Semana_PT",
+                y="Valor_Total",
+                text=weekly_data["Valor_Total"].apply(lambda x: f"R$ {x:,.0f}"),
+                color_discrete_sequence=["#4e73df"],
+                labels={"Valor_Total": "Total de Vendas (R$)", "Dia_Semana_PT": "Dia da Semana"}
+            )
+            
+            fig.update_layout(
+                title="Padrão Semanal de Vendas",
+                #titlefont=dict(size=16),
+                title_font=dict(size=16),  # Note o underscore entre title e font
+                showlegend=False,
+                template="plotly_white",
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            fig.update_traces(textposition="outside")
+            
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Identificar dias de alta e baixa
+            padrao = seasonality_insight(weekly_data, "Dia_Semana")
+            if padrao:
+                st.info(f"💡 **Padrão Semanal:** {padrao}")
+    
+    with insight_cols[2]:
+        # Análise de promoções e descontos
+        st.markdown("### Impacto de Promoções")
+        
+        # Ganho incremental: cada célula promocional contra a base sem promoção casada
+        campanhas_promo, totais_promo = promotion_uplift(filtered_df)
+        
+        if campanhas_promo.empty:
+            st.info(f"💡 **Análise Promocional:** {promotion_insight(totais_promo)}")
+        else:
+            campanhas_promo["Campanha"] = campanhas_promo["Mes"].map(MESES_PT) + "/" + campanhas_promo["Ano"].astype(str)
+            
+            # Criar gráfico de resultados incrementais
+            fig = make_subplots(
+                rows=2, cols=1,
+                specs=[[{"type": "bar"}], [{"type": "bar"}]],
+                subplot_titles=("Resultado Incremental Total", "Resultado por Campanha"),
+                vertical_spacing=0.2
+            )
+            
+            resumo = {
+                "Receita incremental": totais_promo["Receita_Incremental"],
+                "Lucro incremental": totais_promo["Lucro_Incremental"],
+                "Custo do desconto": -totais_promo["Custo_Desconto"]
+            }
+            
+            fig.add_trace(
+                go.Bar(
+                    x=list(resumo),
+                    y=list(resumo.values()),
+                    marker_color=["#4e73df", "#1cc88a", "#e74a3b"],
+                    text=[f"R$ {v:,.0f}" for v in resumo.values()],
+                    textposition="auto",
+                    showlegend=False,
+                    hovertemplate="%{x}: R$ %{y:,.2f}<extra></extra>"
+                ),
+                row=1, col=1
+            )
+            
+            fig.add_trace(
+                go.Bar(
+                    x=campanhas_promo["Campanha"],
+                    y=campanhas_promo["Receita_Incremental"],
+                    name="Receita incremental",
+                    marker_color="#4e73df",
+                    hovertemplate="Campanha: %{x}<br>Receita incremental: R$ %{y:,.2f}<extra></extra>"
+                ),
+                row=2, col=1
+            )
+            
+            fig.add_trace(
+                go.Bar(
+                    x=campanhas_promo["Campanha"],
+                    y=campanhas_promo["Lucro_Incremental"],
+                    name="Lucro incremental",
+                    marker_color="#1cc88a",
+                    hovertemplate="Campanha: %{x}<br>Lucro incremental: R$ %{y:,.2f}<extra></extra>"
+                ),
+                row=2, col=1
+            )
+            
+            fig.update_layout(
+                title="Análise de Impacto das Promoções",
+                title_font=dict(size=16),
+                showlegend=True,
+                template="plotly_white",
+                height=500,
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                margin=dict(l=20, r=20, t=60, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.caption(f"{totais_promo['Celulas']:,} células promocionais (loja × produto × dia da semana, {totais_promo['Dias_Promo']:,.0f} dias com promoção) comparadas com a venda média por dia sem promoção; {totais_promo['Celulas_Sem_Base']:,} sem base comparável.")
+            
+            # Recomendação sobre promoções
+            st.info(f"💡 **Análise Promocional:** {promotion_insight(totais_promo)}")
@@ -0,0 +1,321 @@
+"""Seção "Padrões Temporais de Vendas": mapas de calor, calendário diário e sazonalidade."""
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from acai.calendar import INICIO_MESES, build_calendar, calendar_series, grid_positions, weekly_by_year, year_grid
+
+MESES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+
+# Medidas do calendário diário
+MEDIDAS_CALENDARIO = {"Vendas (R$)": "Valor_Total", "Lucro (R$)": "Lucro_Liquido", "Itens vendidos": "Qtd_Vendida"}
+
+
+def render(ctx):
+    filtered_df = ctx.filtered_df
+    start_date = ctx.start_date
+    end_date = ctx.end_date
+    temporal = ctx.temporal
+    dados = ctx.dados
+    usa_rollups = ctx.usa_rollups
+    
+    # Quarta linha - Mapa de calor de vendas
+    st.markdown("## 🗓️ Padrões Temporais de Vendas")
+    
+    # Verificar se há dados suficientes para análise diária (pelo menos 2 semanas)
+    if (filtered_df["Data"].max() - filtered_df["Data"].min()).days >= 14:
+        # Preparar dados para o mapa de calor
+        # Agregar por dia da semana (Dia_Num é derivado do nome logo abaixo)
+        heatmap_data = temporal("dia_semana")
+        
+        # Ordenar dias da semana corretamente
+        dias_ordem = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        dias_num = [0, 1, 2, 3, 4, 5, 6]
+        dias_ptbr = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+        
+        dias_num_map = dict(zip(dias_ordem, dias_num))
+        dias_ptbr_map = dict(zip(dias_ordem, dias_ptbr))
+        
+        heatmap_data["Dia_Num"] = heatmap_data["Dia_Semana"].map(dias_num_map)
+        #heatmap_data["Dia_Semana_PT"] = heatmap_data["Dia_Semana"].map(dias_ptbr_map)
+        heatmap_data.loc[:, "Dia_Semana_PT"] = heatmap_data["Dia_Semana"].map(dias_ptbr_map)
+        
+        # Reordenar os dados
+        heatmap_data = heatmap_data.sort_values("Dia_Num")
+        
+        # Dados mensais para o segundo mapa de calor
+        if (filtered_df["Data"].max() - filtered_df["Data"].min()).days >= 60:
+            monthly_heatmap = temporal("mes")
+            
+            # Criar nomes de meses para a exibição
+            months = {1: "Jan", 2: "Fev", 3: "Mar", 4: "Abr", 5: "Mai", 6: "Jun", 
+                    7: "Jul", 8: "Ago", 9: "Set", 10: "Out", 11: "Nov", 12: "Dez"}
+            
+            monthly_heatmap["Mes_Nome"] = monthly_heatmap["Mes"].map(months)
+            
+            # Criar dois gráficos lado a lado
+            heatmap_col1, heatmap_col2 = st.columns(2)
+            
+            with heatmap_col1:
+                # Criar mapa de calor semanal
+                #heatmap_data["Vendas"] = "Total"  # Cria uma coluna única com valor constante
+                fig = px.density_heatmap(
+                    heatmap_data,
+                    x="Dia_Semana_PT",
+                    z="Valor_Total",
+                    color_continuous_scale="Viridis",
+                    labels={"Valor_Total": "Vendas (R$)", "Dia_Semana_PT": ""},
+                    text_auto=".2s"
+                )
+                # fig = px.density_heatmap(
+                #     heatmap_data,
+                #     x="Dia_Semana_PT",
+                #     y=["Vendas Semanais"],  # Y fictício para ter apenas uma linha
+                #     z="Valor_Total",
+                #     color_continuous_scale="Viridis",
+                #     labels={"Valor_Total": "Vendas (R$)", "Dia_Semana_PT": ""},
+                #     text_auto=".2s"
+                # )
+                
+                fig.update_layout(
+                    title="Distribuição de Vendas por Dia da Semana",
+                    #titlefont=dict(size=16),
+                    title_font=dict(size=16),  # Note o underscore entre title e font
+                    showlegend=False,
+                    height=250,
+                    yaxis=dict(showticklabels=False),  # Esconder o eixo Y
+                    margin=dict(l=20, r=20, t=40, b=20),
+                    coloraxis_colorbar=dict(title="Vendas (R$)")
+                )
+                
+                st.plotly_chart(fig, use_container_width=True)
+            
+            with heatmap_col2:
+                # Criar mapa de calor mensal
+                fig = px.density_heatmap(
+                    monthly_heatmap,
+                    x="Mes_Nome",
+                    y="Ano",
+                    z="Valor_Total",
+                    color_continuous_scale="Viridis",
+                    labels={"Valor_Total": "Vendas (R$)", "Mes_Nome": "", "Ano": "Ano"},
+                    text_auto=".2s"
+                )
+                
+                fig.update_layout(
+                    title="Distribuição de Vendas por Mês e Ano",
+                    #titlefont=dict(size=16),
+                    title_font=dict(size=16),  # Note o underscore entre title e font
+                    showlegend=False,
+                    height=250,
+                    margin=dict(l=20, r=20, t=40, b=20),
+                    coloraxis_colorbar=dict(title="Vendas (R$)")
+                )
+                
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            # Se não houver dados suficientes para análise mensal, mostrar apenas o mapa semanal em largura total
+            fig = px.density_heatmap(
+                heatmap_data,
+                x="Dia_Semana_PT",
+                y=["Vendas Semanais"],  # Y fictício para ter apenas uma linha
+                z="Valor_Total",
+                color_continuous_scale="Viridis",
+                labels={"Valor_Total": "Vendas (R$)", "Dia_Semana_PT": ""},
+                text_auto=".2s"
+            )
+            
+            fig.update_layout(
+                title="Distribuição de Vendas por Dia da Semana",
+                #titlefont=dict(size=16),
+                title_font=dict(size=16),  # Note o underscore entre title e font
+                showlegend=False,
+                height=250,
+                yaxis=dict(showticklabels=False),  # Esconder o eixo Y
+                margin=dict(l=20, r=20, t=40, b=20),
+                coloraxis_colorbar=dict(title="Vendas (R$)")
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+    
+    # Calendário diário: cada dia do período, inclusive os dias sem vendas (zero)
+    st.markdown("### 📅 Calendário Diário")
+    medida_rotulo = st.selectbox("Medida do calendário", list(MEDIDAS_CALENDARIO))
+    medida = MEDIDAS_CALENDARIO[medida_rotulo]
+    
+    inicio_calendario = time.perf_counter()
+    if usa_rollups:
+        calendario = dados["calendario"]
+    else:
+        # Com produtos ou categorias restritos o calendário é refeito a partir do cubo
+        cubo = dados["cubo"]
+        categoria_produto = dict(zip(cubo["rotulos"]["Produto"], cubo["categorias"]))
+        calendario = build_calendar(cubo, [p for p in ctx.produtos if categoria_produto.get(p) in ctx.categorias])
+    serie = calendar_series(calendario, start_date, end_date, ctx.lojas, ctx.canais, medida)
+    tempo_calendario = time.perf_counter() - inicio_calendario
+    
+    if serie.empty:
+        st.info("Não há dias do período selecionado no calendário dos dados.")
+    else:
+        grade = year_grid(serie)
+        datas_grade = np.full(grade.shape, "", dtype=object)
+        datas_grade[grid_positions(serie.index)] = serie.index.strftime("%d/%m/%Y")
+        
+        fig = go.Figure(go.Heatmap(
+            z=grade.to_numpy(),
+            x=grade.columns,
+            y=grade.index.astype(str),
+            customdata=datas_grade,
+            colorscale="Greens",
+            xgap=1,
+            ygap=1,
+            colorbar=dict(title=medida_rotulo),
+            hovertemplate="%{customdata}<br>" + medida_rotulo + ": %{z:,.2f}<extra></extra>"
+        ))
+        fig.update_layout(
+            title="Calendário por Dia do Ano",
+            title_font=dict(size=16),
+            template="plotly_white",
+            height=120 + 40 * len(grade),
+            xaxis=dict(tickvals=INICIO_MESES, ticktext=MESES, showgrid=False),
+            yaxis=dict(autorange="reversed", showgrid=False),
+            margin=dict(l=20, r=20, t=40, b=20)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        dias_sem_vendas = int((serie == 0).sum())
+        st.caption(
+            f"{len(serie):,} dias no período, {dias_sem_vendas:,} sem vendas (zero no calendário). "
+            f"Recorte do calendário em {tempo_calendario * 1000:.1f} ms."
+        )
+        
+        # Semanas ISO comparadas entre os anos (só semanas completas no período)
+        totais_semana, dias_semana = weekly_by_year(serie)
+        semanas = totais_semana.where(dias_semana == 7)
+        if len(semanas) > 1 and semanas.notna().any(axis=None):
+            week_col1, week_col2 = st.columns([3, 2])
+            
+            with week_col1:
+                semanas_longo = semanas.stack().rename(medida).reset_index()
+                semanas_longo["Ano_ISO"] = semanas_longo["Ano_ISO"].astype(str)
+                fig = px.line(
+                    semanas_longo,
+                    x="Semana",
+                    y=medida,
+                    color="Ano_ISO",
+                    color_discrete_sequence=px.colors.qualitative.Pastel,
+                    labels={medida: medida_rotulo, "Semana": "Semana ISO", "Ano_ISO": "Ano"}
+                )
+                fig.update_layout(
+                    title="Semanas do Ano Comparadas",
+                    title_font=dict(size=16),
+                    template="plotly_white",
+                    height=350,
+                    hovermode="x unified",
+                    margin=dict(l=20, r=20, t=40, b=20)
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            
+            with week_col2:
+                completas = semanas.columns[semanas.notna().any()].tolist()
+                ultima = int(semanas.stack().index[-1][1])
+                semana = st.selectbox("Semana ISO", completas, index=completas.index(ultima))
+                comparacao_semana = semanas[semana].dropna().rename(medida).to_frame()
+                comparacao_semana["Variacao"] = comparacao_semana[medida].pct_change() * 100
+                st.dataframe(
+                    comparacao_semana.reset_index(),
+                    column_config={
+                        "Ano_ISO": st.column_config.NumberColumn("Ano", format="%d"),
+                        medida: st.column_config.NumberColumn(medida_rotulo, format="%.2f"),
+                        "Variacao": st.column_config.NumberColumn("Variação (%)", format="%.1f%%"),
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+                st.caption("Variação em relação à mesma semana do ano anterior.")
+    
+    # Detalhamento ano → meses → semanas servido pelos agregados temporais
+    with st.expander("🔎 Detalhar por ano"):
+        yearly_data = temporal("ano")
+        
+        if yearly_data.empty:
+            st.info("Não há dados no período selecionado para detalhar.")
+        else:
+            fig = go.Figure(go.Bar(
+                x=yearly_data["Ano"].astype(str),
+                y=yearly_data["Valor_Total"],
+                marker_color="#4e73df",
+                text=yearly_data["Valor_Total"].apply(lambda x: f"R$ {x:,.0f}"),
+                textposition="auto",
+                hovertemplate="Ano: %{x}<br>Vendas: R$ %{y:,.2f}<extra></extra>"
+            ))
+            
+            fig.update_layout(
+                title="Vendas por Ano",
+                title_font=dict(size=16),
+                template="plotly_white",
+                height=300,
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+            
+            anos = yearly_data["Ano"].tolist()
+            ano_detalhe = st.selectbox("Ano para detalhar", anos, index=len(anos) - 1)
+            
+            # Limitar o ano (e as semanas ISO do ano) ao período filtrado
+            inicio_ano = max(pd.to_datetime(start_date), pd.Timestamp(year=ano_detalhe, month=1, day=1))
+            fim_ano = min(pd.to_datetime(end_date), pd.Timestamp(year=ano_detalhe, month=12, day=31))
+            inicio_iso = max(pd.to_datetime(start_date), pd.Timestamp(datetime.fromisocalendar(ano_detalhe, 1, 1)))
+            fim_iso = min(pd.to_datetime(end_date), pd.Timestamp(datetime.fromisocalendar(ano_detalhe + 1, 1, 1)) - timedelta(days=1))
+            
+            meses_ano = temporal("mes", inicio_ano, fim_ano)
+            semanas_ano = temporal("semana", inicio_iso, fim_iso)
+            nivel_semanas = semanas_ano.attrs["nivel"]
+            semanas_ano = semanas_ano[semanas_ano["Ano_ISO"] == ano_detalhe]
+            
+            months = {1: "Jan", 2: "Fev", 3: "Mar", 4: "Abr", 5: "Mai", 6: "Jun", 
+                    7: "Jul", 8: "Ago", 9: "Set", 10: "Out", 11: "Nov", 12: "Dez"}
+            
+            drill_col1, drill_col2 = st.columns(2)
+            
+            with drill_col1:
+                fig = px.bar(
+                    meses_ano,
+                    x=meses_ano["Mes"].map(months),
+                    y="Valor_Total",
+                    color_discrete_sequence=["#1cc88a"],
+                    labels={"Valor_Total": "Vendas (R$)", "x": ""}
+                )
+                fig.update_layout(
+                    title=f"Vendas Mensais em {ano_detalhe}",
+                    title_font=dict(size=16),
+                    template="plotly_white",
+                    height=300,
+                    margin=dict(l=20, r=20, t=40, b=20)
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            
+            with drill_col2:
+                fig = px.bar(
+                    semanas_ano,
+                    x="Semana",
+                    y="Valor_Total",
+                    color_discrete_sequence=["#36b9cc"],
+                    labels={"Valor_Total": "Vendas (R$)", "Semana": "Semana ISO"}
+                )
+                fig.update_layout(
+                    title=f"Vendas Semanais em {ano_detalhe}",
+                    title_font=dict(size=16),
+                    template="plotly_white",
+                    height=300,
+                    margin=dict(l=20, r=20, t=40, b=20)
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            
+            st.caption(f"Níveis de agregação usados: ano → {yearly_data.attrs['nivel']}, meses → {meses_ano.attrs['nivel']}, semanas → {nivel_semanas}")
@@ -0,0 +1,65 @@
+"""Seção "Sensibilidade a Preço": elasticidade-preço por produto e canal."""
+import plotly.graph_objects as go
+import streamlit as st
+
+from acai.elasticity import price_elasticity
+
+
+def render(ctx):
+    filtered_df = ctx.filtered_df
+    
+    # Elasticidade-preço da demanda por produto e canal
+    st.markdown("## 💲 Sensibilidade a Preço")
+    elastic_col1, elastic_col2 = st.columns([3, 1])
+    
+    with elastic_col2:
+        elasticidade_por_loja = st.checkbox("Separar por loja")
+        top_elasticidade = st.slider("Grupos exibidos", 5, 50, 15)
+    
+    grupos_elasticidade = ["Produto", "Canal"] + (["Localizacao"] if elasticidade_por_loja else [])
+    elasticidade = price_elasticity(filtered_df, grupos_elasticidade)
+    
+    with elastic_col1:
+        if elasticidade.empty:
+            st.info("💡 **Elasticidade:** Dados insuficientes para estimar a elasticidade (são necessários pelo menos 10 dias com vendas por grupo).")
+        else:
+            # Ordenado do mais sensível a preço (mais negativo) para o menos sensível
+            exibidos = elasticidade.head(top_elasticidade)
+            rotulos = exibidos[grupos_elasticidade].astype(str).agg(" · ".join, axis=1)
+            
+            fig = go.Figure(go.Scatter(
+                x=exibidos["Elasticidade"],
+                y=rotulos,
+                mode="markers",
+                marker=dict(size=10, color=exibidos["Elasticidade"], colorscale="RdYlGn", reversescale=False),
+                error_x=dict(
+                    type="data",
+                    symmetric=False,
+                    array=exibidos["IC_Superior"] - exibidos["Elasticidade"],
+                    arrayminus=exibidos["Elasticidade"] - exibidos["IC_Inferior"],
+                    color="#858796"
+                ),
+                customdata=exibidos[["IC_Inferior", "IC_Superior", "Observacoes"]],
+                hovertemplate="%{y}<br>Elasticidade: %{x:.2f}<br>IC 95%: [%{customdata[0]:.2f}, %{customdata[1]:.2f}]<br>Dias: %{customdata[2]}<extra></extra>"
+            ))
+            
+            fig.add_vline(x=-1, line=dict(color="red", width=1, dash="dash"))
+            
+            fig.update_layout(
+                title="Elasticidade-Preço da Demanda (IC 95%)",
+                title_font=dict(size=16),
+                xaxis_title="Elasticidade (variação % da quantidade por 1% de preço)",
+                yaxis=dict(autorange="reversed"),
+                template="plotly_white",
+                height=max(300, 25 * len(exibidos)),
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+    
+    with elastic_col2:
+        if not elasticidade.empty:
+            mais_sensivel = elasticidade.iloc[0]
+            nome_sensivel = " · ".join(str(mais_sensivel[c]) for c in grupos_elasticidade)
+            st.caption(f"{len(elasticidade):,} regressões log-log ajustadas em {elasticidade.attrs['tempo'] * 1000:.0f} ms.")
+            st.info(f"💡 **Preço:** {nome_sensivel} é o mais sensível a preço (elasticidade {mais_sensivel['Elasticidade']:.2f}). Abaixo de -1 (linha vermelha), reduções de preço tendem a aumentar a receita.")
@@ -0,0 +1,130 @@
+"""Seção "Análise de Produtos e Canais": ranking, hierarquia de categorias e canais."""
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from acai.ranking import OUTROS, category_tree, rank_products
+
+
+def render(ctx):
+    # Segunda linha de gráficos
+    st.markdown("## 🔍 Análise de Produtos e Canais")
+    chart2_col1, chart2_col2 = st.columns(2)
+    
+    # Agregado por produto usado no ranking, na hierarquia e nos insights (mantido pelo filtro cruzado)
+    produtos_agregado = ctx.cruzado.selected("Produto")[["Produto", "Categoria", "Valor_Total", "Qtd_Vendida", "Lucro_Liquido"]]
+    
+    with chart2_col1:
+        top_n_produtos = st.slider("Produtos no ranking", 5, 50, 10)
+        aba_ranking, aba_hierarquia = st.tabs(["Ranking", "Categorias"])
+        
+        with aba_ranking:
+            # Top produtos mais vendidos; os demais somados em "Outros"
+            product_analysis = rank_products(produtos_agregado, top_n_produtos)
+            product_analysis["Margem"] = (product_analysis["Lucro_Liquido"] / product_analysis["Valor_Total"]) * 100
+            
+            # Criar gráfico de barras com cores por categoria
+            fig = px.bar(
+                product_analysis,
+                x="Produto",
+                y="Valor_Total",
+                color="Categoria",
+                text=product_analysis["Valor_Total"].apply(lambda x: f"R$ {x:,.0f}"),
+                hover_data=["Qtd_Vendida", "Margem"],
+                color_discrete_sequence=px.colors.qualitative.Pastel,
+                color_discrete_map={OUTROS: "#d1d3e2"},
+                labels={"Valor_Total": "Total de Vendas (R$)", "Produto": "", "Margem": "Margem de Lucro (%)"}
+            )
+            
+            fig.update_layout(
+                title=f"Top {top_n_produtos} Produtos por Vendas",
+                #titlefont=dict(size=16),
+                title_font=dict(size=16),  # Note o underscore entre title e font
+                showlegend=True,
+                template="plotly_white",
+                margin=dict(l=20, r=20, t=40, b=20),
+                xaxis=dict(tickangle=45, categoryorder="array", categoryarray=product_analysis["Produto"])
+            )
+            
+            fig.update_traces(textposition="outside")
+            
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with aba_hierarquia:
+            # Categoria → Produto a partir do mesmo agregado
+            arvore = category_tree(produtos_agregado, top_n_produtos)
+            arvore["Margem"] = (arvore["Lucro_Liquido"] / arvore["Valor_Total"]) * 100
+            
+            fig = px.treemap(
+                arvore,
+                path=[px.Constant("Todos"), "Categoria", "Produto"],
+                values="Valor_Total",
+                color="Margem",
+                color_continuous_scale="RdYlGn",
+                hover_data={"Qtd_Vendida": True},
+                labels={"Valor_Total": "Vendas (R$)", "Margem": "Margem (%)", "Qtd_Vendida": "Quantidade"}
+            )
+            
+            fig.update_layout(
+                title=f"Vendas por Categoria e Produto (top {top_n_produtos} por categoria)",
+                title_font=dict(size=16),
+                template="plotly_white",
+                margin=dict(l=20, r=20, t=40, b=20)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+    
+    with chart2_col2:
+        # Análise por canal de vendas
+        canal_analysis = ctx.cruzado.selected("Canal")[["Canal", "Valor_Total", "Clientes_Unicos", "Lucro_Liquido"]]
+        
+        canal_analysis["Margem"] = (canal_analysis["Lucro_Liquido"] / canal_analysis["Valor_Total"]) * 100
+        canal_analysis["Ticket_Medio"] = canal_analysis["Valor_Total"] / canal_analysis["Clientes_Unicos"]
+        canal_analysis = canal_analysis.sort_values("Valor_Total", ascending=False)
+        
+        # Criar gráfico de pizza
+        fig = make_subplots(
+            rows=1, cols=2,
+            specs=[[{"type": "pie"}, {"type": "bar"}]],
+            subplot_titles=("Distribuição de Vendas por Canal", "Ticket Médio por Canal")
+        )
+        
+        # Gráfico de pizza
+        fig.add_trace(
+            go.Pie(
+                labels=canal_analysis["Canal"],
+                values=canal_analysis["Valor_Total"],
+                hole=0.4,
+                textinfo="percent+label",
+                marker=dict(colors=px.colors.qualitative.Set2),
+                textposition="inside",
+                hovertemplate="Canal: %{label}<br>Vendas: R$ %{value:,.2f}<br>Porcentagem: %{percent}<extra></extra>"
+            ),
+            row=1, col=1
+        )
+        
+        # Gráfico de barras para ticket médio
+        fig.add_trace(
+            go.Bar(
+                x=canal_analysis["Canal"],
+                y=canal_analysis["Ticket_Medio"],
+                text=canal_analysis["Ticket_Medio"].apply(lambda x: f"R$ {x:,.2f}"),
+                textposition="auto",
+                marker_color=px.colors.qualitative.Set2,
+                hovertemplate="Canal: %{x}<br>Ticket Médio: R$ %{y:,.2f}<extra></extra>"
+            ),
+            row=1, col=2
+        )
+        
+        fig.update_layout(
+            title="Análise por Canal de Vendas",
+            #titlefont=dict(size=16),
+            title_font=dict(size=16),  # Note o underscore entre title e font
+            template="plotly_white",
+            margin=dict(l=20, r=20, t=60, b=20),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+    ctx.produtos_agregado = produtos_agregado
@@ -0,0 +1,132 @@
+"""Seção "Todas as Regiões": KPIs e comparações somados dos agregados de cada conjunto."""
+import plotly.express as px
+import streamlit as st
+
+from acai.aggregation import aggregate
+from acai.kpis import kpi_summary
+from acai.ranking import top_k
+from acai.regions import REGIAO
+
+
+def render(ctx):
+    consolidado = ctx.consolidado
+    comparacao = ctx.comparacao
+    frase_comparacao = ctx.frase_comparacao
+
+    combinacoes = consolidado["combinacoes"]
+    diario = consolidado["diario"]
+    kpis = kpi_summary(consolidado["totais_periodos"], comparacao)
+
+    # KPIs de todas as regiões
+    cards = [
+        ("Total de Vendas", "#4e73df", "vendas", "R$ {:,.2f}"),
+        ("Lucro Líquido", "#1cc88a", "lucro", "R$ {:,.2f}"),
+        ("Ticket Médio", "#36b9cc", "ticket_medio", "R$ {:,.2f}"),
+        ("Novos Clientes", "#f6c23e", "novos_clientes", "{:,.0f}"),
+    ]
+    for col, (titulo, cor, chave, formato) in zip(st.columns(4), cards):
+        variacao = kpis[chave]["variacao"]
+        col.markdown(
+            f"""
+            <div class="metric-card">
+                <h3 style="color: {cor}; margin-bottom: 0.5rem; font-size: 1rem;">{titulo}</h3>
+                <p style="font-size: 1.5rem; font-weight: 700; margin-bottom: 0.25rem;">{formato.format(kpis[chave]["valor"])}</p>
+                <p style="color: {'green' if variacao >= 0 else 'red'}; font-size: 0.875rem;">
+                    {"📈" if variacao >= 0 else "📉"} {abs(variacao):.1f}% em relação {frase_comparacao}
+                </p>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
+    st.markdown("## 🗺️ Comparação entre Regiões")
+
+    # Totais por região
+    por_regiao = aggregate(combinacoes, REGIAO, {
+        "Valor_Total": "sum",
+        "Lucro_Liquido": "sum",
+        "Qtd_Vendida": "sum",
+        "Clientes_Unicos": "sum",
+        "Clientes_Novos": "sum"
+    }).sort_values("Valor_Total", ascending=False)
+    por_regiao["Margem"] = por_regiao["Lucro_Liquido"] / por_regiao["Valor_Total"] * 100
+    por_regiao["Ticket_Medio"] = por_regiao["Valor_Total"] / por_regiao["Clientes_Unicos"]
+    por_regiao["Participacao"] = por_regiao["Valor_Total"] / por_regiao["Valor_Total"].sum() * 100
+
+    st.dataframe(
+        por_regiao[[REGIAO, "Valor_Total", "Lucro_Liquido", "Margem", "Ticket_Medio", "Clientes_Novos", "Participacao"]],
+        column_config={
+            REGIAO: "Região",
+            "Valor_Total": st.column_config.NumberColumn("Vendas", format="R$ %.2f"),
+            "Lucro_Liquido": st.column_config.NumberColumn("Lucro", format="R$ %.2f"),
+            "Margem": st.column_config.NumberColumn("Margem", format="%.1f%%"),
+            "Ticket_Medio": st.column_config.NumberColumn("Ticket Médio", format="R$ %.2f"),
+            "Clientes_Novos": st.column_config.NumberColumn("Novos Clientes", format="%.0f"),
+            "Participacao": st.column_config.NumberColumn("Participação", format="%.1f%%"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+
+    reg_col1, reg_col2 = st.columns(2)
+
+    with reg_col1:
+        # Vendas por região e canal
+        por_canal = aggregate(combinacoes, [REGIAO, "Canal"], {"Valor_Total": "sum"})
+        fig = px.bar(
+            por_canal,
+            x=REGIAO,
+            y="Valor_Total",
+            color="Canal",
+            color_discrete_sequence=px.colors.qualitative.Pastel,
+            labels={"Valor_Total": "Total de Vendas (R$)", REGIAO: ""}
+        )
+        fig.update_layout(
+            title=dict(text="Vendas por Região e Canal", font=dict(size=16)),
+            template="plotly_white",
+            margin=dict(l=20, r=20, t=40, b=20),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    with reg_col2:
+        # Vendas diárias de cada região
+        fig = px.line(
+            diario,
+            x="Data",
+            y="Valor_Total",
+            color=REGIAO,
+            color_discrete_sequence=px.colors.qualitative.Pastel,
+            labels={"Valor_Total": "Vendas (R$)", REGIAO: "Região"}
+        )
+        fig.update_layout(
+            title=dict(text="Vendas Diárias por Região", font=dict(size=16)),
+            template="plotly_white",
+            margin=dict(l=20, r=20, t=40, b=20),
+            hovermode="x unified",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Melhores lojas de todas as regiões
+    st.markdown("### 🏆 Melhores Lojas")
+    lojas = aggregate(combinacoes, [REGIAO, "Localizacao"], {"Valor_Total": "sum", "Lucro_Liquido": "sum"})
+    lojas = lojas.iloc[top_k(lojas["Valor_Total"], 10)]
+    lojas = lojas.assign(Margem=lojas["Lucro_Liquido"] / lojas["Valor_Total"] * 100)
+    st.dataframe(
+        lojas[[REGIAO, "Localizacao", "Valor_Total", "Lucro_Liquido", "Margem"]],
+        column_config={
+            REGIAO: "Região",
+            "Localizacao": "Loja",
+            "Valor_Total": st.column_config.NumberColumn("Vendas", format="R$ %.2f"),
+            "Lucro_Liquido": st.column_config.NumberColumn("Lucro", format="R$ %.2f"),
+            "Margem": st.column_config.NumberColumn("Margem", format="%.1f%%"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+
+    st.caption(
+        f"Consolidado a partir de {len(combinacoes):,} combinações loja × canal × produto "
+        f"de {por_regiao[REGIAO].nunique()} regiões, sem juntar as vendas linha a linha."
+    )
@@ -0,0 +1,181 @@
+"""Seção "Resumo de Performance e Recomendações": métricas de eficiência e insights finais."""
+import streamlit as st
+
+from acai.aggregation import aggregate
+from acai.panels.alertas import alert_options
+from acai.ranking import top_k
+
+
+def render(ctx):
+    filtered_df = ctx.filtered_df
+    produtos_agregado = ctx.produtos_agregado
+    
+    # Os mesmos alertas da seção Alertas (opções escolhidas lá, resultado em cache)
+    series_alerta, limiar_alerta, dias_alerta = alert_options()
+    alertas_recentes = ctx.latest_alerts(series_alerta, limiar_alerta, dias_alerta)
+    
+    # Sexta linha - Recomendações finais e métricas de eficiência
+    st.markdown("## 📊 Resumo de Performance e Recomendações")
+    
+    # Calcular métricas de performance
+    rentabilidade_media = filtered_df["Rentabilidade"].mean()
+    eficiencia_media = filtered_df["Eficiencia_Operacional"].mean()
+    
+    margem_geral = (filtered_df["Lucro_Liquido"].sum() / filtered_df["Valor_Total"].sum()) * 100
+    
+    # Calcular custo médio de aquisição (se possível)
+    try:
+        # custo_aquisicao = filtered_df[filtered_df["Cliente_Novo"] == True]["Valor_Total"].sum() / filtered_df[filtered_df["Cliente_Novo"] == True]["Clientes_Unicos"].sum()
+        # Use:
+        novos_clientes_df = filtered_df[filtered_df["Cliente_Novo"] == True]
+        total_valor_novos = novos_clientes_df["Valor_Total"].sum()
+        total_clientes_novos = novos_clientes_df["Clientes_Unicos"].sum()
+
+        # Verificar divisão por zero
+        if total_clientes_novos > 0:
+            custo_aquisicao = total_valor_novos / total_clientes_novos
+        else:
+            custo_aquisicao = 0  # Ou qualquer outro valor padrão que faça sentido
+    except:
+        custo_aquisicao = 0
+    
+    # Linha de métricas de performance
+    perf_col1, perf_col2, perf_col3, perf_col4 = st.columns(4)
+    
+    with perf_col1:
+        st.metric(
+            label="Margem Média", 
+            value=f"{margem_geral:.2f}%",
+            delta=f"{margem_geral - 15:.2f}pp" if margem_geral > 15 else f"{margem_geral - 15:.2f}pp",
+            delta_color="normal"
+        )
+    
+    with perf_col2:
+        st.metric(
+            label="Rentabilidade Média", 
+            value=f"{rentabilidade_media:.2f}%",
+            delta=f"{rentabilidade_media - 10:.2f}pp" if rentabilidade_media > 10 else f"{rentabilidade_media - 10:.2f}pp",
+            delta_color="normal"
+        )
+    
+    with perf_col3:
+        st.metric(
+            label="Eficiência Operacional", 
+            value=f"R$ {eficiencia_media:.2f}/min",
+            delta=f"{eficiencia_media - 50:.2f}" if eficiencia_media > 50 else f"{eficiencia_media - 50:.2f}",
+            delta_color="normal"
+        )
+    
+    with perf_col4:
+        if custo_aquisicao > 0:
+            st.metric(
+                label="Custo Médio Aquisição", 
+                value=f"R$ {custo_aquisicao:.2f}",
+                delta=None
+            )
+        else:
+            st.metric(
+                label="Taxa de Novos Clientes", 
+                value=f"{(filtered_df[filtered_df['Cliente_Novo'] == True]['Clientes_Unicos'].sum() / filtered_df['Clientes_Unicos'].sum() * 100):.2f}%",
+                delta=None
+            )
+    
+    # Resumo e recomendações finais
+    st.markdown("### 💎 Principais Insights e Recomendações")
+    
+    # Criar insights baseados nos dados
+    insights = []
+    
+    # Insight 1 - Produtos
+    try:
+        vendas_produto = aggregate(produtos_agregado, "Produto", {"Valor_Total": "sum"})
+        vendas_categoria = aggregate(produtos_agregado, "Categoria", {"Valor_Total": "sum"})
+        top_produto = vendas_produto["Produto"].iloc[top_k(vendas_produto["Valor_Total"], 1)[0]]
+        top_categoria = vendas_categoria["Categoria"].iloc[top_k(vendas_categoria["Valor_Total"], 1)[0]]
+        insights.append(f"O produto mais vendido é **{top_produto}** da categoria **{top_categoria}**. Considere destacá-lo em campanhas e garantir sempre disponibilidade em estoque.")
+    except:
+        pass
+    
+    # Insight 2 - Vendas por Dia/Período
+    try:
+        if "Dia_Semana" in filtered_df.columns:
+            top_dia = ctx.temporal("dia_semana").nlargest(1, "Valor_Total")["Dia_Semana"].iloc[0]
+            dias_ptbr_map = {
+                'Monday': 'Segunda-feira', 
+                'Tuesday': 'Terça-feira', 
+                'Wednesday': 'Quarta-feira', 
+                'Thursday': 'Quinta-feira', 
+                'Friday': 'Sexta-feira', 
+                'Saturday': 'Sábado', 
+                'Sunday': 'Domingo'
+            }
+            top_dia_pt = dias_ptbr_map.get(top_dia, top_dia)
+            insights.append(f"O dia com maior volume de vendas é **{top_dia_pt}**. Considere aumentar a equipe e estoques neste dia para maximizar as vendas.")
+    except:
+        pass
+    
+    # Insight 3 - Canal mais rentável
+    try:
+        canal_rentability = ctx.cruzado.selected("Canal")[["Canal", "Valor_Total", "Lucro_Liquido"]]
+        
+        canal_rentability["Margem"] = (canal_rentability["Lucro_Liquido"] / canal_rentability["Valor_Total"]) * 100
+        top_canal_margin = canal_rentability.loc[canal_rentability["Margem"].idxmax()]
+        
+        insights.append(f"O canal **{top_canal_margin['Canal']}** apresenta a maior margem de lucro ({top_canal_margin['Margem']:.1f}%). Avalie a possibilidade de direcionar mais recursos para este canal de vendas.")
+    except:
+        pass
+    
+    # Insight 4 - Eficiência Operacional
+    try:
+        tempo_medio_preparo = filtered_df["Tempo_Preparo"].mean()
+        loja_mais_rapida = aggregate(filtered_df, "Localizacao", {"Tempo_Preparo": "mean"}).nsmallest(1, "Tempo_Preparo")
+        loja_mais_rapida_nome = loja_mais_rapida["Localizacao"].iloc[0]
+        loja_mais_rapida_tempo = loja_mais_rapida["Tempo_Preparo"].iloc[0]
+        
+        insights.append(f"A loja **{loja_mais_rapida_nome}** tem o menor tempo médio de preparo ({loja_mais_rapida_tempo:.1f} min vs. média geral de {tempo_medio_preparo:.1f} min). Analise seus processos para aplicar nas demais unidades.")
+    except:
+        pass
+    
+    # Insight 5 - Promoções
+    try:
+        if "Promocao" in filtered_df.columns:
+            promo_df = filtered_df[filtered_df["Promocao"] == True]
+            sem_promo_df = filtered_df[filtered_df["Promocao"] == False]
+            
+            if not promo_df.empty and not sem_promo_df.empty:
+                promo_lucro = promo_df["Lucro_Liquido"].sum() / promo_df["Valor_Total"].sum() * 100
+                sem_promo_lucro = sem_promo_df["Lucro_Liquido"].sum() / sem_promo_df["Valor_Total"].sum() * 100
+                
+                if promo_lucro > sem_promo_lucro:
+                    insights.append(f"Surpreendentemente, as vendas com promoção têm maior margem ({promo_lucro:.1f}%) do que as sem promoção ({sem_promo_lucro:.1f}%). Isto sugere que as promoções estão atraindo maior volume sem comprometer a lucratividade.")
+                else:
+                    diff = sem_promo_lucro - promo_lucro
+                    if diff > 10:
+                        nivel = "significativamente"
+                    else:
+                        nivel = "levemente"
+                    
+                    insights.append(f"As vendas sem promoção são {nivel} mais rentáveis ({sem_promo_lucro:.1f}% vs {promo_lucro:.1f}%). Considere ajustar os percentuais de desconto para melhorar a margem das vendas promocionais.")
+    except:
+        pass
+    
+    # Insight 6 - Alerta mais forte do período recente
+    try:
+        if not alertas_recentes.empty:
+            alerta = alertas_recentes.iloc[0]
+            descricao = " / ".join(str(alerta[c]) for c in series_alerta)
+            movimento = "queda" if alerta["Variacao"] < 0 else "alta"
+            insights.append(f"🚨 **{descricao}** teve {movimento} de {abs(alerta['Variacao']):.0f}% nas vendas em {alerta['Data'].strftime('%d/%m/%Y')} (R$ {alerta['Valor']:,.2f} vs. R$ {alerta['Esperado']:,.2f} esperados para o dia da semana). Verifique a operação desta unidade.")
+    except:
+        pass
+    
+    # Apresentar insights em formato de cartões
+    if insights:
+        st.markdown("#### Principais Insights:")
+        
+        for i, insight in enumerate(insights):
+            st.markdown(f"""
+            <div style="background-color: white; border-left: 4px solid #4e73df; padding: 15px; border-radius: 4px; margin-bottom: 15px; box-shadow: 0 0.15rem 1.75rem 0 rgba(58, 59, 69, 0.15);">
+                <p style="margin: 0; color: #5a5c69;">{i+1}. {insight}</p>
+            </div>
+            """, unsafe_allow_html=True)
@@ -0,0 +1,121 @@
+"""Seção "Segmentação de Lojas": segmentos por características e pares mais próximos."""
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from acai.segments import K_MAXIMO, PREFIXO_MIX, segment_stores, store_features
+
+ROTULOS = {
+    "Valor_Total": "Vendas (R$)",
+    "Ticket_Medio": "Ticket Médio (R$)",
+    "Margem": "Margem (%)",
+    "Tempo_Preparo": "Tempo de Preparo (min)",
+    "Pct_Promocao": "Vendas em Promoção (%)",
+    "Pct_Novos": "Clientes Novos (%)",
+    "Utilizacao": "Utilização (%)",
+}
+
+
+def _column_config(colunas):
+    config = {"Localizacao": "Loja"}
+    for col in colunas:
+        if col in ("Valor_Total", "Ticket_Medio"):
+            config[col] = st.column_config.NumberColumn(ROTULOS[col], format="R$ %.2f")
+        elif col in ROTULOS:
+            config[col] = st.column_config.NumberColumn(ROTULOS[col], format="%.1f")
+        elif col.startswith(PREFIXO_MIX):
+            config[col] = st.column_config.NumberColumn(f"{col[len(PREFIXO_MIX):]} (%)", format="%.1f")
+    return config
+
+
+def render(ctx):
+    filtered_df = ctx.filtered_df
+    capacidade = ctx.dados["capacidade"]
+
+    st.markdown("## 🧩 Segmentação de Lojas")
+
+    capacidade = capacidade[
+        (capacidade["Data"] >= pd.to_datetime(ctx.start_date)) &
+        (capacidade["Data"] <= pd.to_datetime(ctx.end_date)) &
+        (capacidade["Localizacao"].isin(ctx.lojas))
+    ]
+    caracteristicas = store_features(filtered_df, capacidade)
+    if len(caracteristicas) < 3:
+        st.info("Selecione pelo menos 3 lojas com vendas no período para segmentá-las.")
+        return
+
+    seg_col1, seg_col2 = st.columns([1, 3])
+
+    with seg_col1:
+        opcoes = ["Automático"] + list(range(2, min(K_MAXIMO, len(caracteristicas) - 1) + 1))
+        escolha = st.selectbox("Número de segmentos", opcoes)
+        pares = st.slider("Pares por loja", 1, min(5, len(caracteristicas) - 1), min(3, len(caracteristicas) - 1))
+
+    segmentacao = segment_stores(caracteristicas, None if escolha == "Automático" else escolha, pares)
+    lojas = segmentacao["caracteristicas"]
+
+    with seg_col1:
+        st.metric("Segmentos", segmentacao["k"], help="Escolha automática pela maior silhueta média (de -1 a 1).")
+        st.caption(f"Silhueta: {segmentacao['silhuetas'][segmentacao['k']]:.2f}")
+
+    with seg_col2:
+        # Lojas nas duas componentes principais das características padronizadas
+        variancia = segmentacao["variancia"]
+        fig = px.scatter(
+            lojas.assign(Segmento=lojas["Segmento"].astype(str)),
+            x="Componente_1",
+            y="Componente_2",
+            color="Segmento",
+            hover_name="Localizacao",
+            hover_data={"Ticket_Medio": ":.2f", "Margem": ":.1f", "Tempo_Preparo": ":.1f", "Componente_1": False, "Componente_2": False},
+            text="Localizacao" if len(lojas) <= 30 else None,
+            color_discrete_sequence=px.colors.qualitative.Pastel,
+            labels={
+                "Componente_1": f"Componente 1 ({variancia[0]:.0%} da variação)",
+                "Componente_2": f"Componente 2 ({variancia[-1]:.0%} da variação)",
+                **ROTULOS
+            }
+        )
+        fig.update_traces(textposition="top center", marker=dict(size=12))
+        fig.update_layout(
+            title=dict(text="Lojas por Segmento", font=dict(size=16)),
+            template="plotly_white",
+            margin=dict(l=20, r=20, t=40, b=20),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Perfil médio de cada segmento
+    perfis = segmentacao["perfis"]
+    st.dataframe(
+        perfis,
+        column_config={"Segmento": st.column_config.NumberColumn("Segmento", format="%d"), **_column_config(perfis.columns)},
+        hide_index=True,
+        use_container_width=True
+    )
+
+    # Pares mais próximos de uma loja
+    nomes = lojas["Localizacao"].astype(str).tolist()
+    loja = st.selectbox("Pares mais próximos de", nomes)
+    tabela_pares = segmentacao["pares"]
+    tabela_pares = tabela_pares[tabela_pares["Localizacao"] == loja]
+    detalhes = lojas.assign(Localizacao=lojas["Localizacao"].astype(str)).set_index("Localizacao")
+    colunas_par = ["Segmento", "Ticket_Medio", "Margem", "Tempo_Preparo", "Pct_Promocao", "Pct_Novos", "Utilizacao"]
+    tabela_pares = tabela_pares.join(detalhes[colunas_par], on="Par")
+    st.dataframe(
+        tabela_pares.drop(columns="Localizacao"),
+        column_config={
+            "Posicao": st.column_config.NumberColumn("#", format="%d"),
+            "Par": "Loja",
+            "Distancia": st.column_config.NumberColumn("Distância", format="%.2f"),
+            "Mesmo_Segmento": "Mesmo segmento",
+            "Segmento": st.column_config.NumberColumn("Segmento", format="%d"),
+            **_column_config(colunas_par)
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption(
+        f"{loja} está no segmento {int(detalhes.loc[loja, 'Segmento'])}. Distância nas características padronizadas; "
+        f"{len(lojas)} lojas segmentadas em {segmentacao['tempo'] * 1000:.0f} ms."
+    )
@@ -0,0 +1,203 @@
+"""Seção "Tendências de Vendas": série diária comparada com a base e vendas por canal."""
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from acai.comparison import aligned_series
+from acai.sampling import estimate_totals
+
+
+def render_estimate(slot, amostra, linhas_amostra, mask_amostra):
+    """Tendência diária estimada pela amostra, com faixa do intervalo de confiança.
+
+    Desenhada pelo dashboard em ``slot`` logo abaixo dos cards, antes do
+    cálculo exato, e apagada quando os valores exatos ficam prontos; a seção
+    desenha só a tendência exata.
+    """
+    daily_estimado = estimate_totals(amostra, mask_amostra, {
+        "Valor_Total": linhas_amostra["Valor_Total"],
+        "Lucro_Liquido": linhas_amostra["Lucro_Liquido"]
+    }, by="Data")
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=pd.concat([daily_estimado["Data"], daily_estimado["Data"][::-1]]),
+        y=pd.concat([
+            daily_estimado["Valor_Total"] + daily_estimado["Valor_Total_erro"],
+            (daily_estimado["Valor_Total"] - daily_estimado["Valor_Total_erro"])[::-1]
+        ]),
+        fill="toself",
+        fillcolor="rgba(78, 115, 223, 0.2)",
+        line=dict(width=0),
+        name="IC 95%",
+        hoverinfo="skip"
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=daily_estimado["Data"],
+        y=daily_estimado["Valor_Total"],
+        mode="lines",
+        name="Vendas (estimativa)",
+        line=dict(color="#4e73df", width=2, dash="dot"),
+        hovertemplate="Data: %{x}<br>Vendas ≈ R$ %{y:,.2f}<extra></extra>"
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=daily_estimado["Data"],
+        y=daily_estimado["Lucro_Liquido"],
+        mode="lines",
+        name="Lucro (estimativa)",
+        line=dict(color="#1cc88a", width=2, dash="dot"),
+        hovertemplate="Data: %{x}<br>Lucro ≈ R$ %{y:,.2f}<extra></extra>"
+    ))
+
+    fig.update_layout(
+        title=dict(
+            text="Vendas e Lucro Diário (estimativa, calculando valores exatos...)",
+            font=dict(size=16)
+        ),
+        xaxis_title="Data",
+        yaxis_title="Valor (R$)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        template="plotly_white",
+        margin=dict(l=20, r=20, t=40, b=20),
+        hovermode="x unified"
+    )
+
+    slot.plotly_chart(fig, use_container_width=True)
+
+
+def daily_figure(ctx):
+    """Vendas e lucro diários do período, com as vendas da base alinhadas dia a dia."""
+    comparison_df = ctx.comparison_df
+    periodos = ctx.periodos
+    comparacao = ctx.comparacao
+    temporal = ctx.temporal
+    
+    # Agrupar por data para tendência diária
+    daily_sales = temporal("dia")
+    
+    # Criar gráfico de linha com Plotly
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=daily_sales["Data"], 
+        y=daily_sales["Valor_Total"],
+        mode="lines",
+        name="Vendas",
+        line=dict(color="#4e73df", width=3),
+        hovertemplate="Data: %{x}<br>Vendas: R$ %{y:,.2f}<extra></extra>"
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=daily_sales["Data"], 
+        y=daily_sales["Lucro_Liquido"],
+        mode="lines",
+        name="Lucro",
+        line=dict(color="#1cc88a", width=3),
+        hovertemplate="Data: %{x}<br>Lucro: R$ %{y:,.2f}<extra></extra>"
+    ))
+    
+    # Vendas da base de comparação alinhadas dia a dia ao período atual
+    base_diaria = aligned_series(comparison_df, periodos, ["Valor_Total"], comparacao)
+    
+    fig.add_trace(go.Scatter(
+        x=base_diaria["Data"],
+        y=base_diaria["Valor_Total"],
+        customdata=base_diaria["Data_Base"].dt.strftime("%d/%m/%Y"),
+        mode="lines",
+        name=f"Vendas ({comparacao.lower()})",
+        line=dict(color="#858796", width=2, dash="dash"),
+        hovertemplate="Data base: %{customdata}<br>Vendas: R$ %{y:,.2f}<extra></extra>"
+    ))
+    
+    fig.update_layout(
+        # title="Vendas e Lucro Diário",
+        # titlefont=dict(size=16),
+        title=dict(
+            text="Vendas e Lucro Diário",
+            font=dict(size=16)
+        ),
+                xaxis_title="Data",
+        yaxis_title="Valor (R$)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        template="plotly_white",
+        margin=dict(l=20, r=20, t=40, b=20),
+        hovermode="x unified"
+    )
+    return fig
+
+
+def weekday_figure(ctx):
+    """Vendas e quantidade por dia da semana no período."""
+    temporal = ctx.temporal
+    
+    # Análise por dia da semana
+    weekday_analysis = temporal("dia_semana")
+    
+    # Ordenar dias da semana corretamente
+    dias_ordem = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    dias_ptbr = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+    dias_map = dict(zip(dias_ordem, dias_ptbr))
+    
+    weekday_analysis['Dia_Semana_PT'] = weekday_analysis['Dia_Semana'].map(dias_map)
+    weekday_analysis = weekday_analysis.sort_values(by='Dia_Semana', key=lambda x: pd.Categorical(x, categories=dias_ordem, ordered=True))
+    
+    # Criar gráfico de barras
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        x=weekday_analysis["Dia_Semana_PT"],
+        y=weekday_analysis["Valor_Total"],
+        name="Vendas",
+        marker_color="#4e73df",
+        hovertemplate="Dia: %{x}<br>Vendas: R$ %{y:,.2f}<extra></extra>"
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=weekday_analysis["Dia_Semana_PT"],
+        y=weekday_analysis["Qtd_Vendida"],
+        name="Quantidade",
+        mode="lines+markers",
+        marker=dict(color="#f6c23e", size=10),
+        line=dict(color="#f6c23e", width=3),
+        yaxis="y2",
+        hovertemplate="Dia: %{x}<br>Qtd: %{y:,.0f}<extra></extra>"
+    ))
+    
+    fig.update_layout(
+        title="Desempenho por Dia da Semana",
+        #titlefont=dict(size=16),
+        title_font=dict(size=16),  # Note o underscore entre title e font
+        xaxis_title="Dia da Semana",
+        yaxis=dict(
+            title="Vendas (R$)",
+            title_font=dict(color="#4e73df"),
+            tickfont=dict(color="#4e73df")
+        ),
+        yaxis2=dict(
+            title="Quantidade Vendida",
+            title_font=dict(color="#f6c23e"),
+            tickfont=dict(color="#f6c23e"),
+            anchor="x",
+            overlaying="y",
+            side="right"
+        ),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        template="plotly_white",
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    return fig
+
+
+def render(ctx):
+    # Gráficos na primeira linha; as figuras ficam no cache por visão (ctx.figure)
+    st.markdown("## 📈 Tendências de Vendas")
+    chart_col1, chart_col2 = st.columns(2)
+    
+    with chart_col1:
+        st.plotly_chart(ctx.figure("tendencia_diaria", lambda: daily_figure(ctx)), use_container_width=True)
+    
+    with chart_col2:
+        st.plotly_chart(ctx.figure("dia_semana", lambda: weekday_figure(ctx)), use_container_width=True)
@@ -0,0 +1,76 @@
+"""Ranking de produtos com seleção parcial dos k maiores e balde "Outros".
+
+A partir do agregado por (Produto, Categoria), ``np.argpartition`` separa os
+k maiores em O(n) e só eles são ordenados; o restante é somado em uma linha
+"Outros". A hierarquia Categoria → Produto usa o mesmo agregado, mantendo os
+k maiores de cada categoria e somando os demais.
+"""
+import numpy as np
+import pandas as pd
+
+from acai.aggregation import aggregate
+
+OUTROS = "Outros"
+
+
+def top_k(valores, k):
+    """Posições dos ``k`` maiores valores, em ordem decrescente."""
+    valores = np.asarray(valores, dtype=float)
+    if k >= len(valores):
+        return np.argsort(-valores, kind="stable")
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    idx = np.argpartition(-valores, k - 1)[:k]
+    return idx[np.argsort(-valores[idx], kind="stable")]
+
+
+def rank_products(agregado, k, medida="Valor_Total", outros=True):
+    """Os ``k`` maiores grupos por ``medida`` e, se houver resto, a linha "Outros".
+
+    As colunas de texto da linha "Outros" recebem o rótulo ``OUTROS``; as
+    numéricas são somadas, então razões (margem, ticket) devem ser
+    recalculadas depois do ranking.
+    """
+    idx = top_k(agregado[medida].to_numpy(), k)
+    ranking = agregado.iloc[idx]
+    if not outros or len(idx) == len(agregado):
+        return ranking.reset_index(drop=True)
+
+    resto = np.ones(len(agregado), dtype=bool)
+    resto[idx] = False
+    numericas = agregado.select_dtypes("number").columns
+    linha = {col: (agregado.loc[resto, col].sum() if col in numericas else OUTROS) for col in agregado.columns}
+    return pd.concat([ranking, pd.DataFrame([linha])], ignore_index=True)
+
+
+def category_tree(agregado, k, medida="Valor_Total", categoria="Categoria", produto="Produto"):
+    """Folhas Categoria → Produto com os ``k`` maiores produtos de cada categoria.
+
+    Os demais produtos de cada categoria viram uma folha "Outros" da própria
+    categoria. A posição de cada produto dentro da categoria sai de uma única
+    ordenação (categoria, -medida), sem laços por categoria.
+    """
+    if agregado.empty:
+        return agregado
+
+    cats = agregado[categoria].astype(str).to_numpy()
+    valores = agregado[medida].to_numpy(dtype=float)
+    ordem = np.lexsort((-valores, cats))
+
+    # Posição dentro da categoria = índice na ordenação - início do bloco
+    cats_ordenadas = cats[ordem]
+    inicio_bloco = np.r_[True, cats_ordenadas[1:] != cats_ordenadas[:-1]]
+    inicio = np.maximum.accumulate(np.where(inicio_bloco, np.arange(len(ordem)), 0))
+    posicao = np.empty(len(ordem), dtype=np.int64)
+    posicao[ordem] = np.arange(len(ordem)) - inicio
+
+    mantidos = agregado[posicao < k].copy()
+    resto = agregado[posicao >= k]
+    if resto.empty:
+        return mantidos.reset_index(drop=True)
+
+    numericas = agregado.select_dtypes("number").columns
+    outros = aggregate(resto, categoria, {col: "sum" for col in numericas})
+    outros[produto] = OUTROS
+    mantidos[[categoria, produto]] = mantidos[[categoria, produto]].astype(str)
+    return pd.concat([mantidos, outros], ignore_index=True)
@@ -0,0 +1,125 @@
+"""Atualização dos dados em segundo plano com troca atômica de versão.
+
+Uma thread observa o arquivo de dados (data de modificação e tamanho). Quando
+ele muda e se estabiliza, o conjunto de dados tipado e os seus agregados são
+reconstruídos fora do caminho das requisições e a nova versão substitui a
+anterior em uma única atribuição. Cada execução do dashboard pega uma
+``Versao`` no início e a usa até o fim, então nunca mistura dados de duas
+versões.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+# Intervalo entre verificações do arquivo, em segundos
+INTERVALO = 5.0
+
+Versao = namedtuple("Versao", ["numero", "carregado_em", "assinatura", "dados", "tempo"])
+
+
+def file_signature(caminho):
+    """(data de modificação em ns, tamanho) do arquivo, ou None se não existir."""
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+    return info.st_mtime_ns, info.st_size
+
+
+class DatasetRefresher:
+    """Mantém a versão atual dos dados e a recarrega quando o arquivo muda.
+
+    ``construir(caminho)`` deve devolver os dados prontos (o DataFrame e os
+    agregados); erros na recarga mantêm a versão anterior e ficam em ``erro``,
+    e o arquivo que falhou só é lido de novo quando mudar outra vez.
+    ``aquecer(versao)``, se informado, roda na thread após a primeira carga e
+    antes de cada troca, para que a nova versão já entre com o cache quente;
+    um erro no aquecimento fica em ``erro_aquecimento`` e não impede a troca.
+    """
+
+    def __init__(self, caminho, construir, aquecer=None, intervalo=INTERVALO):
+        self.caminho = caminho
+        self.construir = construir
+        self.aquecer = aquecer
+        self.intervalo = intervalo
+        self.erro = None
+        self.erro_aquecimento = None
+        self._versao = None
+        # Assinatura do arquivo cuja carga falhou (não é recarregado até mudar)
+        self._falha = None
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _carregar(self, assinatura):
+        inicio = time.perf_counter()
+        dados = self.construir(self.caminho)
+        numero = self._versao.numero + 1 if self._versao else 1
+        return Versao(numero, datetime.now(), assinatura, dados, time.perf_counter() - inicio)
+
+    def _aquecer(self, versao):
+        if self.aquecer is None:
+            return
+        try:
+            self.aquecer(versao)
+        except Exception as e:
+            self.erro_aquecimento = e
+        else:
+            self.erro_aquecimento = None
+
+    def current(self):
+        """Versão atual; a primeira chamada carrega os dados em primeiro plano."""
+        versao = self._versao
+        if versao is not None:
+            return versao
+        with self._lock:
+            if self._versao is None:
+                self._versao = self._carregar(file_signature(self.caminho))
+            return self._versao
+
+    def refresh(self):
+        """Recarrega se o arquivo mudou desde a versão atual. Retorna True se trocou."""
+        assinatura = file_signature(self.caminho)
+        if assinatura is None or assinatura == self._falha:
+            return False
+        if self._versao is not None and assinatura == self._versao.assinatura:
+            return False
+        try:
+            nova = self._carregar(assinatura)
+        except Exception as e:
+            self.erro, self._falha = e, assinatura
+            return False
+        self._falha = None
+        self._aquecer(nova)
+        # Só troca se o arquivo não mudou de novo durante a reconstrução
+        if file_signature(self.caminho) != assinatura:
+            return False
+        with self._lock:
+            self._versao = nova
+        self.erro = None
+        return True
+
+    def _observar(self):
+        try:
+            versao = self.current()
+        except Exception as e:
+            self.erro, self._falha = e, file_signature(self.caminho)
+        else:
+            self._aquecer(versao)
+        while not self._parar.wait(self.intervalo):
+            self.refresh()
+
+    def start(self, preparar=None):
+        """Inicia a thread de observação; ``preparar(thread)`` roda antes do início."""
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._observar, name="acai-refresher", daemon=True)
+            if preparar is not None:
+                preparar(self._thread)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._parar.set()
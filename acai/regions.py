@@ -0,0 +1,75 @@
+"""Visão consolidada de todas as regiões a partir dos agregados de cada uma.
+
+Cada conjunto já tem o cubo loja × canal × produto × dia com as células que
+tiveram vendas (``build_cube``). A visão consolidada reduz o cubo de cada
+região ao período pedido e junta só esses totais (no máximo lojas × canais ×
+produtos linhas por região), sem concatenar as vendas: a memória cresce com
+o número de combinações vendidas, não com o número de linhas de cada arquivo.
+"""
+import numpy as np
+import pandas as pd
+
+from acai.comparison import comparison_periods
+from acai.crossfilter import DIMENSOES_CUBO, MEDIDAS_CUBO, cube_sums
+
+REGIAO = "Regiao"
+
+
+def _cells(cubo, inicio, fim):
+    """Células do cubo com datas em ``[inicio, fim]`` (uma fatia, pois estão ordenadas por dia)."""
+    datas = cubo["datas"]
+    t0 = int(datas.searchsorted(pd.to_datetime(inicio), side="left"))
+    t1 = int(datas.searchsorted(pd.to_datetime(fim), side="right"))
+    return slice(cubo["dias"][t0], cubo["dias"][t1])
+
+
+def region_totals(cubo, inicio, fim):
+    """Medidas por loja, canal e produto no período, só nas combinações com vendas."""
+    celulas = _cells(cubo, inicio, fim)
+    chaves, inverso = np.unique(cubo["combinacao"][celulas], return_inverse=True)
+    soma = cube_sums(cubo["valores"][:, celulas], inverso, len(chaves))
+    posicoes = np.unravel_index(chaves, cubo["forma"])
+    frame = pd.DataFrame({
+        dim: cubo["rotulos"][dim][pos] for dim, pos in zip(DIMENSOES_CUBO, posicoes)
+    })
+    frame["Categoria"] = cubo["categorias"][posicoes[DIMENSOES_CUBO.index("Produto")]]
+    for i, col in enumerate(MEDIDAS_CUBO):
+        frame[col] = soma[:, i]
+    return frame
+
+
+def region_daily(cubo):
+    """Medidas por dia de todo o cubo (dias sem vendas entram com zero)."""
+    frame = pd.DataFrame(cube_sums(cubo["valores"], cubo["dia"], len(cubo["datas"])), columns=MEDIDAS_CUBO)
+    frame.insert(0, "Data", cubo["datas"])
+    return frame
+
+
+def merge_regions(cubos, inicio, fim, baseline=None):
+    """Junta os agregados das regiões (nome -> cubo) no período e nas bases de comparação.
+
+    Retorna ``combinacoes`` (região, loja, canal, produto e medidas do período),
+    ``diario`` (região, dia e medidas do período) e ``totais_periodos``
+    (medidas somadas de todas as regiões em cada período de
+    ``comparison_periods``, no formato esperado por ``kpi_summary``).
+    """
+    periodos = comparison_periods(inicio, fim, baseline)
+    combinacoes, diarios = [], []
+    totais = pd.DataFrame(0.0, index=pd.Index(list(periodos), name="Periodo"), columns=MEDIDAS_CUBO)
+
+    for nome, cubo in cubos.items():
+        combinacoes.append(region_totals(cubo, inicio, fim).assign(**{REGIAO: nome}))
+        diario = region_daily(cubo)
+        datas = diario["Data"]
+        for periodo, (a, b) in periodos.items():
+            totais.loc[periodo] += diario.loc[(datas >= a) & (datas <= b), MEDIDAS_CUBO].sum().to_numpy()
+        no_periodo = diario[(datas >= pd.to_datetime(inicio)) & (datas <= pd.to_datetime(fim))]
+        diarios.append(no_periodo.assign(**{REGIAO: nome}))
+
+    colunas = [REGIAO] + DIMENSOES_CUBO + ["Categoria"] + MEDIDAS_CUBO
+    return {
+        "periodos": periodos,
+        "combinacoes": pd.concat(combinacoes, ignore_index=True)[colunas],
+        "diario": pd.concat(diarios, ignore_index=True)[[REGIAO, "Data"] + MEDIDAS_CUBO],
+        "totais_periodos": totais,
+    }
@@ -0,0 +1,69 @@
+"""Registro dos conjuntos de dados (um CSV por franquia ou região).
+
+O registro é um JSON (``datasets.json`` ou o caminho em ``ACAI_DATASETS``)
+com os conjuntos pelo nome, na ordem em que aparecem no seletor::
+
+    {
+        "Sudeste": {"caminho": "dados/sudeste.csv"},
+        "Nordeste": {
+            "caminho": "dados/nordeste.csv",
+            "separador": ";",
+            "colunas": {"Loja": "Localizacao", "Valor": "Valor_Total"}
+        }
+    }
+
+``colunas`` mapeia nomes do cabeçalho do arquivo para os nomes do esquema
+(``acai.validation.COLUNAS``) e ``separador`` é o separador de campos.
+Caminhos relativos partem da pasta do registro. Sem o arquivo de registro há
+um único conjunto, ``CONJUNTO_PADRAO``, com o arquivo padrão.
+
+Cada conjunto é carregado e recarregado por conta própria (um
+``DatasetRefresher`` por conjunto), então a troca de um arquivo não invalida
+os dados nem o cache dos outros.
+"""
+import functools
+import json
+import os
+from collections import namedtuple
+
+from acai.dataset import ARQUIVO_DADOS, build_dataset
+from acai.validation import COLUNAS
+
+ARQUIVO_REGISTRO = "datasets.json"
+CONJUNTO_PADRAO = "Principal"
+
+# Opção do seletor com a visão consolidada de todos os conjuntos
+TODAS = "Todas as regiões"
+
+Fonte = namedtuple("Fonte", ["nome", "caminho", "colunas", "separador"])
+
+
+def load_registry(caminho=None):
+    """Conjuntos do registro (nome -> ``Fonte``), na ordem do arquivo."""
+    caminho = caminho or os.environ.get("ACAI_DATASETS", ARQUIVO_REGISTRO)
+    if not os.path.exists(caminho):
+        return {CONJUNTO_PADRAO: Fonte(CONJUNTO_PADRAO, ARQUIVO_DADOS, {}, ",")}
+
+    with open(caminho, encoding="utf-8") as f:
+        config = json.load(f)
+    if not isinstance(config, dict) or not config:
+        raise ValueError(f"O registro {caminho} deve ser um objeto com pelo menos um conjunto")
+
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    fontes = {}
+    for nome, item in config.items():
+        if nome == TODAS:
+            raise ValueError(f"O nome {TODAS!r} é reservado para a visão consolidada")
+        if not isinstance(item, dict) or "caminho" not in item:
+            raise ValueError(f"O conjunto {nome!r} do registro {caminho} não tem 'caminho'")
+        colunas = item.get("colunas", {})
+        desconhecidas = sorted(set(colunas.values()) - set(COLUNAS))
+        if desconhecidas:
+            raise ValueError(f"O conjunto {nome!r} mapeia para colunas fora do esquema: {', '.join(desconhecidas)}")
+        fontes[nome] = Fonte(nome, os.path.join(pasta, item["caminho"]), dict(colunas), item.get("separador", ","))
+    return fontes
+
+
+def builder(fonte):
+    """``construir(caminho)`` do ``DatasetRefresher`` com o esquema de ``fonte``."""
+    return functools.partial(build_dataset, colunas=fonte.colunas, separador=fonte.separador)
@@ -0,0 +1,339 @@
+"""Relatórios noturnos por loja em HTML, gerados em lote e sem Streamlit.
+
+    python -m acai.reports --saida relatorios --periodo "Últimos 30 dias"
+
+Os dados e os agregados são carregados uma única vez (``build_dataset``) e
+compartilhados com os processos de trabalho, que montam em paralelo (um por
+núcleo) o relatório de cada Localizacao: KPIs com comparação, percentis,
+tendência diária, canais, produtos, cascata de custos, capacidade, entregas,
+alertas e insights, com os mesmos motores do dashboard. Cada arquivo HTML é
+autocontido (plotly.js embutido) e o ``index.html`` lista as lojas com o
+tempo gasto em cada uma.
+"""
+import argparse
+import html
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from acai.aggregation import aggregate
+from acai.anomalies import detect_anomalies
+from acai.capacity import LIMIAR_SATURACAO, capacity_profile
+from acai.comparison import COMPARACOES, aligned_series
+from acai.costs import cost_breakdown, waterfall_steps
+from acai.dataset import ARQUIVO_DADOS, build_dataset
+from acai.delivery import delivery_stats, distance_labels
+from acai.filters import PERIODOS, default_filters, period_dates
+from acai.insights import DIAS_PT, channel_insight, delivery_insight, product_insight, promotion_insight, sales_insight, saturation_insight, seasonality_insight
+from acai.kpis import breakdown, kpi_summary, period_view
+from acai.ranking import rank_products
+from acai.sketches import sketch_quantiles
+from acai.uplift import promotion_uplift
+
+PERIODO_RELATORIO = "Últimos 30 dias"
+COMPARACAO_RELATORIO = "Período anterior"
+SLA_ENTREGA = 45
+DIAS_ALERTA = 7
+
+CARTOES = [
+    ("vendas", "Total de Vendas", "#4e73df", "R$ {:,.2f}"),
+    ("lucro", "Lucro Líquido", "#1cc88a", "R$ {:,.2f}"),
+    ("ticket_medio", "Ticket Médio", "#36b9cc", "R$ {:,.2f}"),
+    ("novos_clientes", "Novos Clientes", "#f6c23e", "{:,.0f}"),
+]
+
+# Dados compartilhados com os processos de trabalho (herdados no fork)
+_DADOS = None
+
+
+def _init_worker(dados):
+    global _DADOS
+    _DADOS = dados
+
+
+def _window(frame, loja, inicio, fim):
+    return frame[
+        (frame["Localizacao"] == loja) &
+        (frame["Data"] >= pd.to_datetime(inicio)) &
+        (frame["Data"] <= pd.to_datetime(fim))
+    ]
+
+
+def store_report(dados, loja, inicio, fim, comparacao=COMPARACAO_RELATORIO):
+    """Indicadores, tabelas e insights do relatório de uma loja no período."""
+    df = dados["df"]
+    produtos, categorias, _, canais = default_filters(df)
+    visao = period_view(df, inicio, fim, None, (produtos, categorias, (loja,), canais))
+    linhas = visao["filtered_df"]
+
+    diario = aggregate(linhas, "Data", {"Valor_Total": "sum", "Lucro_Liquido": "sum"})
+    base = aligned_series(visao["comparison_df"], visao["periodos"], ["Valor_Total"], comparacao)
+
+    produtos_agregado = aggregate(linhas, ["Produto", "Categoria"], {"Valor_Total": "sum", "Qtd_Vendida": "sum", "Lucro_Liquido": "sum"})
+
+    capacidade = _window(dados["capacidade"], loja, inicio, fim)
+    perfil = capacity_profile(capacidade) if not capacidade.empty else None
+
+    entregas = _window(dados["entregas"], loja, inicio, fim)
+    por_faixa = delivery_stats(entregas, "Faixa_Distancia", SLA_ENTREGA)
+    faixas = distance_labels()
+    por_faixa["Faixa"] = [faixas[f] for f in por_faixa["Faixa_Distancia"]]
+
+    percentis = {}
+    for coluna in ("Valor_Total", "Tempo_Preparo", "Tempo_Entrega"):
+        quantis = sketch_quantiles(_window(dados["quantis"][coluna], loja, inicio, fim))
+        if not quantis.empty:
+            percentis[coluna] = quantis.iloc[0]
+
+    alertas = detect_anomalies(df[df["Localizacao"] == loja], ["Localizacao", "Canal"])
+    alertas = alertas[
+        (alertas["Data"] >= pd.to_datetime(fim) - timedelta(days=DIAS_ALERTA - 1)) &
+        (alertas["Data"] <= pd.to_datetime(fim))
+    ]
+
+    relatorio = {
+        "loja": loja,
+        "inicio": pd.to_datetime(inicio),
+        "fim": pd.to_datetime(fim),
+        "comparacao": comparacao,
+        "kpis": kpi_summary(visao["totais_periodos"], comparacao),
+        "percentis": percentis,
+        "diario": diario,
+        "base": base,
+        "canais": breakdown(linhas, "Canal"),
+        "produtos": rank_products(produtos_agregado, 10),
+        "custos": cost_breakdown(linhas),
+        "perfil": perfil,
+        "entregas": por_faixa,
+        "alertas": alertas,
+        "semana": aggregate(linhas, "Dia_Semana", {"Valor_Total": "sum"}),
+        "promocoes": promotion_uplift(linhas)[1],
+    }
+    relatorio["insights"] = store_insights(relatorio)
+    return relatorio
+
+
+def store_insights(relatorio):
+    """Frases curtas com os destaques do relatório (as mesmas da seção de insights do dashboard)."""
+    insights = [
+        sales_insight(relatorio["kpis"]["vendas"], COMPARACOES[relatorio["comparacao"]]),
+        channel_insight(relatorio["canais"]),
+        product_insight(relatorio["produtos"]),
+        seasonality_insight(relatorio["semana"], "Dia_Semana"),
+        promotion_insight(relatorio["promocoes"]),
+        saturation_insight(relatorio["perfil"]),
+        delivery_insight(relatorio["entregas"], SLA_ENTREGA),
+    ]
+    if not relatorio["alertas"].empty:
+        insights.append(f"{len(relatorio['alertas'])} alerta(s) de vendas fora do padrão nos últimos {DIAS_ALERTA} dias.")
+    return [texto for texto in insights if texto]
+
+
+def _figures(relatorio):
+    figuras = []
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=relatorio["diario"]["Data"], y=relatorio["diario"]["Valor_Total"], name="Vendas", line=dict(color="#4e73df", width=3)))
+    fig.add_trace(go.Scatter(x=relatorio["diario"]["Data"], y=relatorio["diario"]["Lucro_Liquido"], name="Lucro", line=dict(color="#1cc88a", width=3)))
+    fig.add_trace(go.Scatter(x=relatorio["base"]["Data"], y=relatorio["base"]["Valor_Total"], name=f"Vendas ({relatorio['comparacao'].lower()})", line=dict(color="#858796", width=2, dash="dash")))
+    fig.update_layout(title="Vendas e Lucro Diário", yaxis_title="Valor (R$)", hovermode="x unified")
+    figuras.append(fig)
+
+    canais = relatorio["canais"]
+    fig = px.bar(canais, x="Canal", y="Valor_Total", text=canais["Valor_Total"].map("R$ {:,.0f}".format),
+                 labels={"Valor_Total": "Vendas (R$)", "Canal": ""}, title="Vendas por Canal",
+                 color_discrete_sequence=["#4e73df"])
+    figuras.append(fig)
+
+    produtos = relatorio["produtos"]
+    fig = px.bar(produtos, x="Produto", y="Valor_Total", color="Categoria", title="Top 10 Produtos por Vendas",
+                 labels={"Valor_Total": "Vendas (R$)", "Produto": ""}, color_discrete_sequence=px.colors.qualitative.Pastel)
+    fig.update_layout(xaxis=dict(tickangle=45, categoryorder="array", categoryarray=produtos["Produto"]))
+    figuras.append(fig)
+
+    if not relatorio["custos"].empty:
+        passos = waterfall_steps(relatorio["custos"].iloc[0])
+        fig = go.Figure(go.Waterfall(
+            x=[p[0] for p in passos], y=[p[1] for p in passos], measure=[p[2] for p in passos],
+            increasing=dict(marker=dict(color="#1cc88a")), decreasing=dict(marker=dict(color="#e74a3b")),
+            totals=dict(marker=dict(color="#4e73df"))
+        ))
+        fig.update_layout(title="Da Receita ao Lucro", showlegend=False)
+        figuras.append(fig)
+
+    perfil = relatorio["perfil"]
+    if perfil is not None:
+        perfil = perfil.assign(Dia=perfil["Dia_Semana"].map(DIAS_PT), Utilizacao_Pct=perfil["Utilizacao"] * 100)
+        fig = px.bar(perfil, x="Dia", y="Utilizacao_Pct", title="Utilização da Capacidade por Dia da Semana",
+                     labels={"Utilizacao_Pct": "Utilização (%)", "Dia": ""}, color_discrete_sequence=["#36b9cc"],
+                     category_orders={"Dia": list(DIAS_PT.values())})
+        fig.add_hline(y=LIMIAR_SATURACAO * 100, line=dict(color="red", width=1, dash="dot"))
+        figuras.append(fig)
+
+    entregas = relatorio["entregas"]
+    if not entregas.empty:
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=entregas["Faixa"], y=entregas["Pct_Atraso"], name="Atrasos (%)", marker_color="#e74a3b"))
+        fig.add_trace(go.Scatter(x=entregas["Faixa"], y=entregas["Tempo_Medio"], name="Tempo médio (min)", yaxis="y2", line=dict(color="#4e73df", width=3)))
+        fig.update_layout(title=f"Entregas por Distância (prazo de {SLA_ENTREGA} min)", yaxis=dict(title="Pedidos atrasados (%)"),
+                          yaxis2=dict(title="Tempo médio (min)", overlaying="y", side="right"))
+        figuras.append(fig)
+
+    for fig in figuras:
+        fig.update_layout(template="plotly_white", title_font=dict(size=16), margin=dict(l=20, r=20, t=50, b=20),
+                          legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    return figuras
+
+
+def render_report(relatorio):
+    """HTML autocontido do relatório de uma loja."""
+    frase = COMPARACOES[relatorio["comparacao"]]
+    cartoes = []
+    for chave, titulo, cor, formato in CARTOES:
+        kpi = relatorio["kpis"][chave]
+        seta = "📈" if kpi["variacao"] >= 0 else "📉"
+        cartoes.append(
+            f'<div class="card"><h3 style="color: {cor}">{titulo}</h3><p class="valor">{formato.format(kpi["valor"])}</p>'
+            f'<p style="color: {"green" if kpi["variacao"] >= 0 else "red"}">{seta} {abs(kpi["variacao"]):.1f}% em relação {frase}</p></div>'
+        )
+
+    nomes = {"Valor_Total": ("Ticket por Venda", "R$ {:,.2f}"), "Tempo_Preparo": ("Tempo de Preparo", "{:.0f} min"), "Tempo_Entrega": ("Tempo de Entrega", "{:.0f} min")}
+    percentis = "".join(
+        f'<div class="card"><h3>{nomes[col][0]} (P50 · P90 · P99)</h3><p>{" · ".join(nomes[col][1].format(linha[p]) for p in ("P50", "P90", "P99"))}</p></div>'
+        for col, linha in relatorio["percentis"].items()
+    )
+
+    graficos = "".join(
+        f'<div class="grafico">{fig.to_html(full_html=False, include_plotlyjs=(i == 0))}</div>'
+        for i, fig in enumerate(_figures(relatorio))
+    )
+
+    alertas = relatorio["alertas"]
+    if alertas.empty:
+        tabela_alertas = f"<p>✅ Nenhuma anomalia nos últimos {DIAS_ALERTA} dias.</p>"
+    else:
+        tabela_alertas = alertas.assign(Data=alertas["Data"].dt.strftime("%d/%m/%Y")).rename(
+            columns={"Localizacao": "Loja", "Valor": "Vendas (R$)", "Esperado": "Esperado (R$)", "Variacao": "Variação (%)"}
+        ).to_html(index=False, float_format="{:,.2f}".format, border=0)
+
+    insights = "".join(f"<li>{html.escape(texto)}</li>" for texto in relatorio["insights"])
+    loja = html.escape(str(relatorio["loja"]))
+    periodo = f"{relatorio['inicio']:%d/%m/%Y} até {relatorio['fim']:%d/%m/%Y}"
+
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Açaí Fitness - {loja}</title>
+<style>
+    body {{ font-family: sans-serif; margin: 2rem; color: #5a5c69; }}
+    .cards {{ display: flex; gap: 1rem; flex-wrap: wrap; margin-bottom: 1rem; }}
+    .card {{ flex: 1; min-width: 200px; padding: 1rem; border-radius: 0.5rem; box-shadow: 0 0.15rem 1.75rem 0 rgba(58, 59, 69, 0.15); }}
+    .card h3 {{ font-size: 1rem; margin: 0 0 0.5rem 0; }}
+    .valor {{ font-size: 1.5rem; font-weight: 700; margin: 0; }}
+    .graficos {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(480px, 1fr)); gap: 1rem; }}
+    table {{ border-collapse: collapse; }}
+    td, th {{ padding: 0.25rem 0.75rem; border-bottom: 1px solid #e3e6f0; text-align: right; }}
+</style>
+</head>
+<body>
+<h1>🍇 {loja}</h1>
+<p><strong>Período analisado:</strong> {periodo}</p>
+<div class="cards">{"".join(cartoes)}</div>
+<div class="cards">{percentis}</div>
+<h2>💡 Insights</h2>
+<ul>{insights}</ul>
+<h2>📊 Gráficos</h2>
+<div class="graficos">{graficos}</div>
+<h2>🚨 Alertas</h2>
+{tabela_alertas}
+</body>
+</html>
+"""
+
+
+def _file_name(loja):
+    return "".join(c if c.isalnum() else "_" for c in str(loja)).strip("_").lower() + ".html"
+
+
+def _build_one(loja, inicio, fim, comparacao, saida):
+    """Gera o relatório de uma loja (no processo de trabalho) e retorna os tempos."""
+    comeco = time.perf_counter()
+    relatorio = store_report(_DADOS, loja, inicio, fim, comparacao)
+    meio = time.perf_counter()
+    caminho = os.path.join(saida, _file_name(loja))
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(render_report(relatorio))
+    fim_html = time.perf_counter()
+    return {"loja": loja, "arquivo": caminho, "calculo": meio - comeco, "html": fim_html - meio,
+            "total": fim_html - comeco, "bytes": os.path.getsize(caminho)}
+
+
+def build_reports(dados, saida, periodo=PERIODO_RELATORIO, comparacao=COMPARACAO_RELATORIO, processos=None):
+    """Gera um relatório por Localizacao em paralelo e retorna os tempos de cada loja."""
+    os.makedirs(saida, exist_ok=True)
+    inicio, fim = period_dates(periodo, dados["df"])
+    lojas = default_filters(dados["df"])[2]
+
+    # Com fork os processos herdam os dados já carregados, sem copiá-los
+    metodos = multiprocessing.get_all_start_methods()
+    contexto = multiprocessing.get_context("fork" if "fork" in metodos else None)
+    resultados = []
+    with ProcessPoolExecutor(max_workers=processos or os.cpu_count(), mp_context=contexto,
+                             initializer=_init_worker, initargs=(dados,)) as pool:
+        tarefas = [pool.submit(_build_one, loja, inicio, fim, comparacao, saida) for loja in lojas]
+        for tarefa in as_completed(tarefas):
+            resultados.append(tarefa.result())
+    resultados.sort(key=lambda r: r["loja"])
+    write_index(resultados, saida, inicio, fim)
+    return resultados
+
+
+def write_index(resultados, saida, inicio, fim):
+    linhas = "".join(
+        f'<tr><td style="text-align: left"><a href="{os.path.basename(r["arquivo"])}">{html.escape(str(r["loja"]))}</a></td>'
+        f'<td>{r["calculo"]:.2f} s</td><td>{r["html"]:.2f} s</td><td>{r["total"]:.2f} s</td></tr>'
+        for r in resultados
+    )
+    with open(os.path.join(saida, "index.html"), "w", encoding="utf-8") as f:
+        f.write(f"""<!DOCTYPE html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>Açaí Fitness - Relatórios por loja</title></head>
+<body style="font-family: sans-serif; margin: 2rem;">
+<h1>🍇 Relatórios por loja</h1>
+<p>{inicio:%d/%m/%Y} até {fim:%d/%m/%Y}</p>
+<table><tr><th>Loja</th><th>Cálculo</th><th>HTML</th><th>Total</th></tr>{linhas}</table>
+</body></html>
+""")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatórios HTML por loja do dashboard Açaí Fitness")
+    parser.add_argument("--arquivo", default=ARQUIVO_DADOS)
+    parser.add_argument("--saida", default="relatorios")
+    parser.add_argument("--periodo", default=PERIODO_RELATORIO, choices=PERIODOS)
+    parser.add_argument("--comparacao", default=COMPARACAO_RELATORIO, choices=[c for c in COMPARACOES if c != "Base personalizada"])
+    parser.add_argument("--processos", type=int, default=None, help="Processos em paralelo (padrão: um por núcleo)")
+    args = parser.parse_args()
+
+    comeco = time.perf_counter()
+    dados = build_dataset(args.arquivo)
+    carga = time.perf_counter() - comeco
+    resultados = build_reports(dados, args.saida, args.periodo, args.comparacao, args.processos)
+    total = time.perf_counter() - comeco
+
+    print(f"Dados carregados uma vez em {carga:.2f} s")
+    print(f"{'Loja':<20}{'Cálculo':>10}{'HTML':>10}{'Total':>10}{'Tamanho':>12}")
+    for r in resultados:
+        print(f"{str(r['loja']):<20}{r['calculo']:>9.2f}s{r['html']:>9.2f}s{r['total']:>9.2f}s{r['bytes'] / 1024:>9,.0f} KB")
+    soma = sum(r["total"] for r in resultados)
+    print(f"{len(resultados)} relatórios em {total:.2f} s ({soma:.2f} s somando as lojas) -> {os.path.join(args.saida, 'index.html')}")
+
+
+if __name__ == "__main__":
+    main()
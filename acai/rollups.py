@@ -0,0 +1,153 @@
+"""Hierarquia de agregados temporais materializados (dia → semana ISO → mês → ano).
+
+Cada nível é mantido por loja e canal e construído a partir do nível abaixo:
+a semana ISO e o mês saem do agregado diário (semanas ISO não cabem dentro
+de meses) e o ano sai do mês. As consultas são roteadas para o nível mais
+grosso cujos limites coincidem com o intervalo de datas pedido.
+"""
+import numpy as np
+import pandas as pd
+
+from acai.aggregation import DIAS_ORDEM, aggregate
+
+MEDIDAS = ["Valor_Total", "Lucro_Liquido", "Qtd_Vendida", "Clientes_Unicos"]
+CHAVES = ["Localizacao", "Canal"]
+NIVEIS = ["dia", "semana", "mes", "ano"]
+
+# Colunas que identificam cada grão de saída
+GRAOS = {
+    "dia": ["Data"],
+    "dia_semana": ["Dia_Semana"],
+    "semana": ["Ano_ISO", "Semana"],
+    "mes": ["Ano", "Mes"],
+    "ano": ["Ano"],
+}
+
+# Níveis capazes de responder cada grão, do mais grosso para o mais fino
+ROTAS = {
+    "ano": ["ano", "mes", "dia"],
+    "mes": ["mes", "dia"],
+    "semana": ["semana", "dia"],
+    "dia": ["dia"],
+    "dia_semana": ["dia"],
+}
+
+
+def calendar_columns(frame):
+    """Acrescenta a ``frame`` o ano, o mês, a semana ISO e o dia da semana de ``Data``."""
+    datas = pd.DatetimeIndex(frame["Data"])
+    iso = datas.isocalendar()
+    frame = frame.copy()
+    frame["Ano"] = datas.year
+    frame["Mes"] = datas.month
+    frame["Ano_ISO"] = iso["year"].to_numpy(dtype=np.int64)
+    frame["Semana"] = iso["week"].to_numpy(dtype=np.int64)
+    frame["Dia_Semana"] = pd.Categorical(datas.day_name(), categories=DIAS_ORDEM, ordered=True)
+    return frame
+
+
+def build_rollups(df):
+    """Materializa os níveis dia, semana, mês e ano por loja e canal."""
+    soma = {m: "sum" for m in MEDIDAS}
+
+    daily = calendar_columns(aggregate(df, ["Data"] + CHAVES, soma, as_category=True))
+    daily["Inicio"] = daily["Data"]
+    daily["Fim"] = daily["Data"]
+
+    weekly = aggregate(daily, ["Ano_ISO", "Semana"] + CHAVES, soma, as_category=True)
+    weekly["Inicio"] = pd.to_datetime(
+        weekly["Ano_ISO"].astype(str) + "-" + weekly["Semana"].astype(str) + "-1",
+        format="%G-%V-%u"
+    )
+    weekly["Fim"] = weekly["Inicio"] + pd.Timedelta(days=6)
+
+    monthly = aggregate(daily, ["Ano", "Mes"] + CHAVES, soma, as_category=True)
+    monthly["Inicio"] = pd.to_datetime(pd.DataFrame({"year": monthly["Ano"], "month": monthly["Mes"], "day": 1}))
+    monthly["Fim"] = monthly["Inicio"] + pd.offsets.MonthEnd(0)
+
+    yearly = aggregate(monthly, ["Ano"] + CHAVES, soma, as_category=True)
+    yearly["Inicio"] = pd.to_datetime(pd.DataFrame({"year": yearly["Ano"], "month": 1, "day": 1}))
+    yearly["Fim"] = yearly["Inicio"] + pd.offsets.YearEnd(0)
+
+    return {"dia": daily, "semana": weekly, "mes": monthly, "ano": yearly}
+
+
+def _bucket_bounds(level, date):
+    """Início e fim do período do nível que contém ``date``."""
+    if level == "semana":
+        inicio = date - pd.Timedelta(days=date.weekday())
+        return inicio, inicio + pd.Timedelta(days=6)
+    if level == "mes":
+        inicio = date.replace(day=1)
+        return inicio, inicio + pd.offsets.MonthEnd(0)
+    if level == "ano":
+        inicio = date.replace(month=1, day=1)
+        return inicio, inicio + pd.offsets.YearEnd(0)
+    return date, date
+
+
+def choose_level(rollups, grain, start, end):
+    """Escolhe o nível mais grosso cujos períodos coincidem com [start, end]."""
+    daily = rollups["dia"]
+    if daily.empty:
+        return "dia"
+
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp(end).normalize()
+    first, last = daily["Data"].min(), daily["Data"].max()
+
+    for level in ROTAS[grain]:
+        inicio, _ = _bucket_bounds(level, start)
+        _, fim = _bucket_bounds(level, end)
+        # Limites além da extensão dos dados não cortam nenhum período
+        start_ok = start <= first or start == inicio
+        end_ok = end >= last or end == fim
+        if start_ok and end_ok:
+            return level
+
+    return "dia"
+
+
+def query(rollups, grain, start, end, lojas=None, canais=None):
+    """Agrega as medidas no grão pedido usando o nível mais grosso possível.
+
+    O nível usado fica registrado em ``resultado.attrs["nivel"]``.
+    """
+    level = choose_level(rollups, grain, start, end)
+    frame = rollups[level]
+
+    mask = (frame["Fim"] >= pd.Timestamp(start)) & (frame["Inicio"] <= pd.Timestamp(end))
+    if lojas is not None:
+        mask &= frame["Localizacao"].isin(lojas)
+    if canais is not None:
+        mask &= frame["Canal"].isin(canais)
+
+    result = aggregate(frame[mask], GRAOS[grain], {m: "sum" for m in MEDIDAS})
+    result.attrs["nivel"] = level
+    return result
+
+
+def aggregate_raw(df, grain):
+    """Mesmo resultado de ``query`` calculado sobre as linhas brutas já filtradas.
+
+    Usado quando há filtros que os agregados não cobrem (produto, categoria).
+    """
+    keys = GRAOS[grain]
+    if grain == "semana" and "Ano_ISO" not in df.columns:
+        iso = df["Data"].dt.isocalendar()
+        df = df.assign(Ano_ISO=iso["year"].astype(np.int64), Semana=iso["week"].astype(np.int64))
+
+    result = aggregate(df, keys, {m: "sum" for m in MEDIDAS})
+    result.attrs["nivel"] = "linhas"
+    return result
+
+
+def aggregate_days(diario, grain):
+    """Mesmo resultado de ``query`` a partir das medidas já somadas por dia.
+
+    Usado com filtros de produto ou categoria, que os agregados não cobrem,
+    sobre a série diária mantida pelo filtro cruzado (``CrossFilter.daily``).
+    """
+    result = aggregate(calendar_columns(diario), GRAOS[grain], {m: "sum" for m in MEDIDAS})
+    result.attrs["nivel"] = "filtro cruzado"
+    return result
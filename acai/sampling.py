@@ -0,0 +1,115 @@
+"""Amostragem estratificada e estimativas com intervalo de confiança.
+
+Usado pelo modo aproximado: os KPIs e gráficos são exibidos primeiro a partir
+de uma amostra estratificada por loja e canal e depois substituídos pelos
+valores exatos. Os filtros do dashboard são tratados como domínios da
+amostra (estimador de Horvitz-Thompson com variância estratificada).
+"""
+import numpy as np
+import pandas as pd
+
+from acai.aggregation import group_index
+
+ESTRATOS = ["Localizacao", "Canal"]
+
+# Valor z para o intervalo de confiança de 95%
+Z_95 = 1.96
+
+
+def stratified_sample(df, size, by=ESTRATOS, seed=0):
+    """Sorteia ``size`` linhas com alocação proporcional por estrato.
+
+    Cada estrato recebe pelo menos duas linhas (quando possui), o que permite
+    estimar a variância. Retorna ``{"linhas", "N", "n"}`` com o tamanho de
+    cada estrato na população (N) e na amostra (n).
+    """
+    combined, _, shape, _ = group_index(df, by)
+    strata = int(np.prod(shape))
+    N = np.bincount(combined, minlength=strata)
+
+    alvo = np.round(size * N / max(N.sum(), 1)).astype(np.int64)
+    n = np.minimum(N, np.maximum(alvo, 2))
+
+    # Embaralhar dentro de cada estrato e pegar as n primeiras linhas
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(combined)), combined))
+    starts = np.concatenate([[0], np.cumsum(N)[:-1]])
+    rank = np.arange(len(order)) - starts[combined[order]]
+    chosen = np.sort(order[rank < n[combined[order]]])
+
+    linhas = df.iloc[chosen].copy()
+    linhas["Estrato"] = combined[chosen]
+    return {"linhas": linhas, "N": N, "n": n}
+
+
+def _totals(amostra, mask, values, groups, size, z):
+    """Total estimado e meia-largura do IC de ``values`` no domínio ``mask``."""
+    N, n = amostra["N"], amostra["n"]
+    h = amostra["linhas"]["Estrato"].to_numpy()
+    cell = h * size + groups
+    cells = len(N) * size
+
+    y = np.where(mask, values, 0.0)
+    s1 = np.bincount(cell, weights=y, minlength=cells).reshape(len(N), size)
+    s2 = np.bincount(cell, weights=y * y, minlength=cells).reshape(len(N), size)
+
+    # Estratos vazios têm n = 0 e somas nulas, então contribuem com zero
+    n_div = np.maximum(n, 1)
+    peso = N / n_div * (n > 0)
+    fpc = 1 - n / np.maximum(N, 1)
+    var_h = (s2 - s1 ** 2 / n_div[:, None]) / np.maximum(n - 1, 1)[:, None]
+
+    total = (peso[:, None] * s1).sum(axis=0)
+    var = ((N.astype(float) ** 2 * fpc / n_div)[:, None] * var_h).sum(axis=0)
+    return total, z * np.sqrt(np.maximum(var, 0.0))
+
+
+def estimate_totals(amostra, mask, values, by=None, z=Z_95):
+    """Estima totais (e o erro do IC) de cada série em ``values``.
+
+    ``values`` mapeia nome -> array alinhado às linhas da amostra e ``mask``
+    indica as linhas da amostra que passam pelos filtros. Sem ``by`` retorna um
+    dicionário ``{nome: (total, erro)}``; com ``by`` retorna um DataFrame com
+    as colunas ``nome`` e ``nome_erro`` por grupo.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    linhas = amostra["linhas"]
+
+    if by is None:
+        groups, size = np.zeros(len(linhas), dtype=np.int64), 1
+    else:
+        by = [by] if isinstance(by, str) else list(by)
+        groups, _, shape, labels = group_index(linhas, by)
+        size = int(np.prod(shape))
+
+    result = {}
+    for nome, valores in values.items():
+        result[nome] = _totals(amostra, mask, np.asarray(valores, dtype=float), groups, size, z)
+
+    if by is None:
+        return {nome: (float(t[0]), float(e[0])) for nome, (t, e) in result.items()}
+
+    present = np.flatnonzero(np.bincount(groups[mask], minlength=size))
+    positions = np.unravel_index(present, shape)
+    frame = {col: lab[pos] for col, lab, pos in zip(by, labels, positions)}
+    for nome, (total, erro) in result.items():
+        frame[nome] = total[present]
+        frame[f"{nome}_erro"] = erro[present]
+    return pd.DataFrame(frame)
+
+
+def estimate_ratio(amostra, mask, numerador, denominador, z=Z_95):
+    """Estima a razão de dois totais (ex.: ticket médio) por linearização."""
+    mask = np.asarray(mask, dtype=bool)
+    numerador = np.asarray(numerador, dtype=float)
+    denominador = np.asarray(denominador, dtype=float)
+    groups = np.zeros(len(numerador), dtype=np.int64)
+
+    y, _ = _totals(amostra, mask, numerador, groups, 1, z)
+    x, _ = _totals(amostra, mask, denominador, groups, 1, z)
+    if x[0] <= 0:
+        return 0.0, 0.0
+
+    razao = y[0] / x[0]
+    _, erro = _totals(amostra, mask, numerador - razao * denominador, groups, 1, z)
+    return float(razao), float(erro[0] / x[0])
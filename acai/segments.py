@@ -0,0 +1,230 @@
+"""Segmentação das lojas por características de venda e de operação.
+
+Cada loja vira uma linha da matriz loja × característica (ticket médio,
+margem, tempo de preparo, participação de promoções e de clientes novos,
+utilização da capacidade e mix de canais), montada a partir de agregados
+por loja com ``np.bincount``. As colunas são padronizadas (z-score) e o mix
+de canais, que ocupa uma coluna por canal, entra com o peso total de uma
+característica.
+
+O k-means (inicialização k-means++, várias partidas) trabalha sobre a matriz
+inteira: cada iteração é uma matriz de distâncias lojas × centros e uma
+média por segmento com produto matricial, sem laços por loja. O número de
+segmentos pode ser escolhido pela silhueta média, calculada com a matriz de
+distâncias entre as lojas, que também dá os pares mais próximos de cada loja.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from acai.aggregation import aggregate, group_index
+
+# Características de uma coluna; o mix de canais entra como MIX_<canal>
+CARACTERISTICAS = ["Ticket_Medio", "Margem", "Tempo_Preparo", "Pct_Promocao", "Pct_Novos", "Utilizacao"]
+PREFIXO_MIX = "Mix_"
+
+# Faixa do número de segmentos na escolha automática
+K_MAXIMO = 8
+PARTIDAS = 10
+ITERACOES = 100
+
+
+def store_features(df, capacidade=None):
+    """Matriz loja × característica das vendas ``df`` (já filtradas).
+
+    ``capacidade`` é o agregado diário de ``daily_capacity`` no mesmo período;
+    sem ele a utilização fica vazia. Percentuais em 0-100.
+    """
+    colunas = ["Localizacao", "Valor_Total"] + CARACTERISTICAS
+    if df.empty:
+        return pd.DataFrame(columns=colunas)
+
+    valor = df["Valor_Total"].to_numpy(dtype=float)
+    lojas = aggregate(df, "Localizacao", {
+        "Valor_Total": "sum",
+        "Lucro_Liquido": "sum",
+        "Clientes_Unicos": "sum",
+        "Clientes_Novos": "sum",
+        "Valor_Promocao": "sum",
+        "Tempo_Preparo": "mean",
+    }, values={"Valor_Promocao": valor * df["Promocao"].to_numpy(dtype=bool)})
+    total = lojas["Valor_Total"].to_numpy(dtype=float)
+    clientes = lojas["Clientes_Unicos"].to_numpy(dtype=float)
+
+    def razao(numerador, denominador, escala=1.0):
+        numerador = np.asarray(numerador, dtype=float)
+        return np.divide(numerador, denominador, out=np.zeros_like(numerador), where=denominador > 0) * escala
+
+    lojas["Ticket_Medio"] = razao(total, clientes)
+    lojas["Margem"] = razao(lojas["Lucro_Liquido"], total, 100)
+    lojas["Pct_Promocao"] = razao(lojas["Valor_Promocao"], total, 100)
+    lojas["Pct_Novos"] = razao(lojas["Clientes_Novos"], clientes, 100)
+
+    if capacidade is not None and not capacidade.empty:
+        utilizacao = aggregate(capacidade, "Localizacao", {"Utilizacao": "mean"})
+        por_loja = dict(zip(utilizacao["Localizacao"].astype(str), utilizacao["Utilizacao"] * 100))
+        lojas["Utilizacao"] = lojas["Localizacao"].astype(str).map(por_loja).astype(float)
+    else:
+        lojas["Utilizacao"] = np.nan
+
+    # Mix de canais: receita loja × canal em uma matriz densa, só lojas e canais com vendas
+    combinado, validas, forma, rotulos = group_index(df, ["Localizacao", "Canal"])
+    tamanho = int(np.prod(forma))
+    receita = np.bincount(combinado, weights=valor[validas], minlength=tamanho).reshape(forma)
+    linhas = np.bincount(combinado, minlength=tamanho).reshape(forma)
+    receita = receita[linhas.sum(axis=1) > 0][:, linhas.sum(axis=0) > 0]
+    canais = rotulos[1][linhas.sum(axis=0) > 0]
+    mix = razao(receita, receita.sum(axis=1, keepdims=True), 100)
+    for j, canal in enumerate(canais):
+        lojas[f"{PREFIXO_MIX}{canal}"] = mix[:, j]
+
+    return lojas[colunas + [f"{PREFIXO_MIX}{canal}" for canal in canais]].reset_index(drop=True)
+
+
+def feature_columns(caracteristicas):
+    """Colunas usadas na segmentação (características e mix de canais)."""
+    return [c for c in caracteristicas.columns if c in CARACTERISTICAS or c.startswith(PREFIXO_MIX)]
+
+
+def standardize(caracteristicas):
+    """Matriz padronizada (z-score por coluna; valores ausentes na média e colunas constantes em zero)."""
+    colunas = feature_columns(caracteristicas)
+    frame = caracteristicas[colunas].astype(float)
+    frame = frame.fillna(frame.mean()).fillna(0.0)
+    valores = frame.to_numpy()
+    media, desvio = valores.mean(axis=0), valores.std(axis=0)
+    z = np.divide(valores - media, desvio, out=np.zeros_like(valores), where=desvio > 0)
+    mix = np.array([c.startswith(PREFIXO_MIX) for c in colunas])
+    if mix.any():
+        z[:, mix] /= np.sqrt(mix.sum())
+    return z
+
+
+def squared_distances(a, b):
+    """Distâncias euclidianas ao quadrado entre as linhas de ``a`` e de ``b``."""
+    d2 = (a * a).sum(axis=1)[:, None] - 2 * a @ b.T + (b * b).sum(axis=1)[None, :]
+    return np.maximum(d2, 0.0)
+
+
+def _kmeans_pp(z, k, rng):
+    """Centros iniciais do k-means++ (cada novo centro sorteado pela distância aos anteriores)."""
+    centros = np.empty((k, z.shape[1]))
+    centros[0] = z[rng.integers(len(z))]
+    d2 = ((z - centros[0]) ** 2).sum(axis=1)
+    for i in range(1, k):
+        total = d2.sum()
+        escolhido = rng.choice(len(z), p=d2 / total) if total > 0 else rng.integers(len(z))
+        centros[i] = z[escolhido]
+        d2 = np.minimum(d2, ((z - centros[i]) ** 2).sum(axis=1))
+    return centros
+
+
+def kmeans(z, k, partidas=PARTIDAS, iteracoes=ITERACOES, seed=0):
+    """K-means sobre as linhas de ``z``: (rótulos, centros, inércia) da melhor de ``partidas``."""
+    rng = np.random.default_rng(seed)
+    linhas = np.arange(len(z))
+    melhor = None
+    for _ in range(partidas):
+        centros = _kmeans_pp(z, k, rng)
+        for _ in range(iteracoes):
+            rotulos = squared_distances(z, centros).argmin(axis=1)
+            pertence = np.eye(k)[rotulos]
+            contagem = pertence.sum(axis=0)
+            # Segmento vazio mantém o centro anterior
+            novos = np.where(contagem[:, None] > 0, pertence.T @ z / np.maximum(contagem, 1)[:, None], centros)
+            if np.allclose(novos, centros):
+                break
+            centros = novos
+        d2 = squared_distances(z, centros)
+        rotulos = d2.argmin(axis=1)
+        inercia = d2[linhas, rotulos].sum()
+        if melhor is None or inercia < melhor[2]:
+            melhor = (rotulos, centros, inercia)
+    return melhor
+
+
+def silhouette(distancias, rotulos, k):
+    """Silhueta média (de -1 a 1) dos rótulos sobre a matriz de distâncias entre as linhas."""
+    linhas = np.arange(len(rotulos))
+    pertence = np.eye(k)[rotulos]
+    somas = distancias @ pertence
+    tamanhos = pertence.sum(axis=0)
+    proprio = tamanhos[rotulos] - 1
+    a = somas[linhas, rotulos] / np.maximum(proprio, 1)
+    medias = np.divide(somas, tamanhos, out=np.full_like(somas, np.inf), where=tamanhos > 0)
+    medias[linhas, rotulos] = np.inf
+    b = medias.min(axis=1)
+    s = np.divide(b - a, np.maximum(a, b), out=np.zeros_like(a), where=np.maximum(a, b) > 0)
+    s[proprio == 0] = 0.0
+    return float(s.mean())
+
+
+def segment_stores(caracteristicas, k=None, pares=3, k_maximo=K_MAXIMO, seed=0):
+    """Segmentos e pares mais próximos das lojas de ``store_features``.
+
+    Com ``k=None`` o número de segmentos (2 a ``k_maximo``, menor que o número
+    de lojas) é o de maior silhueta média. Os segmentos são numerados pela
+    receita (1 = maior). Retorna ``caracteristicas`` com ``Segmento`` e as
+    duas componentes principais (para o gráfico), ``perfis`` (médias por
+    segmento), ``pares`` (as ``pares`` lojas mais próximas de cada uma),
+    ``k``, ``silhuetas`` por k, a inércia, a variância explicada pelas duas
+    componentes e o tempo.
+    """
+    inicio = time.perf_counter()
+    n = len(caracteristicas)
+    if n < 3:
+        raise ValueError("A segmentação precisa de pelo menos 3 lojas")
+
+    z = standardize(caracteristicas)
+    distancias = np.sqrt(squared_distances(z, z))
+    candidatos = [k] if k else list(range(2, min(k_maximo, n - 1) + 1))
+    resultados = {c: kmeans(z, c, seed=seed) for c in candidatos}
+    silhuetas = pd.Series({c: silhouette(distancias, r[0], c) for c, r in resultados.items()}, name="Silhueta")
+    k = k or int(silhuetas.idxmax())
+    rotulos, _, inercia = resultados[k]
+
+    # Segmentos numerados pela receita
+    receita = np.bincount(rotulos, weights=caracteristicas["Valor_Total"].to_numpy(dtype=float), minlength=k)
+    numero = np.empty(k, dtype=np.int64)
+    numero[np.argsort(-receita, kind="stable")] = np.arange(1, k + 1)
+    segmentos = numero[rotulos]
+
+    # Duas componentes principais da matriz padronizada
+    u, s, _ = np.linalg.svd(z - z.mean(axis=0), full_matrices=False)
+    componentes = u[:, :2] * s[:2]
+    if componentes.shape[1] < 2:
+        componentes = np.hstack([componentes, np.zeros((n, 2 - componentes.shape[1]))])
+    variancia = (s[:2] ** 2 / max((s ** 2).sum(), 1e-12)).tolist()
+
+    resultado = caracteristicas.assign(
+        Segmento=segmentos, Componente_1=componentes[:, 0], Componente_2=componentes[:, 1]
+    )
+    colunas = feature_columns(caracteristicas)
+    perfis = aggregate(resultado, "Segmento", {c: "mean" for c in ["Valor_Total"] + colunas})
+    perfis.insert(1, "Lojas", np.bincount(segmentos, minlength=k + 1)[perfis["Segmento"].to_numpy()])
+
+    # Pares mais próximos: a própria loja fica de fora com distância infinita
+    p = min(pares, n - 1)
+    fora = distancias + np.diag(np.full(n, np.inf))
+    vizinhos = np.argpartition(fora, p - 1, axis=1)[:, :p]
+    vizinhos = np.take_along_axis(vizinhos, np.argsort(np.take_along_axis(fora, vizinhos, axis=1), axis=1), axis=1)
+    lojas = resultado["Localizacao"].astype(str).to_numpy()
+    tabela_pares = pd.DataFrame({
+        "Localizacao": np.repeat(lojas, p),
+        "Posicao": np.tile(np.arange(1, p + 1), n),
+        "Par": lojas[vizinhos.ravel()],
+        "Distancia": np.take_along_axis(fora, vizinhos, axis=1).ravel(),
+        "Mesmo_Segmento": (segmentos[vizinhos] == segmentos[:, None]).ravel(),
+    })
+
+    return {
+        "caracteristicas": resultado,
+        "perfis": perfis,
+        "pares": tabela_pares,
+        "k": k,
+        "silhuetas": silhuetas,
+        "inercia": float(inercia),
+        "variancia": variancia,
+        "tempo": time.perf_counter() - inicio,
+    }
@@ -0,0 +1,110 @@
+"""Esboços de quantis mescláveis por célula (dia, loja, canal).
+
+Cada valor cai em um balde logarítmico de borda fixa (estilo DDSketch): o
+balde ``k`` cobre (γ^(k-1), γ^k] com γ = (1 + α) / (1 - α), o que garante erro
+relativo de no máximo α em qualquer quantil. Como as bordas são as mesmas para
+todas as células, mesclar esboços é somar contagens por balde, e as
+combinações de filtros obtêm P50/P90/P99 com ``np.bincount`` sobre as células
+selecionadas, sem ordenar as linhas.
+"""
+import numpy as np
+import pandas as pd
+
+from acai.aggregation import aggregate, group_index
+from acai.delivery import delivery_rows
+
+# Erro relativo máximo dos quantis
+ALFA = 0.01
+GAMA = (1 + ALFA) / (1 - ALFA)
+
+# Menor valor positivo distinguido; valores <= 0 ficam no balde 0
+MINIMO = 0.01
+K_MINIMO = int(np.ceil(np.log(MINIMO) / np.log(GAMA)))
+
+CELULA = ["Data", "Localizacao", "Canal"]
+
+# Colunas com esboço: tempo de preparo, tempo de entrega e ticket (valor da venda)
+METRICAS = ["Tempo_Preparo", "Tempo_Entrega", "Valor_Total"]
+
+QUANTIS = (0.5, 0.9, 0.99)
+
+# Linhas que entram no esboço de cada métrica (as demais usam todas): o tempo
+# de entrega só existe nos pedidos entregues
+LINHAS_METRICA = {"Tempo_Entrega": delivery_rows}
+
+
+def bucket_index(valores):
+    """Balde de cada valor: 0 para valores <= 0, depois 1, 2, ... em escala log."""
+    valores = np.asarray(valores, dtype=float)
+    positivos = valores > 0
+    k = np.ceil(np.log(np.maximum(valores, MINIMO)) / np.log(GAMA)).astype(np.int64)
+    return np.where(positivos, np.maximum(k - K_MINIMO, 0) + 1, 0)
+
+
+def bucket_value(baldes):
+    """Valor representativo de cada balde (média harmônica das bordas)."""
+    baldes = np.asarray(baldes)
+    k = baldes - 1 + K_MINIMO
+    return np.where(baldes > 0, 2 * GAMA ** k / (GAMA + 1), 0.0)
+
+
+def build_sketches(df, metricas=METRICAS):
+    """Esboço de cada métrica: contagens por (dia, loja, canal, balde)."""
+    esbocos = {}
+    for col in metricas:
+        linhas = df[LINHAS_METRICA[col](df)] if col in LINHAS_METRICA else df
+        frame = linhas[CELULA].assign(Balde=bucket_index(linhas[col]))
+        esbocos[col] = aggregate(frame, CELULA + ["Balde"], {"Contagem": "count"}, as_category=True)
+    return esbocos
+
+
+def merge_sketches(esboco, by=None):
+    """Mescla as células do esboço em um histograma por grupo de ``by``.
+
+    Retorna ``(histogramas, grupos)``: matriz grupos × baldes e um DataFrame
+    com as colunas ``by`` de cada linha (uma linha só quando ``by`` é vazio).
+    """
+    by = [by] if isinstance(by, str) else list(by or [])
+    baldes = esboco["Balde"].to_numpy()
+    n_baldes = int(baldes.max()) + 1 if len(baldes) else 1
+    contagens = esboco["Contagem"].to_numpy(dtype=float)
+
+    if not by:
+        return np.bincount(baldes, weights=contagens, minlength=n_baldes)[None, :], pd.DataFrame(index=[0])
+
+    groups, valid, shape, labels = group_index(esboco, by)
+    hist = np.bincount(groups * n_baldes + baldes[valid], weights=contagens[valid],
+                       minlength=int(np.prod(shape)) * n_baldes).reshape(-1, n_baldes)
+    presentes = np.flatnonzero(hist.sum(axis=1) > 0)
+    positions = np.unravel_index(presentes, shape)
+    grupos = pd.DataFrame({col: lab[pos] for col, lab, pos in zip(by, labels, positions)})
+    return hist[presentes], grupos
+
+
+def histogram_quantiles(hist, quantis=QUANTIS):
+    """Quantis de cada linha de uma matriz grupos × baldes (NaN em linhas vazias)."""
+    total = hist.sum(axis=1)
+    acumulado = np.cumsum(hist, axis=1)
+    result = np.full((len(hist), len(quantis)), np.nan)
+    for i, q in enumerate(quantis):
+        # Primeiro balde cuja contagem acumulada passa da posição q · (n - 1)
+        posicao = q * np.maximum(total - 1, 0)
+        balde = np.minimum((acumulado <= posicao[:, None]).sum(axis=1), hist.shape[1] - 1)
+        result[:, i] = np.where(total > 0, bucket_value(balde), np.nan)
+    return result
+
+
+def sketch_quantiles(esboco, by=None, quantis=QUANTIS):
+    """P50/P90/P99 (ou ``quantis``) por grupo de ``by`` a partir das células do esboço."""
+    by = [by] if isinstance(by, str) else list(by or [])
+    nomes = [f"P{q * 100:g}" for q in quantis]
+    if esboco.empty:
+        return pd.DataFrame(columns=by + nomes + ["Contagem"])
+
+    hist, grupos = merge_sketches(esboco, by)
+    valores = histogram_quantiles(hist, quantis)
+    # Colunas montadas de uma vez (inserir uma a uma custa mais que a conta)
+    colunas = {col: grupos[col].to_numpy() for col in by}
+    colunas.update({nome: valores[:, i] for i, nome in enumerate(nomes)})
+    colunas["Contagem"] = hist.sum(axis=1).astype(np.int64)
+    return pd.DataFrame(colunas, columns=by + nomes + ["Contagem"])
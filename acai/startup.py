@@ -0,0 +1,157 @@
+"""Benchmark do tempo de inicialização do dashboard, com guarda de regressão.
+
+    python -m acai.startup                 # mede e compara com a referência
+    python -m acai.startup --atualizar     # grava a medição como nova referência
+
+Cada repetição roda o dashboard em um processo novo (``AppTest`` do Streamlit,
+sob ``python -X importtime``) e mede:
+
+- o tempo de importação por pacote, somando o tempo próprio de cada módulo;
+- o tempo até os KPIs (primeira renderização) e até a página completa,
+  registrados pelo próprio script em ``st.session_state["tempos_render"]``;
+- quais dos ``MODULOS_PROIBIDOS`` foram importados durante a execução.
+
+A mediana das repetições é comparada com a referência gravada: o comando
+termina com código 1 se algum tempo passar da referência além da tolerância
+ou se um módulo que a página não usa (``MODULOS_PROIBIDOS``) for importado.
+Os tempos dependem da máquina: grave a referência no mesmo ambiente em que a
+comparação vai rodar.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+SCRIPT = "dash_st.py"
+REFERENCIA = os.path.join("benchmarks", "startup.json")
+TOLERANCIA = 0.3
+REPETICOES = 3
+
+# Módulos que não devem ser importados para desenhar a página (o próprio AppTest
+# importa o pacote matplotlib, mas não o pyplot)
+MODULOS_PROIBIDOS = ["matplotlib.pyplot", "seaborn"]
+
+# Medidas comparadas com a referência
+MEDIDAS = ["importacao", "kpis", "pagina"]
+
+# Executado em um processo novo: roda o dashboard uma vez e imprime as medidas em JSON
+_FILHO = """
+import json, sys
+PROIBIDOS = {proibidos!r}
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({script!r}, default_timeout=600).run()
+tempos = at.session_state["tempos_render"] if "tempos_render" in at.session_state else {{}}
+print(json.dumps({{
+    "tempos": dict(tempos),
+    "excecoes": [str(e.value) for e in at.exception],
+    "proibidos": [nome for nome in PROIBIDOS if nome in sys.modules],
+}}))
+"""
+
+
+def parse_importtime(saida):
+    """Tempo próprio de importação (s) somado por pacote de topo, a partir do ``-X importtime``."""
+    por_pacote = defaultdict(float)
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:"):
+            continue
+        partes = linha[len("import time:"):].split("|")
+        if len(partes) != 3 or not partes[0].strip().isdigit():
+            continue
+        por_pacote[partes[2].strip().split(".")[0]] += int(partes[0]) / 1e6
+    return dict(por_pacote)
+
+
+def measure_once(diretorio=".", script=SCRIPT):
+    """Roda o dashboard em um processo novo e retorna as medidas da execução."""
+    # Como no ``streamlit run``, o diretório do script fica importável
+    ambiente = dict(os.environ)
+    ambiente["PYTHONPATH"] = os.pathsep.join(
+        p for p in [os.path.dirname(os.path.abspath(script)), ambiente.get("PYTHONPATH")] if p
+    )
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _FILHO.format(script=os.path.abspath(script), proibidos=MODULOS_PROIBIDOS)],
+        cwd=diretorio, env=ambiente, capture_output=True, text=True, check=True
+    )
+    resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+    if resultado["excecoes"]:
+        raise RuntimeError(f"O dashboard falhou: {resultado['excecoes']}")
+    por_pacote = parse_importtime(processo.stderr)
+    return {
+        "importacao": sum(por_pacote.values()),
+        "kpis": resultado["tempos"].get("KPIs"),
+        "pagina": resultado["tempos"].get("Página"),
+        "por_pacote": por_pacote,
+        "proibidos": resultado["proibidos"],
+    }
+
+
+def measure(diretorio=".", script=SCRIPT, repeticoes=REPETICOES):
+    """Mediana de ``repeticoes`` execuções em processos novos."""
+    execucoes = [measure_once(diretorio, script) for _ in range(repeticoes)]
+    pacotes = sorted({p for e in execucoes for p in e["por_pacote"]})
+    return {
+        **{m: statistics.median(e[m] for e in execucoes) for m in MEDIDAS},
+        "por_pacote": {p: statistics.median(e["por_pacote"].get(p, 0.0) for e in execucoes) for p in pacotes},
+        "proibidos": sorted({m for e in execucoes for m in e["proibidos"]}),
+    }
+
+
+def check(medicao, referencia=None, tolerancia=TOLERANCIA):
+    """Lista de regressões da ``medicao`` (vazia quando está tudo dentro do limite)."""
+    problemas = [f"o módulo {m} foi importado" for m in medicao["proibidos"]]
+    if referencia is not None:
+        for m in MEDIDAS:
+            limite = referencia[m] * (1 + tolerancia)
+            if medicao[m] > limite:
+                problemas.append(f"{m}: {medicao[m]:.2f} s > {limite:.2f} s (referência {referencia[m]:.2f} s)")
+    return problemas
+
+
+def report(medicao, referencia=None, principais=10):
+    linhas = ["Importação por pacote (tempo próprio):"]
+    for pacote, tempo in sorted(medicao["por_pacote"].items(), key=lambda x: -x[1])[:principais]:
+        linhas.append(f"  {pacote:<24}{tempo * 1000:>9.0f} ms")
+    linhas.append("")
+    for m, rotulo in zip(MEDIDAS, ["Importação total", "Até os KPIs", "Página completa"]):
+        linha = f"{rotulo:<26}{medicao[m]:>7.2f} s"
+        if referencia is not None:
+            linha += f"   (referência {referencia[m]:.2f} s, {(medicao[m] / referencia[m] - 1) * 100:+.0f}%)"
+        linhas.append(linha)
+    return "\n".join(linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de inicialização do dashboard")
+    parser.add_argument("--diretorio", default=".", help="Diretório com o script e o arquivo de dados")
+    parser.add_argument("--referencia", default=REFERENCIA)
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    parser.add_argument("--atualizar", action="store_true", help="Grava a medição como nova referência")
+    args = parser.parse_args()
+
+    medicao = measure(args.diretorio, SCRIPT, args.repeticoes)
+    referencia = None
+    if not args.atualizar and os.path.exists(args.referencia):
+        with open(args.referencia) as f:
+            referencia = json.load(f)
+    print(report(medicao, referencia))
+
+    if args.atualizar:
+        os.makedirs(os.path.dirname(args.referencia) or ".", exist_ok=True)
+        with open(args.referencia, "w") as f:
+            json.dump({m: round(medicao[m], 3) for m in MEDIDAS}, f, indent=2)
+        print(f"\nReferência gravada em {args.referencia}")
+        return
+
+    problemas = check(medicao, referencia, args.tolerancia)
+    for problema in problemas:
+        print(f"REGRESSÃO: {problema}")
+    sys.exit(1 if problemas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Estimativa do ganho incremental das promoções.
+
+A comparação é de volume por dia, não por pedido: o que a promoção precisa
+explicar é quanto a loja vendeu a mais do produto no dia, e não o tamanho de
+cada pedido promocional. As vendas são somadas por loja × produto × dia; um
+dia promocional é um dia com pelo menos uma venda do produto em promoção na
+loja. Cada célula promocional (campanha, loja, produto, dia da semana) soma
+todas as vendas dos seus dias promocionais e é comparada com a venda média
+por dia sem promoção da mesma célula, contando como zero os dias em que a
+loja abriu e não vendeu o produto. Quando a célula não tem dias sem promoção
+suficientes, a base recua para (loja, produto) e depois para o produto. Tudo
+é feito com agregados e junções entre eles, sem laços por linha.
+
+Como o dia promocional só é reconhecido por ter uma venda em promoção, os
+dias promocionais sempre têm venda do produto e os de base podem não ter:
+com vendas esparsas a estimativa tende a ser um limite superior do ganho.
+
+Os dados não trazem um identificador de campanha; cada campanha é o conjunto
+de dias promocionais de um período (por padrão, ano e mês).
+"""
+import numpy as np
+import pandas as pd
+
+from acai.aggregation import aggregate
+
+CELULA = ["Localizacao", "Produto", "Dia_Semana"]
+
+# Níveis da base sem promoção, do mais específico ao mais geral
+NIVEIS_BASE = [CELULA, ["Localizacao", "Produto"], ["Produto"]]
+
+MEDIDAS = ["Valor_Total", "Lucro_Liquido", "Qtd_Vendida", "Desconto_Promocao"]
+
+
+def _days(df, campanha):
+    """Vendas por loja × produto × dia e dias de loja aberta, com as colunas de calendário.
+
+    As colunas de ``campanha`` e ``Dia_Semana`` são funções da data e são
+    levadas para os agregados a partir da primeira venda de cada dia.
+    """
+    calendario = df.drop_duplicates("Data").set_index("Data")[["Dia_Semana"] + campanha]
+
+    agg = {m: "sum" for m in MEDIDAS}
+    agg["Promocao"] = "sum"
+    dias = aggregate(df, ["Localizacao", "Produto", "Data"], agg, as_category=True)
+    dias = dias.join(calendario, on="Data")
+
+    abertos = aggregate(df, ["Localizacao", "Data"], {"Valor_Total": "count"}, as_category=True)
+    abertos = abertos.join(calendario[["Dia_Semana"]], on="Data")
+    return dias, abertos
+
+
+def _per_day(dias, abertos, nivel):
+    """Venda média por dia sem promoção em cada grupo de ``nivel``.
+
+    Os dias sem promoção são os dias de loja aberta (qualquer venda na loja)
+    menos os dias promocionais do produto; os que não tiveram venda do
+    produto entram na média com zero.
+    """
+    promo = dias["Promocao"].to_numpy() > 0
+    fora = dias[~promo]
+    base = aggregate(fora, nivel, {"Valor_Total": "sum", "Lucro_Liquido": "sum", "Qtd_Vendida": "sum"}, as_category=True)
+    dias_promo = aggregate(dias[promo], nivel, {"Dias_Promo": "count"}, as_category=True)
+    base = base.merge(dias_promo, on=nivel, how="left")
+
+    resto = [col for col in nivel if col != "Produto"]
+    if resto:
+        abertos_nivel = aggregate(abertos, resto, {"Dias_Abertos": "count"}, as_category=True)
+        base = base.merge(abertos_nivel, on=resto, how="left")
+    else:
+        base["Dias_Abertos"] = len(abertos)
+
+    dias_base = base["Dias_Abertos"].to_numpy(dtype=float) - base["Dias_Promo"].fillna(0).to_numpy(dtype=float)
+    return pd.DataFrame({
+        **{col: base[col] for col in nivel},
+        "Dias_Base": dias_base,
+        "Receita_Base": base["Valor_Total"] / dias_base,
+        "Lucro_Base": base["Lucro_Liquido"] / dias_base,
+        "Qtd_Base": base["Qtd_Vendida"] / dias_base,
+    })
+
+
+def promotion_cells(df, campanha=("Ano", "Mes"), min_base=5):
+    """Células promocionais com a base por dia casada e os valores incrementais.
+
+    ``min_base`` é o número mínimo de dias sem promoção para aceitar a base
+    de um nível.
+    """
+    campanha = list(campanha)
+    dias, abertos = _days(df, campanha)
+    promo = dias["Promocao"].to_numpy() > 0
+
+    agg = {m: "sum" for m in MEDIDAS}
+    agg["Promocao"] = "sum"
+    agg["Dias_Promo"] = "count"
+    cells = aggregate(dias[promo], campanha + CELULA, agg, as_category=True)
+    cells = cells.rename(columns={"Promocao": "Pedidos"})
+
+    colunas_base = ["Dias_Base", "Receita_Base", "Lucro_Base", "Qtd_Base"]
+    for col in colunas_base:
+        cells[col] = np.nan
+    cells["Nivel_Base"] = ""
+
+    # Preencher a base nível a nível apenas onde ainda não houve casamento
+    for nivel in NIVEIS_BASE:
+        base = _per_day(dias, abertos, nivel)
+        base = base[base["Dias_Base"] >= min_base]
+        casado = cells[nivel].merge(base, on=nivel, how="left")
+        falta = cells["Receita_Base"].isna().to_numpy() & casado["Receita_Base"].notna().to_numpy()
+        for col in colunas_base:
+            cells.loc[falta, col] = casado.loc[falta, col].to_numpy()
+        cells.loc[falta, "Nivel_Base"] = " × ".join(nivel)
+
+    dias_promo = cells["Dias_Promo"].to_numpy(dtype=float)
+    cells["Receita_Incremental"] = cells["Valor_Total"] - dias_promo * cells["Receita_Base"]
+    cells["Lucro_Incremental"] = cells["Lucro_Liquido"] - dias_promo * cells["Lucro_Base"]
+    cells["Qtd_Incremental"] = cells["Qtd_Vendida"] - dias_promo * cells["Qtd_Base"]
+    return cells
+
+
+def promotion_uplift(df, campanha=("Ano", "Mes"), min_base=5):
+    """Receita e lucro incrementais e custo de desconto por campanha.
+
+    Retorna ``(campanhas, totais)``. ``Receita_Promo`` é a receita dos dias
+    promocionais (com as vendas sem desconto desses dias) e ``Pedidos`` o
+    número de vendas em promoção. Células sem nenhuma base casada ficam de
+    fora dos valores incrementais, mas entram no custo de desconto.
+    """
+    campanha = list(campanha)
+    if df.empty or not df["Promocao"].any():
+        colunas = campanha + ["Receita_Promo", "Custo_Desconto", "Pedidos", "Dias_Promo",
+                              "Receita_Incremental", "Lucro_Incremental", "Qtd_Incremental"]
+        totais = dict.fromkeys(colunas[len(campanha):], 0.0)
+        totais.update(Celulas=0, Celulas_Sem_Base=0)
+        return pd.DataFrame(columns=colunas), totais
+
+    cells = promotion_cells(df, campanha, min_base)
+    casadas = cells["Receita_Base"].notna()
+
+    medidas = ["Valor_Total", "Desconto_Promocao", "Pedidos", "Dias_Promo",
+               "Receita_Incremental", "Lucro_Incremental", "Qtd_Incremental"]
+    cells[medidas[4:]] = cells[medidas[4:]].where(casadas, 0.0)
+
+    campanhas = aggregate(cells, campanha, {m: "sum" for m in medidas})
+    campanhas = campanhas.rename(columns={"Valor_Total": "Receita_Promo", "Desconto_Promocao": "Custo_Desconto"})
+
+    totais = campanhas[["Receita_Promo", "Custo_Desconto", "Pedidos", "Dias_Promo", "Receita_Incremental",
+                        "Lucro_Incremental", "Qtd_Incremental"]].sum().to_dict()
+    totais["Celulas"] = len(cells)
+    totais["Celulas_Sem_Base"] = int((~casadas).sum())
+    return campanhas, totais
@@ -0,0 +1,285 @@
+"""Validação do CSV de vendas na própria leitura, com quarentena das linhas ruins.
+
+O cabeçalho é conferido pelos nomes das colunas (e não pela posição) contra
+``COLUNAS``: se faltar alguma, a carga falha com a lista das ausentes; as
+colunas a mais são ignoradas e aparecem no resumo. As datas são lidas no
+formato DD/MM/AAAA (ou AAAA-MM-DD), sem deixar o pandas adivinhar a ordem de
+dia e mês; se a maioria delas for inválida a carga falha, pois o problema é o
+formato do arquivo e não algumas linhas. Depois da leitura, regras
+vetorizadas sobre as colunas já lidas separam:
+
+- as linhas em quarentena, que saem dos dados: linhas malformadas (com campos
+  a mais), data inválida, dimensão vazia e valores vazios ou não numéricos
+  nas colunas numéricas (inclusive ``True``/``False`` nas colunas de valor);
+- as linhas com alerta, que continuam nos dados: valores fora da faixa, como
+  quantidades negativas ou ``Lucro_Liquido`` maior que ``Valor_Total``.
+
+As duas vão, com os motivos, para um arquivo ao lado do CSV
+(``<nome>_quarentena.csv``). Só as colunas que o leitor não conseguiu tipar
+passam pela conversão de texto, o que deixa a carga de um arquivo limpo mais
+rápida do que a conversão coluna a coluna de antes.
+"""
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+COLUNAS = [
+    "Data", "Produto", "Categoria", "Localizacao", "Canal", "Qtd_Vendida",
+    "Preco_Unitario", "Valor_Total", "Custo_Materiais", "Custo_Entrega",
+    "Receita_Liquida", "Receita_Loja", "Desconto_Cliente", "Taxa_Plataforma",
+    "Lucro_Liquido", "Funcionarios", "Comissao_Func", "Tempo_Preparo",
+    "Distancia_Entrega", "Clientes_Unicos", "Pessoas_Atendidas",
+    "Tempo_Entrega", "Valor_Ticket_Medio", "Cliente_Novo", "Capacidade_Max",
+    "Promocao", "Desconto_Promocao", "Qtde_Desconto"
+]
+
+DIMENSOES_TEXTO = ["Produto", "Categoria", "Localizacao", "Canal"]
+
+COLUNAS_MONETARIAS = [
+    "Preco_Unitario", "Valor_Total", "Custo_Materiais", "Custo_Entrega",
+    "Receita_Liquida", "Receita_Loja", "Desconto_Cliente", "Taxa_Plataforma",
+    "Lucro_Liquido", "Comissao_Func", "Valor_Ticket_Medio", "Desconto_Promocao"
+]
+
+COLUNAS_INTEIRAS = [
+    "Qtd_Vendida", "Clientes_Unicos", "Pessoas_Atendidas", "Funcionarios",
+    "Capacidade_Max", "Qtde_Desconto", "Tempo_Preparo", "Tempo_Entrega",
+    "Distancia_Entrega"
+]
+
+COLUNAS_BOOLEANAS = ["Cliente_Novo", "Promocao"]
+
+# Colunas que não podem ser negativas (o lucro e as receitas podem)
+NAO_NEGATIVAS = [
+    "Qtd_Vendida", "Preco_Unitario", "Valor_Total", "Custo_Materiais",
+    "Custo_Entrega", "Funcionarios", "Tempo_Preparo", "Distancia_Entrega",
+    "Clientes_Unicos", "Pessoas_Atendidas", "Tempo_Entrega", "Capacidade_Max"
+]
+
+# Formatos aceitos na coluna Data: o do README (DD/MM/AAAA) e o ISO (AAAA-MM-DD)
+FORMATOS_DATA = ["%d/%m/%Y", "%Y-%m-%d"]
+
+# Fração de datas inválidas a partir da qual a carga falha (formato errado, e não linhas ruins)
+LIMITE_DATAS_INVALIDAS = 0.5
+
+VALORES_BOOLEANOS = {"true": True, "false": False, "1": True, "0": False}
+
+SUFIXO_QUARENTENA = "_quarentena.csv"
+
+MALFORMADA = "Linha malformada"
+
+# Mensagem do leitor do pandas para linhas com campos a mais
+_LINHA_PULADA = re.compile(r"Skipping line (\d+): expected (\d+) fields, saw (\d+)")
+
+
+def quarantine_path(caminho):
+    """Arquivo de quarentena de ``caminho`` (ao lado dele)."""
+    return os.path.splitext(caminho)[0] + SUFIXO_QUARENTENA
+
+
+def check_header(cabecalho, colunas=None):
+    """Nome no esquema de cada coluna do arquivo a ler e colunas extras.
+
+    ``colunas`` mapeia nomes do arquivo para nomes do esquema (os demais são
+    usados como estão). Falha se faltar alguma de ``COLUNAS``.
+    """
+    colunas = colunas or {}
+    nomes = {c: colunas.get(str(c).strip(), str(c).strip()) for c in cabecalho}
+    ausentes = [c for c in COLUNAS if c not in nomes.values()]
+    if ausentes:
+        raise ValueError(f"Colunas ausentes no cabeçalho do arquivo: {', '.join(ausentes)}")
+    usadas = {c: nome for c, nome in nomes.items() if nome in COLUNAS}
+    extras = [str(c).strip() for c, nome in nomes.items() if nome not in COLUNAS]
+    return usadas, extras
+
+
+def _read_csv(caminho, colunas=None, separador=","):
+    """Lê as colunas do esquema pelo nome; retorna o quadro, as colunas extras e as linhas malformadas."""
+    usadas, extras = check_header(pd.read_csv(caminho, nrows=0, sep=separador).columns, colunas)
+    texto = {c: str for c, nome in usadas.items() if nome in DIMENSOES_TEXTO + ["Data"]}
+
+    # Conforme a versão, o pandas avisa das linhas puladas no stderr ou com ParserWarning.
+    # Sem ``usecols``: com ele o leitor aceita em silêncio as linhas com campos a mais
+    saida = io.StringIO()
+    with warnings.catch_warnings(record=True) as avisos, contextlib.redirect_stderr(saida):
+        warnings.simplefilter("always", pd.errors.ParserWarning)
+        bruto = pd.read_csv(caminho, sep=separador, dtype=texto, on_bad_lines="warn", low_memory=False)
+    bruto = bruto[list(usadas)].set_axis(list(usadas.values()), axis=1)[COLUNAS]
+
+    mensagens = saida.getvalue()
+    for aviso in avisos:
+        if _LINHA_PULADA.search(str(aviso.message)):
+            mensagens += "\n" + str(aviso.message)
+        else:
+            warnings.warn(aviso.message, aviso.category, stacklevel=3)
+    outras = [linha for linha in saida.getvalue().splitlines() if linha.strip() and not _LINHA_PULADA.search(linha)]
+    if outras:
+        sys.stderr.write("\n".join(outras) + "\n")
+
+    malformadas = {
+        int(linha): f"{MALFORMADA} ({vistos} campos, esperados {esperados})"
+        for linha, esperados, vistos in _LINHA_PULADA.findall(mensagens)
+    }
+    return bruto, extras, malformadas
+
+
+def _numeric(serie):
+    """Valores de ``serie`` como números e máscara dos vazios ou não numéricos."""
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return serie, serie.isna().to_numpy()
+    # Só as colunas que o leitor não tipou passam pela conversão de texto (vírgula decimal)
+    valores = pd.to_numeric(serie.astype(str).str.strip().str.replace(",", ".", regex=False), errors="coerce")
+    return valores, valores.isna().to_numpy()
+
+
+def _boolean(serie):
+    """Valores de ``serie`` como booleanos e máscara dos que não são verdadeiro/falso."""
+    if pd.api.types.is_bool_dtype(serie):
+        return serie.to_numpy(), np.zeros(len(serie), dtype=bool)
+    valores = serie.astype(str).str.strip().str.lower().map(VALORES_BOOLEANOS)
+    return valores.fillna(False).astype(bool).to_numpy(), valores.isna().to_numpy()
+
+
+def _reasons(regras, linhas):
+    """Motivos (separados por "; ") de cada uma das ``linhas`` segundo as ``regras`` que elas violam."""
+    motivos = np.full(len(linhas), "", dtype=object)
+    for motivo, mascara in regras:
+        motivos[mascara[linhas]] += motivo + "; "
+    return pd.Series(motivos).str[:-2]
+
+
+def _file_lines(n, malformadas):
+    """Número da linha no arquivo (o cabeçalho é a linha 1) de cada uma das ``n`` linhas lidas."""
+    puladas = np.array(sorted(malformadas), dtype=np.int64)
+    return np.setdiff1d(np.arange(2, n + len(puladas) + 2), puladas, assume_unique=True)[:n]
+
+
+def _raw_lines(caminho, numeros):
+    """Texto original das linhas ``numeros`` do arquivo (só é lido quando há linhas malformadas)."""
+    procuradas = set(numeros)
+    conteudo = {}
+    with open(caminho, encoding="utf-8", errors="replace") as f:
+        for i, linha in enumerate(f, 1):
+            if i in procuradas:
+                conteudo[i] = linha.rstrip("\r\n")
+                if len(conteudo) == len(procuradas):
+                    break
+    return conteudo
+
+
+def _write_quarantine(caminho, bruto, regras, alertas, quarentena, alerta, malformadas):
+    """Grava as linhas em quarentena e com alerta, com os motivos; remove o arquivo antigo se não houver nenhuma."""
+    destino = quarantine_path(caminho)
+    problemas = np.flatnonzero(quarentena | alerta)
+    if not len(problemas) and not malformadas:
+        with contextlib.suppress(OSError):
+            os.remove(destino)
+        return None
+
+    numeros = _file_lines(len(bruto), malformadas)
+    linhas = bruto.iloc[problemas].reset_index(drop=True)
+    linhas.insert(0, "Linha", numeros[problemas])
+    linhas.insert(1, "Situacao", np.where(quarentena[problemas], "quarentena", "alerta"))
+    linhas.insert(2, "Motivos", np.where(
+        quarentena[problemas], _reasons(regras, problemas), _reasons(alertas, problemas)
+    ))
+
+    if malformadas:
+        conteudo = _raw_lines(caminho, malformadas)
+        linhas = pd.concat([linhas, pd.DataFrame({
+            "Linha": list(malformadas),
+            "Situacao": "quarentena",
+            "Motivos": list(malformadas.values()),
+            "Conteudo": [conteudo.get(n, "") for n in malformadas],
+        })], ignore_index=True).sort_values("Linha", kind="stable")
+
+    try:
+        linhas.to_csv(destino, index=False)
+    except OSError:
+        return None
+    return destino
+
+
+def _dates(valores):
+    """Datas em um dos ``FORMATOS_DATA``, sem inferir a ordem de dia e mês; as demais ficam NaT.
+
+    Os formatos são tentados na ordem do que mais casa com as primeiras linhas
+    (o do README em caso de empate) e cada um só nas linhas que os anteriores
+    não leram.
+    """
+    amostra = valores.dropna().head(1000)
+    formatos = sorted(
+        FORMATOS_DATA, key=lambda f: pd.to_datetime(amostra, format=f, errors="coerce").isna().sum()
+    )
+    datas = pd.to_datetime(valores, format=formatos[0], errors="coerce")
+    for formato in formatos[1:]:
+        faltam = datas.isna() & valores.notna()
+        if not faltam.any():
+            break
+        datas[faltam] = pd.to_datetime(valores[faltam], format=formato, errors="coerce")
+    return datas
+
+
+def read_validated(caminho, colunas=None, separador=","):
+    """Lê e valida o CSV de vendas (``colunas`` e ``separador`` como em ``check_header`` e no ``read_csv``).
+
+    Retorna as colunas de ``COLUNAS`` já tipadas, só com as linhas válidas, e
+    o resumo de qualidade: linhas lidas, válidas, em quarentena e com alerta,
+    contagens por motivo, colunas extras, arquivo de quarentena e o tempo da
+    validação (sem contar a leitura).
+    """
+    bruto, extras, malformadas = _read_csv(caminho, colunas, separador)
+    inicio = time.perf_counter()
+
+    colunas = {"Data": _dates(bruto["Data"])}
+    regras = [("Data inválida", colunas["Data"].isna().to_numpy())]
+    if len(bruto) and regras[0][1].mean() > LIMITE_DATAS_INVALIDAS:
+        raise ValueError(
+            f"{regras[0][1].sum():,} de {len(bruto):,} datas inválidas: a coluna Data deve estar "
+            f"no formato DD/MM/AAAA (ou AAAA-MM-DD)"
+        )
+    for col in DIMENSOES_TEXTO:
+        colunas[col] = bruto[col]
+        regras.append((f"{col} vazio", bruto[col].isna().to_numpy()))
+    for col in COLUNAS_MONETARIAS + COLUNAS_INTEIRAS:
+        valores, invalidos = _numeric(bruto[col])
+        tipo = int if col in COLUNAS_INTEIRAS else float
+        colunas[col] = valores.fillna(0).astype(tipo) if invalidos.any() else valores.astype(tipo)
+        regras.append((f"{col} vazio ou não numérico", invalidos))
+    for col in COLUNAS_BOOLEANAS:
+        colunas[col], invalidos = _boolean(bruto[col])
+        regras.append((f"{col} não é verdadeiro/falso", invalidos))
+    df = pd.DataFrame(colunas, index=bruto.index)[COLUNAS]
+
+    quarentena = np.logical_or.reduce([mascara for _, mascara in regras])
+    alertas = [(f"{col} negativo", df[col].to_numpy() < 0) for col in NAO_NEGATIVAS]
+    alertas.append(("Lucro_Liquido maior que Valor_Total", df["Lucro_Liquido"].to_numpy() > df["Valor_Total"].to_numpy()))
+    alertas = [(motivo, mascara & ~quarentena) for motivo, mascara in alertas]
+    alerta = np.logical_or.reduce([mascara for _, mascara in alertas])
+
+    arquivo = _write_quarantine(caminho, bruto, regras, alertas, quarentena, alerta, malformadas)
+    if quarentena.any():
+        df = df[~quarentena].reset_index(drop=True)
+
+    motivos = {motivo: int(mascara.sum()) for motivo, mascara in regras if mascara.any()}
+    if malformadas:
+        motivos = {MALFORMADA: len(malformadas), **motivos}
+    qualidade = {
+        "linhas": len(bruto) + len(malformadas),
+        "validas": len(df),
+        "quarentena": int(quarentena.sum()) + len(malformadas),
+        "alertas": int(alerta.sum()),
+        "motivos": motivos,
+        "motivos_alerta": {motivo: int(mascara.sum()) for motivo, mascara in alertas if mascara.any()},
+        "colunas_extras": extras,
+        "arquivo": arquivo,
+        "tempo": time.perf_counter() - inicio,
+    }
+    return df, qualidade
@@ -0,0 +1,52 @@
+"""Pré-aquecimento do cache com as visões padrão do dashboard.
+
+Executa uma lista de tarefas nomeadas (em geral, uma por período pré-definido
+com os filtros padrão) e registra o progresso e o tempo de cada uma, para que
+o dashboard possa mostrar o andamento enquanto o aquecimento roda em segundo
+plano.
+"""
+import threading
+import time
+
+
+class WarmUp:
+    """Progresso do último aquecimento: tarefas concluídas, tempos, erros e ignoradas."""
+
+    def __init__(self):
+        self.versao = None
+        self.total = 0
+        self.concluidas = 0
+        self.atual = None
+        self.tempos = {}
+        self.erros = {}
+        self.ignoradas = []
+        self.tempo = None
+        self._lock = threading.Lock()
+
+    @property
+    def em_andamento(self):
+        return self.versao is not None and self.tempo is None
+
+    def run(self, versao, tarefas):
+        """Executa ``tarefas`` (pares ``(nome, função)``) em ordem para a ``versao``.
+
+        Uma tarefa com erro é registrada em ``erros`` e não interrompe as demais;
+        uma que retorna ``False`` (resultado que não coube no cache) vai para
+        ``ignoradas``.
+        """
+        with self._lock:
+            self.versao, self.total, self.concluidas = versao, len(tarefas), 0
+            self.tempos, self.erros, self.ignoradas, self.tempo = {}, {}, [], None
+            inicio = time.perf_counter()
+            for nome, tarefa in tarefas:
+                self.atual = nome
+                inicio_tarefa = time.perf_counter()
+                try:
+                    if tarefa() is False:
+                        self.ignoradas.append(nome)
+                except Exception as e:
+                    self.erros[nome] = e
+                self.tempos[nome] = time.perf_counter() - inicio_tarefa
+                self.concluidas += 1
+            self.atual = None
+            self.tempo = time.perf_counter() - inicio